@@ -1,10 +1,22 @@
 import sys
+from multiprocessing import freeze_support
 
 from classes.combiner import Combiner
 from constants.runtime_const import CrOpType, gcr_settings
 
 # Check if the major version is 3 and minor version is at least 12
 if __name__ == "__main__":
+    freeze_support()  # merge workers in frozen builds
+    if sys.argv[1:2] == ["serve"]:
+        from classes.build_service import main
+
+        main(sys.argv[2:])
+        sys.exit()
+    if sys.argv[1:2] == ["snapshot"]:
+        from classes.pack.base_snapshot import main
+
+        main(sys.argv[2:])
+        sys.exit()
     if sys.version_info < (3, 12):
         _tex = (
             f"System Python version is {sys.version_info.major}."
@@ -2,6 +2,7 @@ from pathlib import Path
 
 from classes.combiner import Combiner
 from classes.pack import Pack
+from constants.generic import default_animation_types
 from constants.runtime_const import CrOpType, gcr_settings, settings_menu
 
 # TODO previous choice(s)
@@ -12,6 +13,102 @@ from constants.runtime_const import CrOpType, gcr_settings, settings_menu
 RUN_TYPE = 4
 SELECTED_PACK = [2]
 
+# RUN_TYPE 5 - poser, expected (group, animation) pairs. The pairs are what the
+# old recursive walker returned, except where noted. Top level keys are read for
+# the default animation types plus POSER_PACK_TYPES, as a pack's own animation
+# names would add them
+POSER_PACK_TYPES: list[str] = ["surf_idle"]
+POSER_CORPUS: list[tuple[dict, set[tuple[str, str]]]] = [
+    (
+        {
+            "portraitScale": 1,
+            "animations": {"cry": "q.bedrock_primary('pikachu', 'cry', q.curve('one'))"},
+            "poses": {
+                "stand": {
+                    "poseTypes": ["STAND"],
+                    "animations": [
+                        "q.bedrock('pikachu', 'ground_idle')",
+                        "q.look('head')",
+                    ],
+                    "quirks": ["q.bedrock_quirk('pikachu', 'blink')"],
+                }
+            },
+        },
+        {("pikachu", "cry"), ("pikachu", "ground_idle"), ("pikachu", "blink")},
+    ),
+    (
+        {
+            "faint": "q.bedrock_primary('charizard', 'faint', q.curve('one'))",
+            "cry": "q.bedrock_stateful('charizard', 'cry')",
+            "animations": {
+                "recoil": "q.bedrock_stateful('charizard', 'recoil')",
+                "physical": "q.bedrock_primary('charizard', 'physical', q.curve('x'))",
+            },
+            "poses": {
+                "battle": {
+                    "animations": ["q.bedrock('charizard', 'battle_idle')"],
+                    "quirks": ["bedrock('charizard', 'quirk2')"],
+                },
+                "fly": {
+                    "animations": {
+                        "animations": ['q.bedrock("charizard", "air_fly")'],
+                        "x": "q.bedrock('charizard','air_idle')",
+                    }
+                },
+                "walk": {"animations": ["q.bedrock( 'charizard' , 'ground_walk' )"]},
+            },
+        },
+        {
+            ("charizard", "faint"),
+            ("charizard", "cry"),
+            ("charizard", "recoil"),
+            ("charizard", "physical"),
+            ("charizard", "battle_idle"),
+            ("charizard", "quirk2"),
+            ("charizard", "air_fly"),
+            ("charizard", "air_idle"),
+            ("charizard", "ground_walk"),
+        },
+    ),
+    ({"poses": {"sleep": {"animations": [], "quirks": []}}}, set()),
+    # outside of animations / quirks, not read by the walker either
+    (
+        {
+            "notes": "q.bedrock('eevee', 'unused')",
+            "poses": {
+                "stand": {"transformedParts": [{"cond": "bedrock('eevee', 'x')"}]}
+            },
+        },
+        set(),
+    ),
+    # new: every animation of a nested call, the walker kept "q.array('blink'"
+    (
+        {
+            "poses": {
+                "stand": {
+                    "quirks": ["q.bedrock_quirk('pikachu', q.array('blink', 'blink_2'))"]
+                }
+            }
+        },
+        {("pikachu", "blink"), ("pikachu", "blink_2")},
+    ),
+    # new: the long query prefix, which the walker skipped
+    (
+        {"poses": {"stand": {"animations": ["query.bedrock('mew', 'ground_idle')"]}}},
+        {("mew", "ground_idle")},
+    ),
+    # top level keys beyond the usual ones: "air_idle" is a default type, and
+    # "surf_idle" is only known from the pack's animations
+    (
+        {
+            "air_idle": "q.bedrock('lapras', 'air_idle')",
+            "surf_idle": "q.bedrock('lapras', 'surf_idle')",
+            "dive_idle": "q.bedrock('lapras', 'dive_idle')",
+        },
+        {("lapras", "air_idle"), ("lapras", "surf_idle")},
+    ),
+]
+
 if __name__ == "__main__":
     if RUN_TYPE == 0:
         packs = [
@@ -64,6 +161,19 @@ if __name__ == "__main__":
         p.display()
         p.export(selected=False)
 
+    elif RUN_TYPE == 5:
+        from classes.pack.poser_parser import PoserResolver
+
+        failed = 0
+        for i, (poser, expected) in enumerate(POSER_CORPUS):
+            found = PoserResolver.extract(
+                poser, default_animation_types + POSER_PACK_TYPES
+            )
+            if found != expected:
+                failed += 1
+                print(f"[{i}] missing: {expected - found}  extra: {found - expected}")
+        print(f"{len(POSER_CORPUS) - failed}/{len(POSER_CORPUS)} posers match")
+
     elif RUN_TYPE == 4:
         while True:
             new_settings = settings_menu(gcr_settings)
@@ -5,7 +5,7 @@ from enum import Enum
 from pathlib import Path
 from typing import TYPE_CHECKING
 
-from constants.runtime_const import gcr_settings
+from constants.runtime_const import CRSettings, gcr_settings
 from constants.text_constants import DefaultNames
 from utils.text_utils import bcolors, c_text
 
@@ -17,6 +17,7 @@ if TYPE_CHECKING:
 class bcfo:
     file_path: Path
     source: dict
+    file_id: int
     # partial: bool = False
 
 
@@ -50,6 +51,7 @@ class LangEntry:
     name: str
     file_path: Path
     source: dict
+    file_id: int
     incl_pokemon: set[str] = field(default_factory=set)
 
 
@@ -65,6 +67,7 @@ class PackHolder:
     dex_num: int
     name: str
     internal_name: str | None = None
+    settings: CRSettings = field(default_factory=lambda: gcr_settings, repr=False)
 
     def __len__(self) -> int:
         return len(self.mons)
@@ -134,7 +137,7 @@ class PackHolder:
             for k, mon in self.mons.items()
             if (
                 (mon.parent_pack.is_base)
-                or (mon.parent_pack.is_mod and (not gcr_settings.PROCESS_MODS))
+                or (mon.parent_pack.is_mod and (not self.settings.PROCESS_MODS))
             )
         ]
 
@@ -188,10 +191,9 @@ class PackHolder:
             _outp += f"{outp}\n"
         return _outp, keys
 
-    @staticmethod
-    def _entry_color(mon: "Pokemon") -> bcolors:
+    def _entry_color(self, mon: "Pokemon") -> bcolors:
         if mon.parent_pack.is_base or (
-            mon.parent_pack.is_mod and (not gcr_settings.PROCESS_MODS)
+            mon.parent_pack.is_mod and (not self.settings.PROCESS_MODS)
         ):
             return bcolors.UNDERLINE
         elif mon.is_fully_data_merged():
@@ -0,0 +1,576 @@
+from __future__ import annotations
+
+import argparse
+import contextlib
+import copy
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from typing import Any
+
+from classes.combiner import Combiner
+from classes.pack import Pack
+from classes.workspace import RUN_PREFIX
+from constants.runtime_const import DEBUG, CRSettings
+from constants.text_constants import DefaultNames
+
+DEFAULT_PORT = 8737
+WARM_PACK_LIMIT = 16  # per worker process
+# finished jobs, with their result folders, are dropped past either limit
+FINISHED_JOB_LIMIT = 64
+FINISHED_JOB_TTL = 3600.0  # seconds
+
+
+@dataclass
+class JobSpec:
+    packs: list[str]
+    settings: dict[str, Any] = field(default_factory=dict)
+    load_order: list[str] = field(default_factory=list)
+    decisions: dict[str, str] = field(default_factory=dict)  # pokemon -> pack name
+    plan: bool = False
+
+    @classmethod
+    def from_json(cls, data: Any) -> JobSpec:
+        if not isinstance(data, dict):
+            raise ValueError("Job must be a json object")
+        packs = data.get("packs")
+        if (not isinstance(packs, list)) or (not packs):
+            raise ValueError("'packs' must be a non-empty list of paths")
+        for p in packs:
+            if (not isinstance(p, str)) or (not Path(p).is_absolute()):
+                raise ValueError(f"Pack path must be absolute: {p}")
+            if not Path(p).exists():
+                raise ValueError(f"Pack not found: {p}")
+
+        spec = cls(
+            packs=packs,
+            settings=data.get("settings", dict()),
+            load_order=data.get("load_order", list()),
+            decisions=data.get("decisions", dict()),
+            plan=bool(data.get("plan", False)),
+        )
+        if not isinstance(spec.settings, dict):
+            raise ValueError("'settings' must be an object")
+        if not isinstance(spec.load_order, list):
+            raise ValueError("'load_order' must be a list of pack names")
+        if not isinstance(spec.decisions, dict):
+            raise ValueError("'decisions' must be an object")
+        return spec
+
+
+def coerce_settings(values: dict[str, Any]) -> dict[str, Any]:
+    """Json setting values -> CRSettings field values, raises ValueError"""
+    defaults = CRSettings()
+    res: dict[str, Any] = dict()
+    for key, value in values.items():
+        if (not hasattr(defaults, key)) or key.startswith("_"):
+            raise ValueError(f"Unknown setting: {key}")
+        if key == "PLAN_ONLY":
+            raise ValueError("Set 'plan' on the job instead of the PLAN_ONLY setting")
+        current = getattr(defaults, key)
+        try:
+            if isinstance(current, Enum):
+                e_type = type(current)
+                value = e_type[value] if isinstance(value, str) else e_type(value)
+            elif isinstance(current, bool):
+                if not isinstance(value, bool):
+                    raise TypeError
+            elif isinstance(current, int):
+                value = int(value)
+            elif isinstance(current, str):
+                if not isinstance(value, str):
+                    raise TypeError
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid value for {key}: {value!r}")
+        res[key] = value
+    return res
+
+
+@dataclass
+class BuildJob:
+    id: str
+    spec: JobSpec
+    folder: Path
+
+    future: Future | None = None
+    result: Path | None = None
+    warm_packs: int = 0
+    error: str | None = None
+    finished_at: float | None = None
+    # set once the outcome is recorded, the future resolves slightly before
+    finished: threading.Event = field(
+        default_factory=threading.Event, repr=False, compare=False
+    )
+
+    @property
+    def status(self) -> str:
+        if self.finished_at is not None:
+            return "failed" if self.error is not None else "done"
+        if (self.future is not None) and (self.future.running() or self.future.done()):
+            return "running"
+        return "queued"
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "plan": self.spec.plan,
+            "packs": self.spec.packs,
+            "warm_packs": self.warm_packs,
+            "result": self.result.name if self.result else None,
+            "error": self.error,
+        }
+
+    def _finish(self, future: Future) -> None:
+        try:
+            result, warm = future.result()
+            self.result = Path(result)
+            self.warm_packs = warm
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+        self.finished_at = time.time()
+        self.finished.set()
+
+
+# ============================================================
+# worker process side
+
+_worker_root: Path | None = None
+_warm: OrderedDict[tuple, _WarmPack] = OrderedDict()
+
+
+@dataclass
+class _WarmPack:
+    pack: Pack  # prepared and processed, not yet resolved
+    pristine: Path | None  # untouched copy of the pack folder, None if read in place
+    folder: Path  # where the pack folder is expected during a job
+
+
+def _init_worker(root: Path) -> None:
+    global _worker_root
+    _worker_root = root / "workers" / str(os.getpid())
+    shutil.rmtree(_worker_root, ignore_errors=True)
+    _worker_root.mkdir(parents=True)
+
+
+def _job_settings(values: dict[str, Any], plan: bool) -> CRSettings:
+    settings = CRSettings(MERGE_WORKERS=1)  # the job pool is the bound
+    for key, value in values.items():
+        setattr(settings, key, value)
+    settings.SHOW_HELPER_TEXT = False
+    settings.PLAN_ONLY = plan
+    return settings
+
+
+def _fingerprint(path: Path) -> tuple:
+    if not path.is_dir():
+        st = path.stat()
+        return (st.st_size, st.st_mtime_ns)
+    count = size = latest = 0
+    for dir_path, _, file_names in os.walk(path):
+        for f_name in file_names:
+            st = os.stat(os.path.join(dir_path, f_name))
+            count += 1
+            size += st.st_size
+            latest = max(latest, st.st_mtime_ns)
+    return (count, size, latest)
+
+
+def _run_job(spec: JobSpec, settings: dict[str, Any], folder: Path) -> tuple[str, int]:
+    """Runs in a pool process, returns (result path, warm pack count)"""
+    with open(folder / "log.txt", "w", encoding="utf-8") as log:
+        with contextlib.redirect_stdout(log):
+            combiner = _JobCombiner(
+                spec=spec,
+                root=_worker_root,
+                settings=_job_settings(settings, plan=spec.plan),
+            )
+            combiner.run()
+
+    output = _worker_root / "output"
+    if spec.plan:
+        source = output / DefaultNames.PLAN_FILE_NAME
+    else:
+        source = output / f"{DefaultNames.FINAL_PACK_NAME}.zip"
+    target = folder / source.name
+    shutil.copy(source, target)
+    return str(target), combiner.warm_packs
+
+
+class _JobCombiner(Combiner):
+    """Non-interactive combiner that reuses processed packs between jobs"""
+
+    def __init__(self, spec: JobSpec, root: Path, settings: CRSettings):
+        super().__init__(dir_name=root, settings=settings)
+        self.interactive = False
+        self.decisions = dict(spec.decisions)
+        self._load_order = list(spec.load_order)
+        # warm packs point into the extraction folder, keep it the same per worker
+        self.workspace_name = f"{RUN_PREFIX}worker_{os.getpid()}"
+
+        self._spec = spec
+        self._settings_key = repr(
+            sorted((k, v) for k, v in vars(settings).items() if k != "PLAN_ONLY")
+        )
+        self._cold: list[tuple[tuple, Pack]] = list()
+        self.warm_packs = 0
+
+    def _gather_packs(self) -> None:
+        for p_str in self._spec.packs:
+            f_path = Path(p_str)
+            key = (str(f_path), _fingerprint(f_path), self._settings_key)
+            if (warm := _warm.get(key)) is not None:
+                _warm.move_to_end(key)
+                if warm.pristine is not None:
+                    shutil.rmtree(warm.folder, ignore_errors=True)
+                    shutil.copytree(warm.pristine, warm.folder)
+                pack = copy.deepcopy(warm.pack)
+                pack.settings = self.settings
+                pack.events = self.events
+                self.warm_packs += 1
+            else:
+                pack = Pack(
+                    folder_location=f_path if f_path.is_dir() else None,
+                    zip_location=None if f_path.is_dir() else f_path,
+                    settings=self.settings,
+                    events=self.events,
+                )
+                self._cold.append((key, pack))
+            self.pack_paths.add(f_path)
+            self.packs.append(pack)
+
+    def _process(self) -> None:
+        for p in self.packs:
+            if not p.ready:
+                p._process(memory=self.memory)
+        self._keep_warm()
+        super()._process()
+
+    def _keep_warm(self) -> None:
+        for key, pack in self._cold:
+            if (not pack.ready) or (pack not in self.packs):
+                continue
+            pristine = None
+            if not pack.in_place:
+                # the export moves files out of extracted archives
+                pristine = _worker_root / "warm" / uuid.uuid4().hex
+                shutil.copytree(pack.folder_location, pristine)
+            _warm[key] = _WarmPack(
+                # the combiner, settings and event log are per job, leave them
+                # out of the copy
+                pack=copy.deepcopy(
+                    pack,
+                    memo={
+                        id(self): None,
+                        id(self.settings): None,
+                        id(self.events): None,
+                    },
+                ),
+                pristine=pristine,
+                folder=pack.folder_location,
+            )
+            while len(_warm) > WARM_PACK_LIMIT:
+                _, old = _warm.popitem(last=False)
+                if old.pristine is not None:
+                    shutil.rmtree(old.pristine, ignore_errors=True)
+
+
+# ============================================================
+# server side
+
+
+class BuildService:
+    """Queue of combine jobs, run on a bounded pool of worker processes.
+
+    Each worker has its own working folder and keeps the packs it has
+    processed, so repeated jobs over the same packs skip unpacking and
+    parsing.
+
+    Finished jobs are kept for `job_ttl` seconds, at most `keep_jobs` of
+    them, then forgotten and their folders deleted. Expired jobs are
+    collected whenever jobs are submitted or listed."""
+
+    def __init__(
+        self,
+        root: Path,
+        workers: int = 2,
+        keep_jobs: int = FINISHED_JOB_LIMIT,
+        job_ttl: float = FINISHED_JOB_TTL,
+    ):
+        self.root = root
+        self.workers = max(1, workers)
+        self.keep_jobs = max(0, keep_jobs)
+        self.job_ttl = job_ttl
+        self.jobs: dict[str, BuildJob] = dict()
+        self._lock = threading.Lock()
+
+        # results of an earlier service, no job refers to them anymore
+        shutil.rmtree(self.root / "jobs", ignore_errors=True)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.root,),
+        )
+
+    def submit(self, spec: JobSpec) -> BuildJob:
+        settings = coerce_settings(spec.settings)
+        job_id = uuid.uuid4().hex[:12]
+        job = BuildJob(id=job_id, spec=spec, folder=self.root / "jobs" / job_id)
+        job.folder.mkdir(parents=True)
+        with self._lock:
+            self.jobs[job_id] = job
+            job.future = self._pool.submit(_run_job, spec, settings, job.folder)
+        job.future.add_done_callback(job._finish)
+        self.evict()
+        return job
+
+    def get(self, job_id: str) -> BuildJob | None:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def all_jobs(self) -> list[BuildJob]:
+        self.evict()
+        with self._lock:
+            return list(self.jobs.values())
+
+    def remove(self, job_id: str) -> BuildJob | None:
+        """Forget `job_id` and delete its folder. A queued job is cancelled,
+        raises ValueError for a running one"""
+        with self._lock:
+            if (job := self.jobs.get(job_id)) is None:
+                return None
+            if (job.future is not None) and (not job.future.done()):
+                if not job.future.cancel():
+                    raise ValueError("Job is running")
+            del self.jobs[job_id]
+        shutil.rmtree(job.folder, ignore_errors=True)
+        return job
+
+    def evict(self) -> list[BuildJob]:
+        """Drop finished jobs past the TTL, then the oldest past `keep_jobs`"""
+        now = time.time()
+        with self._lock:
+            finished = sorted(
+                (j for j in self.jobs.values() if j.finished_at is not None),
+                key=lambda j: j.finished_at,
+            )
+            expired = [j for j in finished if (now - j.finished_at) > self.job_ttl]
+            kept = finished[len(expired) :]
+            expired += kept[: max(0, len(kept) - self.keep_jobs)]
+            for j in expired:
+                del self.jobs[j.id]
+        for j in expired:
+            shutil.rmtree(j.folder, ignore_errors=True)
+        return expired
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service: BuildService
+
+    def address_string(self) -> str:
+        # unix sockets have no client address
+        if isinstance(self.client_address, str):
+            return "local"
+        return super().address_string()
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if DEBUG:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: HTTPStatus, data: Any) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_file(self, path: Path, content_type: str) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(path.stat().st_size))
+        self.send_header("Content-Disposition", f'attachment; filename="{path.name}"')
+        self.end_headers()
+        with path.open("rb") as f:
+            shutil.copyfileobj(f, self.wfile, length=1 << 20)
+
+    def _route(self) -> tuple[list[str], dict[str, str]]:
+        path, _, query = self.path.partition("?")
+        parts = [p for p in path.split("/") if p]
+        params = dict(q.partition("=")[::2] for q in query.split("&") if q)
+        return parts, params
+
+    def do_GET(self) -> None:
+        parts, params = self._route()
+        if parts == ["health"]:
+            self._send_json(
+                HTTPStatus.OK,
+                {
+                    "status": "ok",
+                    "workers": self.service.workers,
+                    "jobs": len(self.service.jobs),
+                },
+            )
+            return
+        if parts == ["jobs"]:
+            self._send_json(
+                HTTPStatus.OK, [j.to_dict() for j in self.service.all_jobs()]
+            )
+            return
+        if (len(parts) < 2) or (parts[0] != "jobs"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+            return
+        if (job := self.service.get(parts[1])) is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown job"})
+            return
+
+        if len(parts) == 2:
+            self._send_json(HTTPStatus.OK, job.to_dict())
+        elif parts[2:] == ["log"]:
+            self._send_file(job.folder / "log.txt", "text/plain; charset=utf-8")
+        elif parts[2:] == ["result"]:
+            if params.get("wait") and (job.future is not None):
+                job.finished.wait()
+            if job.status == "failed":
+                self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, job.to_dict())
+            elif job.result is None:
+                self._send_json(HTTPStatus.CONFLICT, job.to_dict())
+            else:
+                content_type = "application/json" if job.spec.plan else "application/zip"
+                self._send_file(job.result, content_type)
+        else:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+
+    def do_POST(self) -> None:
+        parts, _ = self._route()
+        if parts != ["jobs"]:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            spec = JobSpec.from_json(json.loads(self.rfile.read(length) or b"null"))
+            job = self.service.submit(spec)
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+            return
+        self._send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    def do_DELETE(self) -> None:
+        parts, _ = self._route()
+        if (len(parts) != 2) or (parts[0] != "jobs"):
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown path"})
+            return
+        try:
+            job = self.service.remove(parts[1])
+        except ValueError as e:
+            self._send_json(HTTPStatus.CONFLICT, {"error": str(e)})
+            return
+        if job is None:
+            self._send_json(HTTPStatus.NOT_FOUND, {"error": "unknown job"})
+            return
+        self._send_json(HTTPStatus.OK, {"id": job.id, "deleted": True})
+
+
+class _TcpServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+# socketserver only defines UnixStreamServer where AF_UNIX exists, not on windows
+if hasattr(socket, "AF_UNIX"):
+    from socketserver import UnixStreamServer
+
+    class _UnixServer(ThreadingMixIn, UnixStreamServer):
+        daemon_threads = True
+
+else:
+    _UnixServer = None
+
+
+def serve(
+    root: Path,
+    port: int = DEFAULT_PORT,
+    socket_path: Path | None = None,
+    workers: int = 2,
+    keep_jobs: int = FINISHED_JOB_LIMIT,
+    job_ttl: float = FINISHED_JOB_TTL,
+) -> None:
+    """Serve on 127.0.0.1:`port`, or on the unix socket `socket_path`"""
+    if (socket_path is not None) and (_UnixServer is None):
+        raise ValueError("Unix sockets are not available on this platform")
+    service = BuildService(
+        root=root, workers=workers, keep_jobs=keep_jobs, job_ttl=job_ttl
+    )
+    handler = type("Handler", (_Handler,), {"service": service})
+    if socket_path is not None:
+        socket_path.unlink(missing_ok=True)
+        server = _UnixServer(str(socket_path), handler)
+        where = str(socket_path)
+    else:
+        server = _TcpServer(("127.0.0.1", port), handler)
+        where = f"http://127.0.0.1:{port}"
+
+    print(f"CobbleResolver build service on {where} ({service.workers} worker(s))")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        if socket_path is not None:
+            socket_path.unlink(missing_ok=True)
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="CobbleResolver serve")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--socket", type=Path, default=None, help="unix socket path")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--root",
+        type=Path,
+        default=Path(tempfile.gettempdir()) / "CobbleResolver_service",
+        help="working folder for jobs and warm packs",
+    )
+    parser.add_argument(
+        "--keep-jobs",
+        type=int,
+        default=FINISHED_JOB_LIMIT,
+        help="finished jobs kept with their results",
+    )
+    parser.add_argument(
+        "--job-ttl",
+        type=float,
+        default=FINISHED_JOB_TTL,
+        help="seconds a finished job is kept",
+    )
+    args = parser.parse_args(argv)
+    if (args.socket is not None) and (_UnixServer is None):
+        parser.error("--socket is not available on this platform, use --port")
+    serve(
+        root=args.root,
+        port=args.port,
+        socket_path=args.socket,
+        workers=args.workers,
+        keep_jobs=args.keep_jobs,
+        job_ttl=args.job_ttl,
+    )
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from utils.text_utils import bcolors, c_text
+
+GENERATED_SOURCE = "<generated>"
+
+
+@dataclass
+class PlannedFile:
+    path: str  # relative to the output pack
+    size: int
+    source: str  # pack the file comes from, or GENERATED_SOURCE
+
+
+@dataclass
+class PokemonPlan:
+    internal_name: str
+    name: str | None = None
+    dex_id: int | None = None
+
+    selection: str = "ADD"  # ADD / CHOOSE / MERGE
+    chosen_pack: str | None = None
+    sources: list[str] = field(default_factory=list)
+
+    files: list[PlannedFile] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        return sum(f.size for f in self.files)
+
+
+@dataclass
+class BuildPlan:
+    """What an export would write, gathered after resolution
+    without touching the output folder"""
+
+    mode: str
+    load_order: list[str] = field(default_factory=list)
+    pokemon: dict[str, PokemonPlan] = field(default_factory=dict)
+
+    def add(self, plan: PokemonPlan) -> PokemonPlan:
+        """Pokemon planned twice (moved and merged) share one entry"""
+        if (current := self.pokemon.get(plan.internal_name)) is None:
+            self.pokemon[plan.internal_name] = plan
+            return plan
+        current.files.extend(plan.files)
+        for s in plan.sources:
+            if s not in current.sources:
+                current.sources.append(s)
+        return current
+
+    def collisions(self) -> dict[str, list[str]]:
+        """Output paths planned by more than one pokemon"""
+        owners: dict[str, list[str]] = dict()
+        for pok_name, plan in self.pokemon.items():
+            for f in plan.files:
+                o = owners.setdefault(f.path, list())
+                if pok_name not in o:
+                    o.append(pok_name)
+        return {path: o for path, o in owners.items() if len(o) > 1}
+
+    def totals(self) -> dict[str, int]:
+        res: dict[str, int] = {
+            "pokemon": len(self.pokemon),
+            "files": len({f.path for p in self.pokemon.values() for f in p.files}),
+            "bytes": 0,
+        }
+        seen: dict[str, int] = dict()
+        for p in self.pokemon.values():
+            res[p.selection] = res.get(p.selection, 0) + 1
+            for f in p.files:
+                # a later move overwrites the earlier one, same as on export
+                seen[f.path] = f.size
+        res["bytes"] = sum(seen.values())
+        return res
+
+    def to_dict(self) -> dict:
+        return {
+            "mode": self.mode,
+            "load_order": self.load_order,
+            "totals": self.totals(),
+            "collisions": self.collisions(),
+            "pokemon": {
+                pok_name: asdict(plan) | {"size": plan.size}
+                for pok_name, plan in sorted(self.pokemon.items())
+            },
+        }
+
+    def write(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2))
+
+    def print_summary(self) -> None:
+        totals = self.totals()
+        modes = ", ".join(
+            f"{totals[k]} {k}" for k in ["ADD", "CHOOSE", "MERGE"] if k in totals
+        )
+        print(f"Plan: {totals['pokemon']} pokemon ({modes})")
+        print(f"Plan: {totals['files']} file(s), ~{totals['bytes']} bytes")
+        if collisions := self.collisions():
+            print(
+                c_text(
+                    f"Plan: {len(collisions)} path(s) written by more than one pokemon",
+                    color=bcolors.WARNING,
+                )
+            )
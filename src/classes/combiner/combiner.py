@@ -1,5 +1,6 @@
 import json
 import shutil
+from dataclasses import asdict
 from pathlib import Path
 from tkinter import filedialog
 from typing import Any, Iterable, Literal
@@ -7,22 +8,46 @@ from typing import Any, Iterable, Literal
 from classes.base_classes import LangResultEntry, PackHolder
 from classes.merge_data import Merger
 from classes.pack import Pack
+from classes.pack.base_snapshot import BaseSnapshot
+from classes.pack.file_table import FileTable
+from classes.pack_catalog import PackCatalog
+from classes.output_archive import OutputArchive
+from classes.output_writer import OutputWriter
 from classes.pokemon import Pokemon
 from classes.pokemon_form import PokemonForm
-from constants.runtime_const import gcr_settings, settings_menu
+from classes.workspace import Workspace
+from constants.runtime_const import DEBUG, CRSettings, gcr_settings, settings_menu
 from constants.text_constants import DefaultNames, HelperText
-from utils.cli_utils.generic import display_help_menu, line_header, pack_name_choice
+from utils.cli_utils.generic import (
+    display_help_menu,
+    line_header,
+    line_header_text,
+    pack_name_choice_text,
+)
 from utils.cli_utils.keypress import clear, clear_line, keypress, positive_int_choice
 from utils.cli_utils.reorder_list import reorder_menu
-from utils.get_resource import get_resource_path
+from utils.directory_utils import replace_text
+from utils.event_log import EventLog
+from utils.memory_profile import MemoryProfile
+from utils.get_resource import dump_json, get_resource_path
 from utils.text_utils import bcolors, c_text
 
+from .build_plan import GENERATED_SOURCE, BuildPlan, PlannedFile, PokemonPlan
 from .choice_rules import DualChoise_Risky, DualChoise_Simple
+from .decision_journal import DecisionJournal
 
 
 class Combiner:
-    def __init__(self, dir_name: Path | None = None):
+    def __init__(self, dir_name: Path | None = None, settings: CRSettings | None = None):
+        # per run, the global settings are only the CLI default
+        self.settings: CRSettings = settings if settings is not None else gcr_settings
+        self.events: EventLog = EventLog(settings=self.settings)
+        # None unless the MEMORY_PROFILE setting is on
+        self.memory: MemoryProfile | None = None
+
         self.extraction_path: str = ""
+        self.workspace: Workspace | None = None
+        self.workspace_name: str | None = None  # unique per run when None
 
         self.pack_paths: set[Path] = set()
         self.packs: list[Pack] = list()
@@ -32,7 +57,7 @@ class Combiner:
         # -----------------------
 
         if (not dir_name) or (not dir_name.exists()):
-            if gcr_settings.AUTO_START:
+            if self.settings.AUTO_START:
                 dir_name = self._get_working_dir()
                 if dir_name is None:
                     exit()
@@ -43,7 +68,11 @@ class Combiner:
         else:
             self.dir_name = dir_name
 
+        # staged in the run workspace, see `_open_workspace`
         self.output_pack_path = self.dir_name / "output" / "CORE_Pack"
+        self.output_writer = OutputWriter(
+            root=self.output_pack_path, settings=self.settings
+        )
 
         # -----------------------
 
@@ -54,33 +83,93 @@ class Combiner:
 
         self._load_order: list = list()
 
+        self._merger: Merger | None = None
+
+        # prompts are skipped when False, choices fall back to `decisions`,
+        # then to load order
+        self.interactive: bool = True
+        self.decisions: dict[str, str] = dict()  # pokemon -> pack name
+        # manual choices of earlier runs, interactive runs only
+        self.journal: DecisionJournal | None = None
+
     def run(self) -> None:
-        self._prep_output_path()
-        self._gather_packs()
-        self._prepare()
-        self._process()
-        self.export()
-        self._cleanup()
+        self._open_event_log()
+        self.memory = MemoryProfile.from_settings(self.settings)
+        self._open_workspace()
+        try:
+            if self.settings.PLAN_ONLY:
+                self._gather_packs()
+                self._prepare()
+                self._process()
+                self._write_plan()
+                return
+
+            self._prep_output_path()
+            self._gather_packs()
+            self._prepare()
+            self._process()
+            self.export()
+        finally:
+            self._cleanup()
+
+    def _open_event_log(self) -> None:
+        if self.settings.EVENT_LOG:
+            # next to the packs, "output" would be picked up as a pack folder
+            self.events.open(self.dir_name / DefaultNames.EVENT_LOG_FILE_NAME)
+
+    def _open_workspace(self) -> None:
+        self.workspace = Workspace.for_run(
+            working_dir=self.dir_name,
+            scratch_root=self.settings.SCRATCH_ROOT,
+            name=self.workspace_name,
+        ).open()
+        if self.workspace.reclaimed:
+            self.events.info(
+                "scratch_reclaimed",
+                f"Removed {self.workspace.reclaimed} scratch folder(s) left by "
+                "earlier runs",
+                root=self.workspace.root,
+            )
+        self.extraction_path = self.workspace.extraction_path
+        self.output_pack_path = self.workspace.staging_path / "CORE_Pack"
+
+    def _stage(self, name: str) -> None:
+        if self.memory is not None:
+            self.memory.mark(name)
+        self.events.info("stage", name, text=line_header_text(name))
 
     def _prep_output_path(self) -> None:
         try:
+            (self.dir_name / "output").mkdir(parents=True, exist_ok=True)
             if self.output_pack_path.exists():
                 if self.output_pack_path.is_dir():
                     shutil.rmtree(self.output_pack_path)
+            self.output_writer = OutputWriter(
+                root=self.output_pack_path, settings=self.settings
+            )
         except Exception:
             print("Failed preparing output folder")
             exit()
 
     def export(self) -> None:
-        line_header("Exporting")
+        self._stage("Exporting")
         for pack in self.packs:
             if pack.is_base or (pack.is_mod and (not self._process_mods)):
                 continue
-            if gcr_settings.POKEDEX_FIX:
+            if self.settings.POKEDEX_FIX:
                 pack._dirty_pokedex_fix()
             pack.export(
                 export_path=self.output_pack_path,
-                move_leftovers=self.output_pack_path.parent,
+                move_leftovers=self.dir_name / "output",
+                writer=self.output_writer,
+            )
+        self.output_writer.print_summary(verbose=DEBUG)
+        for c in self.output_writer.collisions:
+            self.events.info(
+                "collision",
+                f"{c.path}: {c.claimant} over {c.owner}, {c.action}",
+                console=False,
+                **asdict(c),
             )
 
         self._export_langs(folder_path=self.output_pack_path)
@@ -95,11 +184,99 @@ class Combiner:
 
         self._compress_pack(folder_path=self.output_pack_path)
 
+    def _write_plan(self) -> None:
+        self._stage("Planning")
+        plan = self._make_plan()
+        plan_path = self.dir_name / "output" / DefaultNames.PLAN_FILE_NAME
+        plan.write(plan_path)
+        plan.print_summary()
+        print(f"Plan written to {plan_path}")
+
+    def _make_plan(self) -> BuildPlan:
+        plan = BuildPlan(
+            mode=self.settings.OP_MODE.name, load_order=[p.name for p in self.packs]
+        )
+        for pack in self.packs:
+            if pack.is_base or (pack.is_mod and (not self._process_mods)):
+                continue
+            for pok_name, pok in pack.pokemon.items():
+                if not pok.selected:
+                    continue
+                sources = [p.name for p in self._packs_defining(pok_name)]
+                plan.add(
+                    PokemonPlan(
+                        internal_name=pok_name,
+                        name=pok.name,
+                        dex_id=pok.dex_id,
+                        selection="ADD" if (len(sources) == 1) else "CHOOSE",
+                        chosen_pack=pack.name,
+                        sources=sources,
+                        files=Combiner._planned_files(
+                            file_table=pack.files,
+                            file_ids=pok.get_all_export_paths(),
+                            source=pack.name,
+                        ),
+                    )
+                )
+
+        if self._merger is None:
+            return plan
+        for pok_name, merge_mon in self._merger.merged_mons.items():
+            files: list[PlannedFile] = list()
+            for s_mon, path_set, _ in self._merger._export_file_sets(merge_mon):
+                files.extend(
+                    Combiner._planned_files(
+                        file_table=s_mon.parent_pack.files,
+                        file_ids=path_set,
+                        source=s_mon.parent_pack.name,
+                    )
+                )
+            for rel_path, data in Merger._export_data_files(pok_name, merge_mon):
+                files.append(
+                    PlannedFile(
+                        path=rel_path,
+                        size=len(
+                            dump_json(data, indent=6, settings=self.settings).encode()
+                        ),
+                        source=GENERATED_SOURCE,
+                    )
+                )
+            plan.add(
+                PokemonPlan(
+                    internal_name=pok_name,
+                    name=merge_mon.name,
+                    dex_id=merge_mon.dex_id,
+                    selection="MERGE",
+                    chosen_pack=(
+                        merge_mon.picked_mon.parent_pack.name
+                        if merge_mon.picked_mon is not None
+                        else None
+                    ),
+                    sources=list(merge_mon.holder.mons.keys()),
+                    files=files,
+                )
+            )
+        return plan
+
+    @staticmethod
+    def _planned_files(
+        file_table: FileTable, file_ids: Iterable[int], source: str
+    ) -> list[PlannedFile]:
+        return [
+            PlannedFile(
+                path=file_table[f_id].rel_path,
+                size=file_table[f_id].size,
+                source=source,
+            )
+            for f_id in sorted(file_ids)
+            if not file_table[f_id].is_dir
+        ]
+
     def _get_icon(self) -> None:
         try:
             _icon = (
                 DefaultNames.ALT_ICON
-                if gcr_settings.ALTERNATE_ICON
+                if self.settings.ALTERNATE_ICON
                 else DefaultNames.ICON_NAME
             )
             icon_path = Path(get_resource_path(f"src/images/{_icon}.png"))
@@ -114,7 +291,7 @@ class Combiner:
         res_d: dict[str, LangResultEntry] = dict()
         _accounted_merge_picks: set[str] = set()
         for p in self.packs[::-1]:
-            if p.is_base or (p.is_mod and (not gcr_settings.PROCESS_MODS)):
+            if p.is_base or (p.is_mod and (not self.settings.PROCESS_MODS)):
                 continue
             l_es: list[LangResultEntry] = p._get_lang_export()
 
@@ -171,13 +348,15 @@ class Combiner:
                                 if _selected_att is not None:
                                     break
                             if _selected_att is None:
-                                if gcr_settings.SHOW_WARNINGS:
-                                    print(
-                                        c_text(
-                                            f"--! Found unmatched language entry: {l_key}",
-                                            color=bcolors.WARNING,
-                                        )
-                                    )
+                                msg = f"--! Found unmatched language entry: {l_key}"
+                                self.events.warning(
+                                    "unmatched_lang",
+                                    msg,
+                                    text=c_text(msg, color=bcolors.WARNING),
+                                    console=self.settings.SHOW_WARNINGS,
+                                    pack=p.name,
+                                    key=l_key,
+                                )
                             # if f"{entry.name}_{l_key}" not in _accounted_merge_picks:
                             #     res_d[entry.name].data[l_key] = l_entry
 
@@ -203,13 +382,16 @@ class Combiner:
         export_path = folder_path / "assets" / "cobblemon" / "lang"
         export_path.mkdir(parents=True, exist_ok=True)
         for l_entry in res_d.values():
-            (export_path / l_entry.name).write_text(json.dumps(l_entry.data, indent=4))
+            replace_text(
+                export_path / l_entry.name,
+                dump_json(l_entry.data, indent=4, settings=self.settings),
+            )
 
     def _export_sound_json(self, folder_path: Path):
         res = dict()
         _accounted_merge_picks: set[str] = set()
         for p in self.packs[::-1]:
-            if p.is_base or (p.is_mod and (not gcr_settings.PROCESS_MODS)):
+            if p.is_base or (p.is_mod and (not self.settings.PROCESS_MODS)):
                 continue
             for s_pok in p.pokemon.values():
                 if s_pok.selected:
@@ -224,12 +406,13 @@ class Combiner:
                             if s_key not in _accounted_merge_picks:
                                 res[s_key] = s_entry
 
-        (folder_path / "assets" / "cobblemon" / "sounds.json").write_text(
-            json.dumps(res, indent=4)
+        replace_text(
+            folder_path / "assets" / "cobblemon" / "sounds.json",
+            dump_json(res, indent=4, settings=self.settings),
         )
 
     def _write_credits(self, folder_path: Path) -> None:
-        (folder_path / "credits.txt").write_text(self._create_credits())
+        replace_text(folder_path / "credits.txt", self._create_credits())
 
     def _create_credits(self) -> str:
         res: dict[str, Iterable[str]] = dict()
@@ -265,59 +448,95 @@ class Combiner:
 
     def _write_pack_mcmeta(self, folder_path: Path) -> None:
         mc = self._get_pack_mcmeta()
-        (folder_path / "pack.mcmeta").write_text(json.dumps(mc))
+        replace_text(folder_path / "pack.mcmeta", json.dumps(mc))
 
     def _compress_pack(self, folder_path: Path) -> None:
+        archive = OutputArchive(
+            zip_path=self.dir_name / "output" / f"{DefaultNames.FINAL_PACK_NAME}.zip"
+        )
+        sources = self._archive_sources()
         for _ in range(3):
             try:
-                shutil.make_archive(
-                    str(folder_path.parent / DefaultNames.FINAL_PACK_NAME),
-                    format="zip",
-                    root_dir=str(folder_path),
-                )
+                archive.build(folder_path=folder_path, sources=sources)
+                archive.print_summary()
                 break
             except Exception:
+                if not self.interactive:
+                    raise
                 _ = input(
                     "Packaging failed.. If you have the pack open, \
     from a previous attempt please close it and retry.. Press [Enter] to retry"
                 )
 
+    def _archive_sources(self) -> dict[str, str]:
+        """Output entry -> name of the pack it was moved from"""
+        res: dict[str, str] = dict()
+        for rel, entry in self.output_writer.written.items():
+            if entry.source is None:
+                continue
+            for pack in self.packs:
+                if (pack.files is not None) and (
+                    pack.files.relative(entry.source) is not None
+                ):
+                    res[rel] = pack.name
+                    break
+        return res
+
     # ------------------------------------------------------------
 
     def _gather_packs(self) -> None:
         accepted_formats = [".zip", ".jar"]
+        scratch = self.workspace.root if self.workspace is not None else None
         for f_path in self.dir_name.iterdir():
             if (
-                f_path.is_dir() and f_path.stem != ".temp"
+                f_path.is_dir() and f_path.stem != ".temp" and f_path != scratch
             ) or f_path.suffix in accepted_formats:
                 self.pack_paths.add(f_path)
+                if (
+                    snap := BaseSnapshot.load_pack(
+                        source=f_path, settings=self.settings, events=self.events
+                    )
+                ) is not None:
+                    self.events.info(
+                        "base_snapshot",
+                        f"Using the snapshot of {f_path.name} as BASE",
+                        source=f_path,
+                    )
+                    self.packs.append(snap)
+                    continue
                 self.packs.append(
                     Pack(
                         folder_location=f_path if f_path.is_dir() else None,
                         zip_location=None if f_path.is_dir() else f_path,
+                        settings=self.settings,
+                        events=self.events,
                     )
                 )
 
     # ------------------------------------------------------------
 
     def _prepare(self) -> None:
-        line_header("Preparing")
-        self.extraction_path = self.dir_name / ".temp"
-        self.extraction_path.mkdir(parents=True, exist_ok=True)
+        self._stage("Preparing")
         for p in self.packs:
-            if p:
+            if p and (not p.ready):
                 try:
                     p._extraction_path = self.extraction_path
                     p._prepare()
                     print("")
                 except Exception as e:
-                    print("\n\n")
-                    print(f"{c_text(f"{'='*40}", color=bcolors.FAIL)}")
-
-                    print(f"Fatal error unpacking [{p.get_name()}] - ignoring pack.")
-                    print(f"\nError msg ->\n {e or '[missing]'}")
-
-                    print(f"{c_text(f"{'='*40}", color=bcolors.FAIL)}")
+                    msg = f"Fatal error unpacking [{p.get_name()}] - ignoring pack."
+                    self.events.error(
+                        "pack_failed",
+                        msg,
+                        text=(
+                            f"\n\n\n{c_text(f"{'='*40}", color=bcolors.FAIL)}\n"
+                            f"{msg}\n"
+                            f"\nError msg ->\n {e or '[missing]'}\n"
+                            f"{c_text(f"{'='*40}", color=bcolors.FAIL)}"
+                        ),
+                        pack=p.get_name(),
+                        error=repr(e),
+                    )
 
                     p.component_location = None
 
@@ -337,7 +556,10 @@ class Combiner:
             except Exception:
                 pass
 
-        self._menu()
+        if self.interactive:
+            self.journal = DecisionJournal(path=self.dir_name / "_decisions.json").load()
+            self._menu()
+            self._open_event_log()  # may have been turned on in the options
 
         self._reorder_packs()
 
@@ -372,7 +594,7 @@ class Combiner:
             elif _inp == "l" and _prep_flag:
                 self._edit_load_order()
             elif _inp == "o":
-                settings_menu(gcr_settings)
+                settings_menu(self.settings)
             elif _inp == "h":
                 display_help_menu()
 
@@ -407,8 +629,9 @@ class Combiner:
             _temp = [pack for pack in self.packs if pack.name == _name]
             if not _temp:
                 # maybe old load order?
-                if gcr_settings.SHOW_WARNINGS:
-                    print(c_text(f"--! Invalid entry in load order: {_name}"))
+                if self.settings.SHOW_WARNINGS:
+                    msg = f"--! Invalid entry in load order: {_name}"
+                    self.events.warning("load_order", msg, text=c_text(msg))
                 continue
             for i in _temp:
                 _new_order_list.append(i)
@@ -422,45 +645,79 @@ class Combiner:
 
     def _remove_empty_packs(self) -> None:
         flag = False
-        for p in self.packs:
+        for p in list(self.packs):
             if (not isinstance(p, Pack)) or (not bool(p.component_location)):
-                print(c_text(text=f"{p.get_name()} - ignored.", color=bcolors.FAIL))
-                flag = True
+                if not getattr(p, "skipped", False):
+                    self.events.warning(
+                        "pack_ignored",
+                        f"{p.get_name()} - ignored.",
+                        text=c_text(
+                            text=f"{p.get_name()} - ignored.", color=bcolors.FAIL
+                        ),
+                        pack=p.get_name(),
+                    )
+                    flag = True
                 self.packs.remove(p)
-        if flag:
+        if flag and self.interactive:
             _ = input("\n\nPress [Enter] to continue..")
 
     # ------------------------------------------------------------
 
     def _process(self) -> None:
-        line_header("Processing")
+        self._stage("Processing")
 
         for p in self.packs:
-            p._process()
+            if not p.ready:
+                p._process(memory=self.memory)
 
         for p in self.packs:
             self.defined_pokemon.update(list(p.pokemon.keys()))
 
-        line_header("Resolving")
+        self._stage("Resolving")
 
-        if gcr_settings.OP_MODE.value:
+        if self.settings.OP_MODE.value:
             self._merge_v_a()
         else:
             # self._resolution_core()
             self._resolution_greedy()
 
+        if self.journal is not None:
+            self.journal.write()
+            self.journal.print_summary()
+
+        if self.settings.CATALOG:
+            self._write_catalog()
+
+    def _write_catalog(self) -> None:
+        """Resolved packs, for querying after the run"""
+        catalog = PackCatalog(
+            db_path=self.dir_name / "output" / DefaultNames.CATALOG_FILE_NAME
+        ).open()
+        try:
+            for pack_id, p in enumerate(self.packs, start=1):
+                catalog.add_pack(p, pack_id=pack_id)
+            catalog.print_summary()
+        finally:
+            catalog.close()
+
+    def _packs_defining(self, pokemon_name: str) -> list[Pack]:
+        """Packs defining `pokemon_name`, in load order"""
+        return [p for p in self.packs if (pokemon_name in p.pokemon)]
+
+    def _pack_count(self, pokemon_name: str) -> int:
+        return len(self._packs_defining(pokemon_name))
+
     def _sort_pokemon_str(self, inp: Iterable[str]):
         return sorted(
             inp,
             key=lambda x: (
-                sum([1 for p in self.packs if (x in p.pokemon)]),
+                self._pack_count(x),
                 -(
                     int(
                         any(
                             [
                                 (p.pokemon[x]._is_actively_requested())
-                                for p in self.packs
-                                if (x in p.pokemon)
+                                for p in self._packs_defining(x)
                             ]
                         )
                     )
@@ -473,22 +730,21 @@ class Combiner:
                                 if p.pokemon[x]._is_actively_requested()
                                 else 0
                             )
-                            for p in self.packs
-                            if (x in p.pokemon)
+                            for p in self._packs_defining(x)
                         ]
                     )
                 ),
-                max([p.pokemon[x].evos for p in self.packs if (x in p.pokemon)]),
+                max([p.pokemon[x].evos for p in self._packs_defining(x)]),
                 (
-                    max([p.pokemon[x].pre_evos for p in self.packs if (x in p.pokemon)])
-                    + max([p.pokemon[x].evos for p in self.packs if (x in p.pokemon)])
+                    max([p.pokemon[x].pre_evos for p in self._packs_defining(x)])
+                    + max([p.pokemon[x].evos for p in self._packs_defining(x)])
                 ),
             ),
         )
 
     def _merge_v_a(self):
-        merger = Merger(attached_combiner=self)
-        merger.process()
+        self._merger = Merger(attached_combiner=self)
+        self._merger.process(export=(not self.settings.PLAN_ONLY))
 
     def _resolution_greedy(self) -> None:
         _to_check: set[str] = self.defined_pokemon.copy()
@@ -497,7 +753,7 @@ class Combiner:
         _to_check = self._sort_pokemon_str(inp=_to_check)
 
         for p_name in _to_check:
-            if sum([1 for p in self.packs if (p_name in p.pokemon)]) == 1:
+            if self._pack_count(p_name) == 1:
                 ph: PackHolder = self._make_pack_holder(pokemon_name=p_name)
 
                 pack, sel_type = self._single_simple_add(holder=ph.mons)
@@ -523,7 +779,7 @@ class Combiner:
             _num_flag = False
             _checked: set[str] = set()
             for p_name in _to_check:
-                if sum([1 for p in self.packs if (p_name in p.pokemon)]) == 2:
+                if self._pack_count(p_name) == 2:
                     _num_flag = True
                     ph: PackHolder = self._make_pack_holder(pokemon_name=p_name)
 
@@ -551,7 +807,7 @@ class Combiner:
 
             for p_name in _to_check:
                 if (
-                    sum([1 for p in self.packs if (p_name in p.pokemon)]) == 2
+                    self._pack_count(p_name) == 2
                 ):  # TODO fuckin optimize this, for the love of god
                     self._choose_pack(
                         pack_holder=self._make_pack_holder(pokemon_name=p_name)
@@ -576,23 +832,26 @@ class Combiner:
         d_num: int = 0
         d_name: str = ""
 
-        for pack in self.packs:
-            if pokemon_name in pack.pokemon.keys():
-                holder[pack.name] = pack.pokemon[pokemon_name]
-                if (holder[pack.name].dex_id != -1) and (not d_num) and (not d_name):
-                    d_num = holder[pack.name].dex_id
-                    d_name = holder[pack.name].name
+        for pack in self._packs_defining(pokemon_name):
+            holder[pack.name] = pack.pokemon[pokemon_name]
+            if (holder[pack.name].dex_id != -1) and (not d_num) and (not d_name):
+                d_num = holder[pack.name].dex_id
+                d_name = holder[pack.name].name
         if not d_name:
             d_name = (
                 list(holder.values())[0].name
                 or f"[{list(holder.values())[0].internal_name}]"
             )
         return PackHolder(
-            mons=holder, dex_num=d_num, name=d_name, internal_name=pokemon_name
+            mons=holder,
+            dex_num=d_num,
+            name=d_name,
+            internal_name=pokemon_name,
+            settings=self.settings,
         )
 
     def _resolution_core(self) -> None:
-        line_header("Resolving")
+        self._stage("Resolving")
         for pok_name in self.defined_pokemon:
             self._resolution_pokemon(pokemon_name=pok_name)
 
@@ -753,30 +1012,94 @@ class Combiner:
         selected_pack: str | None,
         selection_type: str = "M",
     ) -> None:
+        console = True
         if selected_pack is not None:
             x = [p for p in self.packs if p.name == selected_pack][0]
             if (x.is_base and (selection_type in ["A"])) or (
                 (x.is_mod and (not x.is_base)) and (not self._process_mods)
             ):
-                return
+                console = False
+
+        text = f"-- AUTO [{selection_type}] -- \n#{number} - {name}  [{selected_pack}]"
+        self.events.info(
+            "resolution",
+            f"#{number} - {name} -> {selected_pack}",
+            text=f"{text}\n{'=' * 25}",
+            console=console,
+            name=name,
+            dex_id=number,
+            pack=selected_pack,
+            selection=selection_type,
+        )
 
-        print(f"-- AUTO [{selection_type}] -- \n#{number} - {name}  [{selected_pack}]")
+    def _choose_pack(self, pack_holder: PackHolder):
+        mons: dict[str, Pokemon] = pack_holder.mons
+        keys = list(mons.keys())
 
-        print("=" * 25)
+        if (
+            decided := self._decided_pack(
+                pokemon_name=pack_holder.internal_name, keys=keys, mons=mons
+            )
+        ) is not None:
+            selected_key = decided
+        elif self.interactive:
+            selected_key = self._prompt_pack(pack_holder=pack_holder, keys=keys)
+            if self.settings.AUTO_LOAD_ORDER_MODE:  # actually asked
+                self._record_decision(
+                    pokemon_name=pack_holder.internal_name,
+                    mons={k: mons[k] for k in keys},
+                    pick=selected_key,
+                )
+        else:
+            selected_key = keys[0]
 
-    def _choose_pack(self, pack_holder: PackHolder):
+        mons[selected_key].select()
+        self.events.info(
+            "pick",
+            f"{pack_holder.internal_name} -> {selected_key}",
+            text=pack_name_choice_text(selected_key),
+            pokemon=pack_holder.internal_name,
+            pack=selected_key,
+        )
+        self._print_pack_choise(
+            number=pack_holder.dex_num,
+            name=pack_holder.name,
+            selected_pack=selected_key,
+            selection_type=c_text(text="=AUTO LOAD ORDER=", color=bcolors.WARNING),
+        )
+
+    def _decided_pack(
+        self,
+        pokemon_name: str | None,
+        keys: list[str],
+        mons: dict[str, Pokemon] | None = None,
+    ) -> str | None:
+        """Pack given in `decisions` for `pokemon_name`, if it is one of `keys`,
+        else the journaled choice if the candidates did not change"""
+        if (pick := self.decisions.get(pokemon_name)) in keys:
+            return pick
+        if (self.journal is not None) and (mons is not None):
+            return self.journal.lookup(
+                pokemon_name=pokemon_name, mons={k: mons[k] for k in keys}
+            )
+        return None
+
+    def _record_decision(
+        self, pokemon_name: str, mons: dict[str, Pokemon], pick: str
+    ) -> None:
+        if self.journal is not None:
+            self.journal.record(pokemon_name=pokemon_name, mons=mons, pick=pick)
+
+    def _prompt_pack(self, pack_holder: PackHolder, keys: list[str]) -> str:
         if not self.__helper_message_displayed and (
-            gcr_settings.SHOW_HELPER_TEXT and not gcr_settings.AUTO_LOAD_ORDER_MODE
+            self.settings.SHOW_HELPER_TEXT and not self.settings.AUTO_LOAD_ORDER_MODE
         ):
             print(HelperText.AUTO_MANUAL_CHOISE)
             _ = input("Press [Enter] to continue..")
             print(clear_line, end="")
             self.__helper_message_displayed = True
 
-        mons: dict[str, Pokemon] = pack_holder.mons
-        keys = list(mons.keys())
-
-        if gcr_settings.AUTO_LOAD_ORDER_MODE:
+        if self.settings.AUTO_LOAD_ORDER_MODE:
             print(str(pack_holder), end="")
             while True:
                 k_in = positive_int_choice(
@@ -793,15 +1116,7 @@ class Combiner:
             print("=" * 25)
         else:
             selected_key = keys[0]
-
-        mons[selected_key].select()
-        pack_name_choice(selected_key)
-        self._print_pack_choise(
-            number=pack_holder.dex_num,
-            name=pack_holder.name,
-            selected_pack=selected_key,
-            selection_type=c_text(text="=AUTO LOAD ORDER=", color=bcolors.WARNING),
-        )
+        return selected_key
 
     def _is_selected(self, pokemon_name: str) -> bool:
         return bool(
@@ -816,16 +1131,24 @@ class Combiner:
 
     # ------------------------------------------------------------
 
+    def _report_memory(self) -> None:
+        self.memory.stop()
+        self.memory.print_summary()
+        for s in self.memory.stages:
+            self.events.info(
+                "memory",
+                f"{s.stage}: peak {s.peak}, retained {s.retained} bytes",
+                console=False,
+                **asdict(s),
+            )
+
     def _cleanup(self) -> None:
-        try:
-            print("Deleting temporary folder")
-            shutil.rmtree(str(self.dir_name / ".temp"))
-        except Exception:
-            print(f"{clear_line} -Could not remove temporary folder")
-        print(clear_line, end="")
-        try:
-            print("Deleting intermefite folder")
-            shutil.rmtree(self.output_pack_path)
-        except Exception:
-            print(f"{clear_line} -Could not remove intermediate folder")
-        print(clear_line, end="")
+        if self.journal is not None:
+            # choices made before a failed or interrupted resolution
+            self.journal.write()
+        if self.memory is not None:
+            self._report_memory()
+        self.events.close()
+        if self.workspace is not None:
+            # extracted packs and the staged output, deleted in the background
+            self.workspace.release()
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from classes.pack.file_table import FileTable
+    from classes.pokemon import Pokemon
+
+
+@dataclass
+class JournalEntry:
+    pick: str
+    candidates: dict[str, str]  # pack name -> fingerprint of its pokemon
+
+
+@dataclass
+class DecisionJournal:
+    """Manual pack choices kept between runs.
+
+    A choice is replayed only while the candidate packs, and the content of
+    every file each of them holds for the pokemon, are the same as when it
+    was made. New choices are kept in memory until `write`"""
+
+    path: Path
+    entries: dict[str, JournalEntry] = field(default_factory=dict)
+
+    replayed: int = 0
+    recorded: int = 0
+
+    _pending: bool = False  # recorded since the last write
+    _digests: dict[Path, str] = field(default_factory=dict, repr=False)
+
+    def load(self) -> DecisionJournal:
+        try:
+            data = json.loads(self.path.read_text())
+            self.entries = {k: JournalEntry(**v) for k, v in data.items()}
+        except Exception:
+            self.entries = dict()
+        return self
+
+    def write(self) -> None:
+        if not self._pending:
+            return
+        self.path.write_text(
+            json.dumps({k: asdict(v) for k, v in sorted(self.entries.items())}, indent=3)
+        )
+        self._pending = False
+
+    # ------------------------------------------------------------
+
+    def lookup(self, pokemon_name: str, mons: dict[str, Pokemon]) -> str | None:
+        if (entry := self.entries.get(pokemon_name)) is None:
+            return None
+        if entry.candidates != self._candidates(mons):
+            return None
+        self.replayed += 1
+        return entry.pick
+
+    def record(self, pokemon_name: str, mons: dict[str, Pokemon], pick: str) -> None:
+        self.entries[pokemon_name] = JournalEntry(
+            pick=pick, candidates=self._candidates(mons)
+        )
+        self.recorded += 1
+        self._pending = True
+
+    def _candidates(self, mons: dict[str, Pokemon]) -> dict[str, str]:
+        return {
+            pack_name: self.fingerprint(mon) for pack_name, mon in sorted(mons.items())
+        }
+
+    def fingerprint(self, mon: Pokemon) -> str:
+        """Hash of the paths and contents of every file the pokemon uses"""
+        h = hashlib.sha1()
+        if (mon.parent_pack is None) or (mon.parent_pack.files is None):
+            return h.hexdigest()
+        files = mon.parent_pack.files
+        for rel_path, f_id in sorted(
+            (files[f_id].rel_path, f_id) for f_id in mon.get_all_paths()
+        ):
+            h.update(f"{rel_path}:{self._digest(files, f_id)}\n".encode())
+        return h.hexdigest()
+
+    def _digest(self, files: FileTable, file_id: int) -> str:
+        path = files.path(file_id)
+        if (res := self._digests.get(path)) is None:
+            try:
+                with open(path, "rb") as f:
+                    res = hashlib.file_digest(f, "sha1").hexdigest()
+            except OSError:
+                # directories, or a file that is gone, fall back to the size
+                res = f"size:{files[file_id].size}"
+            self._digests[path] = res
+        return res
+
+    def print_summary(self) -> None:
+        if self.replayed or self.recorded:
+            print(
+                f"Decisions: {self.replayed} replayed from {self.path.name}, "
+                f"{self.recorded} new"
+            )
@@ -1,26 +1,23 @@
 from dataclasses import dataclass, field
-from pathlib import Path
 
 
 @dataclass
 class EvolutionEntry:
     from_pokemon: str
     to_pokemon: str
-    file_path: Path
+    file_id: int
     is_addition: bool = False
 
     def __eq__(self, value: "EvolutionEntry") -> bool:
         return (
             (self.from_pokemon == value.from_pokemon)
             and (self.to_pokemon == value.to_pokemon)
-            and (self.file_path == value.file_path)
+            and (self.file_id == value.file_id)
             and (self.is_addition == value.is_addition)
         )
 
     def __hash__(self) -> int:
-        return hash(
-            (self.from_pokemon, self.to_pokemon, self.file_path, self.is_addition)
-        )
+        return hash((self.from_pokemon, self.to_pokemon, self.file_id, self.is_addition))
 
 
 @dataclass
@@ -1,26 +1,32 @@
 from __future__ import annotations
 
 import copy
-import json
-import shutil
+import os
+import traceback
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
 from classes.base_classes import PackHolder
+from classes.output_writer import MERGED_OWNER, OutputWriter
 from classes.pokemon import MergePokemon
-from constants.runtime_const import gcr_settings
+from constants.runtime_const import CRSettings, gcr_settings
 from constants.text_constants import DefaultNames, HelperText
-from utils.cli_utils.generic import pack_name_choice
+from utils.cli_utils.generic import pack_name_choice_text
 from utils.cli_utils.keypress import clear_line, keypress
+from utils.cli_utils.progress import StageProgress
 from utils.dict_utils import combine
 from utils.dict_utils_transitive import compare
-from utils.get_resource import load_json_from_path
+from utils.event_log import EventLog
+from utils.get_resource import dump_json, load_json_from_path
 from utils.text_utils import bcolors, c_text, next_candidate_name
 
 if TYPE_CHECKING:
     from classes.combiner.combiner import Combiner
+    from classes.pack.file_table import FileTable
     from classes.pokemon import Pokemon
 
 
@@ -74,6 +80,97 @@ class MergePackHolder:
     pick: str | None = None
 
 
+@dataclass
+class MergeFormInput:
+    """What the merge needs from a `PokemonForm`"""
+
+    name: str | None
+    merge_status: MergeStatus | None
+    species: dict | None = None
+    species_path: Path | None = None
+    species_additions: dict | None = None
+    species_additions_path: Path | None = None
+    spawn_files: list[tuple[int, Path]] = field(default_factory=list)
+    spawn_data: dict[int, dict] = field(default_factory=dict)  # already parsed
+
+    def get_species_paths_key(self) -> tuple[Path | None, Path | None]:
+        return (self.species_path, self.species_additions_path)
+
+
+@dataclass
+class MergeMonInput:
+    """What the merge needs from a `Pokemon`, small enough to send to a worker"""
+
+    pack_name: str
+    internal_name: str
+    is_base: bool
+    is_mod: bool
+    forms: dict[str, MergeFormInput] = field(default_factory=dict)
+    extracted_sa: dict | None = None
+
+    @classmethod
+    def from_pokemon(cls, mon: "Pokemon") -> MergeMonInput:
+        res = cls(
+            pack_name=mon.parent_pack.name,
+            internal_name=mon.internal_name,
+            is_base=mon.parent_pack.is_base,
+            is_mod=mon.parent_pack.is_mod,
+        )
+        for f_key, form in mon.forms.items():
+            f_in = MergeFormInput(name=form.name, merge_status=form.merge_status)
+            if form.species is not None:
+                f_in.species = form.species.source
+                f_in.species_path = form.species.file_path
+            if form.species_additions is not None:
+                f_in.species_additions = form.species_additions.source
+                f_in.species_additions_path = form.species_additions.file_path
+            f_in.spawn_files = [
+                (sp_id, form.parent_pack.files.path(sp_id)) for sp_id in form.spawn_pool
+            ]
+            f_in.spawn_data = {
+                sp_id: form.parent_pack.cached_data[sp_id]
+                for sp_id in form.spawn_pool
+                if sp_id in form.parent_pack.cached_data
+            }
+            res.forms[f_key] = f_in
+        return res
+
+
+@dataclass
+class MergeInput:
+    name: str
+    mons: dict[str, MergeMonInput]
+    settings: CRSettings
+
+
+@dataclass
+class MergeResult:
+    mons: dict[str, MergeMonInput]
+    merged_spawn_data: dict[str, Any] | None = None
+    extracted_addition: MergeDataOutput | None = None
+    error: str | None = None  # traceback of a failed merge, from the worker
+
+
+@dataclass
+class FinalSpeciesInput:
+    species_base: dict
+    extra_sas: list[dict]
+    pick_sa: dict | None = None
+    combine_moves: bool = True
+
+
+def _without_key(data: dict, key: str) -> dict:
+    """Shallow copy of `data` minus `key`. Parsed sources are never modified,
+    so nested values can be shared with them."""
+    return {k: v for k, v in data.items() if k != key}
+
+
+def merge_worker_count(settings: CRSettings) -> int:
+    if settings.MERGE_WORKERS > 0:
+        return settings.MERGE_WORKERS
+    return min(8, os.cpu_count() or 1)
+
+
 @dataclass
 class mOutputZ:
     _common_base_addition: dict
@@ -81,27 +178,72 @@ class mOutputZ:
 
 
 class Merger:
-    def __init__(self, attached_combiner: Optional["Combiner"] = None):
+    def __init__(
+        self,
+        attached_combiner: Optional["Combiner"] = None,
+        settings: CRSettings | None = None,
+    ):
         self._attached_combiner: Optional["Combiner"] = attached_combiner
+        if settings is None:
+            settings = (
+                attached_combiner.settings
+                if attached_combiner is not None
+                else gcr_settings
+            )
+        self.settings: CRSettings = settings
 
         self._mons_to_move: dict[str, PackHolder] = dict()
         self._mons_to_merge: dict[str, MergePackHolder] = dict()
 
         self.merged_mons: dict[str, MergePokemon] = dict()
 
-    def process(self, attached_combiner: Optional["Combiner"] = None):
+        self._executor: ProcessPoolExecutor | None = None
+
+    def process(
+        self, attached_combiner: Optional["Combiner"] = None, export: bool = True
+    ):
         self._attached_combiner = attached_combiner or self._attached_combiner
         if self._attached_combiner is None:
             raise RuntimeError
-        self._process()
-        self._merge_final_pokemon()
-
-        self._export_mons()
+        try:
+            self._process()
+            self._merge_final_pokemon()
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+        if export:
+            self._export_mons()
         # self._attached_combiner.export()
 
         # _ = input("--break--")
 
+    def _map(self, func: Callable[[Any], Any], items: list, label: str = "") -> list:
+        """`map` over a process pool, results in input order.
+        `func` has to be importable and `items` picklable"""
+        workers = merge_worker_count(self.settings)
+        if (workers <= 1) or (len(items) < 2):
+            results = map(func, items)
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=workers)
+            results = self._executor.map(
+                func, items, chunksize=max(1, len(items) // (workers * 4))
+            )
+
+        res: list = list()
+        with StageProgress(
+            stage="merge", label=label, total_items=len(items), unit="pokemon"
+        ) as progress:
+            for r in results:
+                res.append(r)
+                progress.advance()
+        return res
+
     def _merge_final_pokemon(self):
+        _final_inputs: list[FinalSpeciesInput] = list()
+        _picks: list[tuple[set[str], Optional["Pokemon"]]] = list()
         for pok_name, merge_holder in self._mons_to_merge.items():
             # print(pok_name)
 
@@ -139,35 +281,39 @@ class Merger:
             for ex in extras:
                 if ex_sa := merge_holder.original_holder.mons[ex]._extracted_sa:
                     extra_sas.append(ex_sa)
-            _final_species = self._merge_species_with_sas(
-                species=_species_base,
-                species_additions=extra_sas,
-                overwrite=False,
-                include=True,
-                exclude_graphics=True,
-            )
 
             # _merged_extras_sa = self._extract_against_common(
             #     common_base=_species_base,
             #     inpt_species={0: _merged_extras_sa},
             # )[0]
 
+            pick_sa = None
             if pick_mon:
                 if (not pick_mon.parent_pack.is_base) or (
-                    pick_mon.parent_pack.is_mod and (not gcr_settings.PROCESS_MODS)
+                    pick_mon.parent_pack.is_mod and (not self.settings.PROCESS_MODS)
                 ):
-                    _final_species = self._merge_species_with_sas(
-                        species=_final_species,
-                        species_additions=[pick_mon._extracted_sa],
-                        overwrite=True,
-                        include=True,
-                    )
+                    pick_sa = pick_mon._extracted_sa
+
+            _final_inputs.append(
+                FinalSpeciesInput(
+                    species_base=_species_base,
+                    extra_sas=extra_sas,
+                    pick_sa=pick_sa,
+                    combine_moves=self.settings.COMBINE_POKEMON_MOVES,
+                )
+            )
+            _picks.append((extras, pick_mon))
 
+        _final = self._map(Merger._final_species, _final_inputs, label="species")
+
+        for (pok_name, merge_holder), (extras, pick_mon), _final_species in zip(
+            self._mons_to_merge.items(), _picks, _final
+        ):
             # _final_sa["target"] = f"cobblemon:{pok_name}"
-            if gcr_settings.POKEDEX_FIX:
+            if self.settings.POKEDEX_FIX:
                 _final_species["implemented"] = True
                 if pick_mon:
-                    if pick_mon.is_pseudoform and gcr_settings.EXCLUDE_PSEUDOFORMS:
+                    if pick_mon.is_pseudoform and self.settings.EXCLUDE_PSEUDOFORMS:
                         _final_species["implemented"] = False
 
             outp = MergePokemon(
@@ -197,100 +343,176 @@ class Merger:
             #     outp.species_base = merge_holder.extracted_addition.extracted_base
             self.merged_mons[pok_name] = outp
 
-    def _export_mons(self, target_path: Path | None = None):
+    @staticmethod
+    def _final_species(f_input: FinalSpeciesInput) -> dict:
+        _final_species = Merger._merge_species_with_sas(
+            species=f_input.species_base,
+            species_additions=f_input.extra_sas,
+            overwrite=False,
+            include=True,
+            exclude_graphics=True,
+            combine_moves=f_input.combine_moves,
+        )
+        if f_input.pick_sa is not None:
+            _final_species = Merger._merge_species_with_sas(
+                species=_final_species,
+                species_additions=[f_input.pick_sa],
+                overwrite=True,
+                include=True,
+                combine_moves=f_input.combine_moves,
+            )
+        return _final_species
+
+    def _export_mons(
+        self, target_path: Path | None = None, writer: OutputWriter | None = None
+    ):
         if target_path is None:
             target_path = self._attached_combiner.output_pack_path
+            writer = writer or self._attached_combiner.output_writer
+        if writer is None:
+            writer = OutputWriter(root=target_path, settings=self.settings)
 
         for pok_name, merge_mon in self.merged_mons.items():
-            # move _other_ sounds first, _then_ we ll overwrite with selected
-            for s_mon in merge_mon.holder.mons.values():
-                if s_mon.parent_pack.is_base or (
-                    s_mon.parent_pack.is_mod and (not gcr_settings.PROCESS_MODS)
-                ):
-                    continue
-                sound_set: set[Path] = set()
-                if (merge_mon.picked_mon is not None) and (
-                    s_mon is merge_mon.picked_mon
-                ):
-                    continue
-                for s_form in s_mon.forms.values():
-                    if s_form.sound_entry is not None:
-                        sound_set.update(s_form.sound_entry.get_all_files())
+            for s_mon, path_set, prune in self._export_file_sets(merge_mon):
                 Merger._move_path_set_to_target(
-                    path_set=sound_set,
+                    path_set=path_set,
                     target_path=target_path,
-                    relative_to=s_mon.parent_pack.folder_location,
+                    file_table=s_mon.parent_pack.files,
+                    writer=writer,
+                    prune=prune,
+                    events=s_mon.parent_pack.events,
+                    owner=s_mon.parent_pack.name,
+                    keep_source=s_mon.parent_pack.in_place,
                 )
 
-            pok_path_set: set[Path] = set()
-            if merge_mon.picked_mon is not None:
-                if (merge_mon.picked_mon.parent_pack.is_base) or (
-                    merge_mon.picked_mon.parent_pack.is_mod
-                    and (not gcr_settings.PROCESS_MODS)
-                ):
-                    # skip graphics
-                    pass
-                else:
-                    for resv in merge_mon.picked_mon.resolvers.values():
-                        pok_path_set.update(resv.get_all_paths())
-                    for form in merge_mon.picked_mon.forms.values():
-                        if (sd := form.sound_entry) is not None:
-                            pok_path_set.update(sd.get_all_files())
-                    pok_path_set.update(
-                        merge_mon.picked_mon._get_relevant_feature_files()
-                    )
-
-                Merger._move_path_set_to_target(
-                    path_set=pok_path_set,
-                    target_path=target_path,
-                    relative_to=merge_mon.picked_mon.parent_pack.folder_location,
+            for rel_path, data in Merger._export_data_files(pok_name, merge_mon):
+                writer.write(
+                    data=dump_json(data, indent=6, settings=self.settings).encode(),
+                    target=target_path / rel_path,
+                    owner=MERGED_OWNER,
                 )
 
-            gen = merge_mon.holder._get_generation()
-            if not gen:
-                gen = "custom"
+    def _export_file_sets(
+        self,
+        merge_mon: MergePokemon,
+    ) -> list[tuple["Pokemon", set[int], dict[int, set[str]]]]:
+        """(pokemon, file ids, animation prune keys) to move for `merge_mon`,
+        in move order"""
+        res: list[tuple["Pokemon", set[int], dict[int, set[str]]]] = list()
+        # move _other_ sounds first, _then_ we ll overwrite with selected
+        for s_mon in merge_mon.holder.mons.values():
+            if s_mon.parent_pack.is_base or (
+                s_mon.parent_pack.is_mod and (not self.settings.PROCESS_MODS)
+            ):
+                continue
+            sound_set: set[int] = set()
+            if (merge_mon.picked_mon is not None) and (s_mon is merge_mon.picked_mon):
+                continue
+            for s_form in s_mon.forms.values():
+                if s_form.sound_entry is not None:
+                    sound_set.update(s_form.sound_entry.get_all_files())
+            res.append((s_mon, sound_set, dict()))
+
+        pok_path_set: set[int] = set()
+        prune: dict[int, set[str]] = dict()
+        if merge_mon.picked_mon is not None:
+            if (merge_mon.picked_mon.parent_pack.is_base) or (
+                merge_mon.picked_mon.parent_pack.is_mod
+                and (not self.settings.PROCESS_MODS)
+            ):
+                # skip graphics
+                pass
             else:
-                gen = f"generation{gen}"
-
-            data_path = target_path / "data" / "cobblemon"
-            if merge_mon.species_base is not None:
-                sp_path = data_path / "species" / gen / f"{pok_name}.json"
-                sp_path.parent.mkdir(parents=True, exist_ok=True)
-                sp_path.write_text(json.dumps(merge_mon.species_base, indent=6))
-            if merge_mon.species_addition is not None:
-                sp_path = data_path / "species_additions" / gen / f"{pok_name}.json"
-                sp_path.parent.mkdir(parents=True, exist_ok=True)
-                sp_path.write_text(json.dumps(merge_mon.species_addition, indent=6))
-            if merge_mon.spawn_pool is not None:
-                sp_path = (
-                    data_path
-                    / "spawn_pool_world"
-                    / f"{(int(merge_mon.dex_id)):04d}_{pok_name}.json"
-                )
-                sp_path.parent.mkdir(parents=True, exist_ok=True)
-                sp_path.write_text(json.dumps(merge_mon.spawn_pool, indent=6))
+                for resv in merge_mon.picked_mon.resolvers.values():
+                    pok_path_set.update(resv.get_all_paths())
+                for form in merge_mon.picked_mon.forms.values():
+                    if (sd := form.sound_entry) is not None:
+                        pok_path_set.update(sd.get_all_files())
+                pok_path_set.update(merge_mon.picked_mon._get_relevant_feature_files())
+                if self.settings.PRUNE_ANIMATIONS:
+                    prune = merge_mon.picked_mon.parent_pack._get_animation_prune_keys(
+                        pokemon=[merge_mon.picked_mon]
+                    )
+            res.append((merge_mon.picked_mon, pok_path_set, prune))
+        return res
 
-                pass
+    @staticmethod
+    def _export_data_files(
+        pok_name: str, merge_mon: MergePokemon
+    ) -> list[tuple[str, dict]]:
+        """(path relative to the output pack, data) of the merged json files"""
+        gen = merge_mon.holder._get_generation()
+        if not gen:
+            gen = "custom"
+        else:
+            gen = f"generation{gen}"
+
+        res: list[tuple[str, dict]] = list()
+        if merge_mon.species_base is not None:
+            res.append(
+                (f"data/cobblemon/species/{gen}/{pok_name}.json", merge_mon.species_base)
+            )
+        if merge_mon.species_addition is not None:
+            res.append(
+                (
+                    f"data/cobblemon/species_additions/{gen}/{pok_name}.json",
+                    merge_mon.species_addition,
+                )
+            )
+        if merge_mon.spawn_pool is not None:
+            res.append(
+                (
+                    "data/cobblemon/spawn_pool_world/"
+                    f"{(int(merge_mon.dex_id)):04d}_{pok_name}.json",
+                    merge_mon.spawn_pool,
+                )
+            )
+        return res
 
     @staticmethod
     def _move_path_set_to_target(
-        path_set: set[Path], target_path: Path, relative_to: Path
+        path_set: set[int],
+        target_path: Path,
+        file_table: "FileTable",
+        writer: OutputWriter | None = None,
+        prune: dict[int, set[str]] | None = None,
+        events: EventLog | None = None,
+        owner: str = "",
+        keep_source: bool = False,
     ):
-        for p in path_set:
-            if p:
-                if p.is_dir():
-                    print(f"[er] - {p}")  # TODO sometimes a "cobblemon\sounds\pokemon"
-                    continue  # appears here and fucks things up
-                np = target_path / p.relative_to(relative_to)
-                np.parent.mkdir(parents=True, exist_ok=True)
-                try:
-                    shutil.move(p, np)
-                except Exception:
-                    if np.exists():
-                        pass
-                    else:
-                        print(f"WARN: missed file: {(str(np))[:-25]}")
-                        pass
+        if writer is None:
+            writer = OutputWriter(root=target_path)
+        if events is None:
+            events = EventLog()
+        for file_id in path_set:
+            entry = file_table[file_id]
+            p = file_table.path(file_id)
+            if entry.is_dir:
+                # TODO sometimes a "cobblemon\sounds\pokemon"
+                events.warning("missed_file", f"[er] - {p}")
+                continue  # appears here and fucks things up
+            np = writer.claim(source=p, target=target_path / entry.rel_path, owner=owner)
+            np.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                if prune and (file_id in prune):
+                    writer.write_pruned_animations(
+                        source=p,
+                        target=np,
+                        drop=prune[file_id],
+                        owner=owner,
+                        keep_source=keep_source,
+                    )
+                else:
+                    writer.move(
+                        source=p, target=np, owner=owner, keep_source=keep_source
+                    )
+            except Exception:
+                if np.exists():
+                    pass
+                else:
+                    events.warning(
+                        "missed_file", f"WARN: missed file: {(str(np))[:-25]}", path=np
+                    )
 
     def _process(self):
         _to_check: set[str] = self._attached_combiner.defined_pokemon.copy()
@@ -300,11 +522,29 @@ class Merger:
 
         _to_check = self._attached_combiner._sort_pokemon_str(inp=_to_check)
 
+        _holders: dict[str, PackHolder] = dict()
+        _merge_inputs: list[MergeInput] = list()
         for pok_name in list(_to_check):  # [::-1]:
             ph: PackHolder = self._attached_combiner._make_pack_holder(
                 pokemon_name=pok_name
             )
+            _holders[pok_name] = ph
+            if len(ph) != 1:
+                _merge_inputs.append(
+                    Merger._make_merge_input(holder=ph, settings=self.settings)
+                )
+
+        # the heavy part runs for all contested pokemon at once,
+        # flags and choices are then applied here, in order
+        _merged = {
+            m_in.name: result
+            for m_in, result in zip(
+                _merge_inputs,
+                self._map(Merger._merge_input, _merge_inputs, label="data"),
+            )
+        }
 
+        for pok_name, ph in _holders.items():
             if pok_name in ["indeedee", "pyroar", "irontreads"]:
                 pass  # TODO debug
 
@@ -324,7 +564,9 @@ class Merger:
                     self._mons_to_move[pok_name] = ph
             else:
                 try:
-                    merge_data: MergePackHolder = Merger.merge(holder=ph)
+                    merge_data: MergePackHolder = Merger._apply_merge_result(
+                        holder=ph, result=_merged[pok_name]
+                    )
 
                     if (merge_data.choice_options is None) or (
                         len(merge_data.choice_options) == 1
@@ -354,17 +596,59 @@ class Merger:
                         _m_mon.merged = True
 
                     self._mons_to_merge[pok_name] = merge_data
-                except:
-                    pass  # WTF EVEN, lets fix that later
+                except Exception as e:
+                    # the pokemon is left out of the merge
+                    tb = _merged[pok_name].error or "".join(
+                        traceback.format_exception(e)
+                    )
+                    self._attached_combiner.events.error(
+                        "merge_failed",
+                        f"Merging [{pok_name}] failed, left out - "
+                        f"{tb.strip().splitlines()[-1]}",
+                        pokemon=pok_name,
+                        traceback=tb,
+                    )
 
         self.make_pack_choices(mon_packs=_needs_choice)
 
     def make_pack_choices(self, mon_packs: dict[str, MergePackHolder]):
+        combiner = self._attached_combiner
+        for pok_name, merge_holder in list(mon_packs.items()):
+            _, keys = merge_holder.original_holder._display(
+                only_graphics=True, exclude_merged=True
+            )
+            pick = combiner._decided_pack(
+                pokemon_name=pok_name,
+                keys=keys,
+                mons=merge_holder.original_holder.mons,
+            )
+            how = "decided"
+            if (pick is None) and (not combiner.interactive):
+                pick, how = keys[0], "load_order"
+            if pick is None:
+                continue
+            combiner.events.info(
+                "resolution",
+                f"{pok_name} -> {pick}",
+                text=pack_name_choice_text(pick),
+                pokemon=pok_name,
+                pack=pick,
+                selection="MERGE",
+                how=how,
+            )
+            merge_holder.pick = pick
+            self._mons_to_merge[pok_name] = merge_holder
+            del mon_packs[pok_name]
+
         _pok_names = list(mon_packs.keys())
         _ind = 0
         _max_ind = 0
 
-        if gcr_settings.SHOW_HELPER_TEXT and not gcr_settings.AUTO_LOAD_ORDER_MODE:
+        if (
+            combiner.interactive
+            and self.settings.SHOW_HELPER_TEXT
+            and not self.settings.AUTO_LOAD_ORDER_MODE
+        ):
             print(HelperText.AUTO_MANUAL_CHOISE)
             _ = input("Press [Enter] to continue..")
             print(clear_line, end="")
@@ -378,7 +662,7 @@ class Merger:
                 color=True, only_graphics=True, exclude_merged=True, show_merged=True
             )
             print(disp, end="\n\n")
-            if not gcr_settings.AUTO_LOAD_ORDER_MODE:  # for debugging purposes
+            if not self.settings.AUTO_LOAD_ORDER_MODE:  # for debugging purposes
                 _err = None
                 while True:
                     print(clear_line, end="")
@@ -406,12 +690,25 @@ class Merger:
 
                 if inp != "up":
                     pick = keys[inp - 1]
+                    combiner._record_decision(
+                        pokemon_name=pok_name,
+                        mons={k: merge_holder.original_holder.mons[k] for k in keys},
+                        pick=pick,
+                    )
             else:
                 pick = keys[0]
                 inp = ""
 
             if inp != "up":
-                pack_name_choice(pick)
+                combiner.events.info(
+                    "resolution",
+                    f"{pok_name} -> {pick}",
+                    text=pack_name_choice_text(pick),
+                    pokemon=pok_name,
+                    pack=pick,
+                    selection="MERGE",
+                    how="load_order" if self.settings.AUTO_LOAD_ORDER_MODE else "manual",
+                )
 
                 merge_holder.pick = pick
 
@@ -425,26 +722,65 @@ class Merger:
                 print("=" * 20)
 
     @staticmethod
-    def merge(holder: PackHolder, _process_mods: bool = gcr_settings.PROCESS_MODS):
-        merged_spawn: dict[str, Any] = Merger.merge_spawns(
-            mons=list(holder.mons.values()), _process_mods=_process_mods
+    def merge(holder: PackHolder, settings: CRSettings | None = None):
+        return Merger._apply_merge_result(
+            holder=holder,
+            result=Merger._merge_input(
+                Merger._make_merge_input(holder=holder, settings=settings)
+            ),
         )
-        path_to_species_index: None | MergeDataOutput = Merger.merge_data(
-            holder=holder, _process_mods=_process_mods
+
+    @staticmethod
+    def _make_merge_input(
+        holder: PackHolder, settings: CRSettings | None = None
+    ) -> MergeInput:
+        return MergeInput(
+            name=holder.internal_name,
+            mons={
+                pack_name: MergeMonInput.from_pokemon(mon)
+                for pack_name, mon in holder.mons.items()
+            },
+            settings=settings if settings is not None else holder.settings,
         )
+
+    @staticmethod
+    def _merge_input(m_input: MergeInput) -> MergeResult:
+        """Runs in a worker, only touches `m_input`"""
+        res = MergeResult(mons=m_input.mons)
+        try:
+            mons = list(m_input.mons.values())
+            res.merged_spawn_data = Merger.merge_spawns(
+                mons=mons, settings=m_input.settings
+            )
+            res.extracted_addition = Merger.merge_data(
+                mons=mons, settings=m_input.settings
+            )
+        except Exception:
+            res.error = traceback.format_exc()
+        return res
+
+    @staticmethod
+    def _apply_merge_result(holder: PackHolder, result: MergeResult) -> MergePackHolder:
+        for pack_name, m_in in result.mons.items():
+            mon = holder.mons[pack_name]
+            if m_in.extracted_sa is not None:
+                mon._extracted_sa = m_in.extracted_sa
+            for f_key, f_in in m_in.forms.items():
+                mon.forms[f_key].merge_status = f_in.merge_status
+        if result.error is not None:
+            raise RuntimeError(f"Merging [{holder.internal_name}] failed")
+
         options: None | list[str] = Merger.decide_from_viable_picks(mon_holder=holder)
 
         return MergePackHolder(
             original_holder=holder,
-            merged_spawn_data=merged_spawn,
-            extracted_addition=path_to_species_index,
+            merged_spawn_data=result.merged_spawn_data,
+            extracted_addition=result.extracted_addition,
             choice_options=options,
         )
 
     @staticmethod
-    def merge_spawns(
-        mons: list[Pokemon], _process_mods: bool = gcr_settings.PROCESS_MODS
-    ) -> dict[str, Any]:
+    def merge_spawns(mons: list[MergeMonInput], settings: CRSettings) -> dict[str, Any]:
         outp = {
             "enabled": True,
             "neededInstalledMods": set(),
@@ -452,28 +788,31 @@ class Merger:
             "spawns": list(),
         }
         spawns: dict[str, dict] = dict()
-        path_status: dict[Path, MergeST] = dict()
+        path_status: dict[tuple[str, int], MergeST] = dict()
 
         _proc_mons = [
             m
             for m in mons
             # if not (
-            #     (m.parent_pack.is_mod and (not _process_mods)) or m.parent_pack.is_base
+            #     (m.is_mod and (not settings.PROCESS_MODS)) or m.is_base
             # )   #TODO check- I THINK thats a better approach?..
         ]
-        _flat_forms = [f for m in _proc_mons for f in m.forms.values()]
+        _flat_forms = [(m, f) for m in _proc_mons for f in m.forms.values()]
 
-        for form in _flat_forms:
+        for mon, form in _flat_forms:
             flag = False
 
-            pok_name = form.parent_pokemon.internal_name
+            pok_name = mon.internal_name
 
-            for sp_path in form.spawn_pool:
-                if sp_path in path_status:
+            for sp_id, sp_path in form.spawn_files:
+                if (mon.pack_name, sp_id) in path_status:
                     continue
-                if not (
-                    data := load_json_from_path(sp_path)
-                ):  # TODO change to bcfo data
+                data = (
+                    copy.deepcopy(form.spawn_data[sp_id])
+                    if sp_id in form.spawn_data
+                    else load_json_from_path(sp_path)
+                )
+                if not data:  # TODO change to bcfo data
                     continue
                 flag = True
 
@@ -521,29 +860,30 @@ class Merger:
         return outp
 
     @staticmethod
-    def merge_data(holder: PackHolder, _process_mods: bool = gcr_settings.PROCESS_MODS):
-        mons = list(holder.mons.values())
+    def merge_data(mons: list[MergeMonInput], settings: CRSettings):
         _proc_mons = [
             m
             for m in mons
-            if not (
-                (m.parent_pack.is_mod and (not _process_mods)) or m.parent_pack.is_base
-            )
+            if not ((m.is_mod and (not settings.PROCESS_MODS)) or m.is_base)
         ]
         if not _proc_mons:
             return None
 
-        _base: Optional["Pokemon"] = None
-        if x := [m for m in mons if m.parent_pack.is_base]:
+        _base: MergeMonInput | None = None
+        if x := [m for m in mons if m.is_base]:
             _base = x[0]
 
         _extracted_base: mOutputW | None = None
         if _base is not None:
-            _base_form_species = _base.forms[DefaultNames.BASE_FORM].species.source
+            _base_form_species = _base.forms[DefaultNames.BASE_FORM].species
+            if _base_form_species is None:
+                raise ValueError(f"[{_base.pack_name}] has no base species")
 
             extracted_path_to_species: dict[tuple[Path | None, Path | None], dict] = (
                 Merger._extract_mons_data_from_common(
-                    base_form=_base_form_species, mons=_proc_mons
+                    base_form=_base_form_species,
+                    mons=_proc_mons,
+                    combine_moves=settings.COMBINE_POKEMON_MOVES,
                 )
             )
 
@@ -552,23 +892,27 @@ class Merger:
             for mon in mons:
                 for form in mon.forms.values():
                     if (form.species is not None) and (
-                        form.species.file_path not in _inp_species
+                        form.species_path not in _inp_species
                     ):
-                        _inp_species[form.species.file_path] = form.species.source
+                        _inp_species[form.species_path] = form.species
             _extracted_base = Merger._make_common_and_extract(
                 inpt_species=_inp_species,
                 inclussive=False,
+                strict_keys=settings.SPECIES_STRICT_KEY_MATCH,
             )
             extracted_path_to_species: dict[tuple[Path | None, Path | None], dict] = (
                 Merger._extract_mons_data_from_common(
                     base_form=_extracted_base._common_base,
                     mons=_proc_mons,
                     pre_extracted_species=_extracted_base.extracted_sas,
+                    combine_moves=settings.COMBINE_POKEMON_MOVES,
                 )
             )
 
         Merger.assign_merge_scores(
-            extracted_data=extracted_path_to_species, mons=_proc_mons
+            extracted_data=extracted_path_to_species,
+            mons=_proc_mons,
+            combine_moves=settings.COMBINE_POKEMON_MOVES,
         )
 
         return MergeDataOutput(
@@ -586,9 +930,13 @@ class Merger:
             return _g_keys
 
     @staticmethod
-    def assign_merge_scores(extracted_data: dict[Any, dict], mons: list["Pokemon"]):
+    def assign_merge_scores(
+        extracted_data: dict[Any, dict],
+        mons: list[MergeMonInput],
+        combine_moves: bool = True,
+    ):
         __ignored_keys = ["target", "dex_id", "evolutions", "forms"]
-        if gcr_settings.COMBINE_POKEMON_MOVES:
+        if combine_moves:
             __ignored_keys.append("moves")
         for mon in mons:
             for form in mon.forms.values():
@@ -625,8 +973,9 @@ class Merger:
     @staticmethod
     def _extract_mons_data_from_common(
         base_form: dict,
-        mons: list["Pokemon"],
+        mons: list[MergeMonInput],
         pre_extracted_species: dict[Path, dict] | None = None,
+        combine_moves: bool = True,
     ):
         path_to_species_index: dict[Path, dict] = dict()
         extracted_path_to_species = dict()
@@ -642,27 +991,28 @@ class Merger:
                     continue
 
                 if (key[0] is not None) and (key[1] is not None):
-                    _temp = form.species.source
+                    _temp = form.species
                     if pre_extracted_species is not None:
-                        _key = form.species.file_path
+                        _key = form.species_path
                         if _key in pre_extracted_species:
                             _temp = pre_extracted_species[_key]
 
                     path_to_species_index[key] = Merger._merge_species_with_sas(
                         species=_temp,
-                        species_additions=[form.species_additions.source],
+                        species_additions=[form.species_additions],
                         overwrite=True,
                         include=True,
+                        combine_moves=combine_moves,
                     )
                 else:
                     if form.species is not None:
-                        _temp = form.species.source
+                        _temp = form.species
                         if pre_extracted_species is not None:
-                            _key = form.species.file_path
+                            _key = form.species_path
                             if _key in pre_extracted_species:
                                 _temp = pre_extracted_species[_key]
                     else:
-                        _temp = form.species_additions.source
+                        _temp = form.species_additions
                     path_to_species_index[key] = _temp
                 mon_form_keys.add(key)
 
@@ -689,14 +1039,16 @@ class Merger:
                             species_additions=mon_sa,
                             overwrite=True,  # shouldnt matter
                             include=True,
+                            combine_moves=combine_moves,
                         )
-                mon._extracted_sa = _final_sa
+                mon.extracted_sa = _final_sa
         return extracted_path_to_species
 
     @staticmethod
     def _make_common_and_extract(
         inpt_species: dict[Any, dict],
         inclussive: bool | None = None,
+        strict_keys: bool = False,
     ) -> mOutputW:  # inclusive etc - and then change the if bellow
         """Out of multiple species extract a common -BASE-"""
 
@@ -708,7 +1060,7 @@ class Merger:
 
         for c_key in _all_keys:
             if all([(c_key in sp) for sp in inpt_species.values()]) or (
-                inclussive or (not gcr_settings.SPECIES_STRICT_KEY_MATCH)
+                inclussive or (not strict_keys)
             ):
                 val = [sp[c_key] for sp in inpt_species.values() if c_key in sp]
                 if compare(*val, loose=True):
@@ -812,9 +1164,7 @@ class Merger:
         for ev in base_pok_evos:
             if (ev_id := ev.get("id", None)) is None:
                 continue
-            ev_data = copy.deepcopy(ev)
-            del ev_data["id"]
-            _base_ev[ev_id] = ev_data
+            _base_ev[ev_id] = _without_key(ev, "id")
 
         _registered_ids.update(list(_base_ev.keys()))
 
@@ -823,8 +1173,7 @@ class Merger:
             for ev in sp_pok:
                 if (ev_id := ev.get("id", None)) is None:
                     continue
-                ev_data = copy.deepcopy(ev)
-                del ev_data["id"]
+                ev_data = _without_key(ev, "id")
 
                 if not any(
                     [compare(val, ev_data, loose=True) for val in _base_ev.values()]
@@ -846,19 +1195,16 @@ class Merger:
         overwrite: bool = True,
         include: bool = True,
         exclude_graphics: bool = False,
+        combine_moves: bool = True,
     ):
         _special_form_keys = ["forms", "evolutions"]
         _graphical_keys = ["behaviour", "baseScale", "hitbox", "height"]
         _outp = {x: y for x, y in species.items()}
 
-        _all_keys = list(
-            set([key for sp_ad in species_additions for key in sp_ad.keys()])
-        )
+        _key_counts = Counter(key for sp_ad in species_additions for key in sp_ad.keys())
+        _all_keys = list(set(_key_counts))
 
-        _all_keys = sorted(
-            _all_keys,
-            key=lambda x: (-sum([(x in sp_ad) for sp_ad in species_additions])),
-        )
+        _all_keys = sorted(_all_keys, key=lambda x: -_key_counts[x])
 
         for key in _all_keys:
             if (
@@ -874,7 +1220,7 @@ class Merger:
                 vals.insert(0, species[key])
             if compare(*vals, loose=True):
                 _outp[key] = vals[0]
-            elif (key == "moves") and gcr_settings.COMBINE_POKEMON_MOVES:
+            elif (key == "moves") and combine_moves:
                 _temp_out = set()
                 _temp_out.update(species.get("moves", list()))
                 for _v in vals:
@@ -882,9 +1228,10 @@ class Merger:
                 _outp[key] = list(_temp_out)
             else:
                 try:
-                    _most_common = max(set(vals), key=vals.count)
+                    _val_counts = Counter(vals)
+                    _most_common = max(set(vals), key=_val_counts.__getitem__)
                     _outp[key] = _most_common
-                except TypeError:
+                except TypeError:  # unhashable values (lists, dicts)
                     if include:
                         if isinstance(vals[0], (list, set, dict)):
                             _outp[key] = combine(*vals)
@@ -900,6 +1247,7 @@ class Merger:
             species_additions=[sa.get("forms", list()) for sa in species_additions],
             overwrite=overwrite,
             include=include,
+            combine_moves=combine_moves,
         )
         # ------------------------------------------------------------------------
         _outp["evolutions"] = Merger._merge_evolutions_with_form_additions(
@@ -920,13 +1268,11 @@ class Merger:
     ):
         _outp: dict[str, dict] = dict()
         for evo in species:
-            _outp[evo["id"]] = copy.deepcopy(evo)
-            del _outp[evo["id"]]["id"]
+            _outp[evo["id"]] = _without_key(evo, "id")
         for sp in species_additions:
             for evo in sp:
-                temp = copy.deepcopy(evo)
-                id = temp["id"]
-                del temp["id"]
+                id = evo["id"]
+                temp = _without_key(evo, "id")
                 if id in _outp:
                     if overwrite:
                         _outp[id] = temp
@@ -958,6 +1304,7 @@ class Merger:
         overwrite: bool = False,
         include: bool = True,
         exclude_graphics: bool = False,
+        combine_moves: bool = True,
     ) -> list:
         _base_forms = {form["name"]: form for form in species}
         _all_forms: dict[str, list[dict]] = dict()
@@ -982,6 +1329,7 @@ class Merger:
                         overwrite=overwrite,
                         include=include,
                         exclude_graphics=exclude_graphics,
+                        combine_moves=combine_moves,
                     )
             else:
                 _base_forms[_key] = Merger._merge_species_with_sas(
@@ -990,6 +1338,7 @@ class Merger:
                     overwrite=overwrite,
                     include=include,
                     exclude_graphics=exclude_graphics,
+                    combine_moves=combine_moves,
                 )
         return list(_base_forms.values())
 
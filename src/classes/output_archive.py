@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import zipfile
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from utils.cli_utils.progress import StageProgress
+
+GENERATED_SOURCE = "<generated>"
+
+
+@dataclass
+class ArchiveEntry:
+    digest: str
+    size: int
+    source: str = GENERATED_SOURCE
+
+
+@dataclass
+class OutputArchive:
+    """Zips the output folder next to a manifest of its entries.
+
+    When the previous zip and its manifest are still around, entries whose
+    hash and size did not change are copied over still compressed, only new
+    or changed files go through deflate again."""
+
+    zip_path: Path
+
+    entries: dict[str, ArchiveEntry] = field(default_factory=dict)
+
+    reused: int = 0
+    rewritten: int = 0
+    removed: int = 0
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.zip_path.with_name(f"{self.zip_path.stem}.manifest.json")
+
+    def load_manifest(self) -> dict[str, ArchiveEntry]:
+        try:
+            data = json.loads(self.manifest_path.read_text())
+            return {k: ArchiveEntry(**v) for k, v in data.get("entries", dict()).items()}
+        except Exception:
+            return dict()
+
+    def write_manifest(self) -> None:
+        self.manifest_path.write_text(
+            json.dumps(
+                {"entries": {k: asdict(v) for k, v in sorted(self.entries.items())}},
+                indent=1,
+            )
+        )
+
+    # ------------------------------------------------------------
+
+    def build(self, folder_path: Path, sources: dict[str, str] | None = None) -> None:
+        """Write `folder_path` to the zip. `sources` maps an entry to the pack
+        it came from, for the manifest"""
+        sources = sources or dict()
+        previous = self.load_manifest()
+        self.entries = dict()
+        self.reused = self.rewritten = self.removed = 0
+
+        old_zip: zipfile.ZipFile | None = None
+        if previous and self.zip_path.exists():
+            try:
+                old_zip = zipfile.ZipFile(self.zip_path, "r")
+            except (OSError, zipfile.BadZipFile):
+                old_zip = None
+
+        # per process, concurrent runs on one folder each write their own
+        tmp_path = self.zip_path.with_name(f"{self.zip_path.name}.{os.getpid()}.tmp")
+        try:
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                members = OutputArchive._walk(folder_path)
+                with StageProgress(
+                    stage="compress",
+                    label=self.zip_path.name,
+                    total_items=len(members),
+                    total_bytes=sum(
+                        path.stat().st_size for path, _ in members if not path.is_dir()
+                    ),
+                ) as progress:
+                    for path, arcname in members:
+                        if path.is_dir():
+                            zf.write(path, arcname)
+                            continue
+                        entry = ArchiveEntry(
+                            digest=OutputArchive._digest(path),
+                            size=path.stat().st_size,
+                            source=sources.get(arcname, GENERATED_SOURCE),
+                        )
+                        self.entries[arcname] = entry
+                        progress.advance(nbytes=entry.size)
+
+                        old = previous.get(arcname)
+                        if (
+                            (old_zip is not None)
+                            and (old is not None)
+                            and (old.digest == entry.digest)
+                            and (old.size == entry.size)
+                            and OutputArchive._copy_raw(old_zip, zf, arcname)
+                        ):
+                            self.reused += 1
+                        else:
+                            zf.write(path, arcname)
+                            self.rewritten += 1
+        finally:
+            if old_zip is not None:
+                old_zip.close()
+
+        self.removed = len(set(previous).difference(self.entries))
+        os.replace(tmp_path, self.zip_path)
+        self.write_manifest()
+
+    @staticmethod
+    def _walk(folder_path: Path) -> list[tuple[Path, str]]:
+        res: list[tuple[Path, str]] = list()
+        for dir_path, dir_names, file_names in os.walk(folder_path):
+            dir_names.sort()
+            d = Path(dir_path)
+            if d != folder_path:
+                res.append((d, f"{d.relative_to(folder_path).as_posix()}/"))
+            for f_name in sorted(file_names):
+                res.append(
+                    (d / f_name, (d / f_name).relative_to(folder_path).as_posix())
+                )
+        return res
+
+    @staticmethod
+    def _digest(path: Path) -> str:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha1").hexdigest()
+
+    @staticmethod
+    def _copy_raw(src: zipfile.ZipFile, dst: zipfile.ZipFile, arcname: str) -> bool:
+        """Copy the compressed bytes of `arcname` from `src` to `dst`"""
+        try:
+            info = src.getinfo(arcname)
+        except KeyError:
+            return False
+        if info.flag_bits & 0x01:  # encrypted
+            return False
+
+        src.fp.seek(info.header_offset)
+        header = src.fp.read(zipfile.sizeFileHeader)
+        if len(header) != zipfile.sizeFileHeader:
+            return False
+        fheader = struct.unpack(zipfile.structFileHeader, header)
+        if fheader[zipfile._FH_SIGNATURE] != zipfile.stringFileHeader:
+            return False
+        src.fp.seek(
+            fheader[zipfile._FH_FILENAME_LENGTH]
+            + fheader[zipfile._FH_EXTRA_FIELD_LENGTH],
+            1,
+        )
+        raw = src.fp.read(info.compress_size)
+
+        new_info = zipfile.ZipInfo(filename=arcname, date_time=info.date_time)
+        new_info.compress_type = info.compress_type
+        new_info.external_attr = info.external_attr
+        new_info.create_system = info.create_system
+        new_info.CRC = info.CRC
+        new_info.compress_size = info.compress_size
+        new_info.file_size = info.file_size
+        new_info.header_offset = dst.fp.tell()
+
+        dst.fp.write(new_info.FileHeader())
+        dst.fp.write(raw)
+        dst.start_dir = dst.fp.tell()
+        dst.filelist.append(new_info)
+        dst.NameToInfo[arcname] = new_info
+        return True
+
+    def print_summary(self) -> None:
+        print(
+            f"Archive: {self.rewritten} entries compressed, {self.reused} reused "
+            f"from the previous zip, {self.removed} removed"
+        )
@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import hashlib
+import shutil
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+
+from constants.runtime_const import CRSettings
+from utils.directory_utils import link_or_copy
+from utils.get_resource import dump_json, load_json_from_path
+from utils.text_utils import bcolors, c_text
+
+MERGED_OWNER = "<merged>"  # owner of files the merger builds in memory
+
+
+@dataclass
+class OutputEntry:
+    digest: str
+    size: int
+    source: Path | None = None  # None for content generated in memory
+    owner: str = ""  # pack the file came from
+
+
+@dataclass
+class OutputCollision:
+    path: str
+    owner: str  # who claimed `path` first
+    claimant: str
+    action: str  # identical / merged / renamed / overwritten
+    renamed_to: str | None = None
+
+
+@dataclass
+class OutputWriter:
+    """Moves assets into the output folder, keeping track of what was written.
+
+    Every outgoing file is hashed. A file whose bytes are already present under
+    the same output path is written once, the repeated move is skipped.
+
+    `written` doubles as the registry of claimed output paths, duplicates are
+    resolved against it (see `claim`) without looking at the output folder."""
+
+    root: Path
+    settings: CRSettings | None = None
+
+    written: dict[str, OutputEntry] = field(default_factory=dict)
+    collisions: list[OutputCollision] = field(default_factory=list)
+
+    skipped: int = 0
+    bytes_saved: int = 0
+    overwritten: int = 0
+
+    pruned_files: int = 0
+    pruned_animations: int = 0
+    # output path -> (digest of the source file, animation keys dropped from it)
+    pruned: dict[str, tuple[str, set[str]]] = field(default_factory=dict)
+
+    # files placed from read-only packs, by method (reflink / hardlink / copy)
+    linked: Counter = field(default_factory=Counter)
+
+    @staticmethod
+    def _digest(path: Path) -> str:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha1").hexdigest()
+
+    def _relative(self, path: Path) -> str | None:
+        try:
+            return path.relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    def is_identical(self, source: Path, target: Path) -> bool:
+        """True if `target` was written by us with the same bytes as `source`"""
+        if (rel := self._relative(target)) is None:
+            return False
+        if (entry := self.written.get(rel)) is None:
+            return False
+        try:
+            if entry.size != source.stat().st_size:
+                return False
+            return entry.digest == self._digest(source)
+        except OSError:
+            return False
+
+    def claim(
+        self, source: Path, target: Path, owner: str, keep_both: bool = False
+    ) -> Path:
+        """Output path to move `source` to. When `target` was already written
+        with other content, `keep_both` picks the next free name instead of
+        overwriting it, unless one of the earlier renames holds the same bytes.
+        Every repeated claim is kept in `collisions`"""
+        if ((rel := self._relative(target)) is None) or (
+            (entry := self.written.get(rel)) is None
+        ):
+            return target
+
+        collision = OutputCollision(
+            path=rel, owner=entry.owner, claimant=owner, action="overwritten"
+        )
+        self.collisions.append(collision)
+        original = candidate = PurePosixPath(rel)
+        n = 0
+        while candidate.as_posix() in self.written:
+            if self.is_identical(source=source, target=self.root / candidate):
+                collision.action = "identical"
+                break
+            if self._is_pruned_from(rel=candidate.as_posix(), source=source):
+                collision.action = "merged"  # see `write_pruned_animations`
+                break
+            if not keep_both:
+                return target
+            n += 1
+            # numbered after the original stem, "0025_pikachu" is kept as is
+            candidate = original.with_stem(f"{original.stem}-{n}")
+        else:
+            collision.action = "renamed"
+
+        if candidate.as_posix() != rel:
+            collision.renamed_to = candidate.as_posix()
+        return self.root / candidate
+
+    def move(
+        self, source: Path, target: Path, owner: str = "", keep_source: bool = False
+    ) -> bool:
+        """Move `source` to `target`, returns False if the move was skipped
+        because `target` already holds identical content, `source` is then
+        removed all the same. With `keep_source` the file is linked or copied
+        instead and `source` is never touched, see `link_or_copy`"""
+        rel = self._relative(target)
+        size = source.stat().st_size
+        digest = self._digest(source)
+
+        # the whole file replaces a pruned copy of it, nothing is lost
+        if ((prev := self.pruned.get(rel)) is not None) and (prev[0] == digest):
+            self._forget_pruned(rel)
+        if self._is_written(rel=rel, digest=digest, size=size, target=target):
+            if not keep_source:
+                source.unlink(missing_ok=True)
+            return False
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if keep_source:
+            self.linked[link_or_copy(source=source, target=target)] += 1
+        else:
+            # a hardlink at `target` must be replaced, not written through
+            target.unlink(missing_ok=True)
+            shutil.move(source, target)
+        if rel is not None:
+            self.written[rel] = OutputEntry(
+                digest=digest, size=size, source=source, owner=owner
+            )
+        return True
+
+    def write(
+        self, data: bytes, target: Path, source: Path | None = None, owner: str = ""
+    ) -> bool:
+        """Same as `move`, for content generated in memory"""
+        rel = self._relative(target)
+        size = len(data)
+        digest = hashlib.sha1(data).hexdigest()
+
+        if self._is_written(rel=rel, digest=digest, size=size, target=target):
+            return False
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.unlink(missing_ok=True)
+        target.write_bytes(data)
+        if rel is not None:
+            self.written[rel] = OutputEntry(
+                digest=digest, size=size, source=source, owner=owner
+            )
+        return True
+
+    def write_pruned_animations(
+        self,
+        source: Path,
+        target: Path,
+        drop: set[str],
+        owner: str = "",
+        keep_source: bool = False,
+    ):
+        """Write the animation file `source` without the animation keys in `drop`.
+
+        Pokemon of one family often share an animation file, and each
+        exporter only knows the keys its own pokemon use. When the same
+        source was already written to `target`, only the keys dropped by
+        every writer are dropped, the file is rewritten with the rest"""
+        rel = self._relative(target)
+        digest = self._digest(source)
+        if (rel is not None) and ((entry := self.written.get(rel)) is not None):
+            if entry.digest == digest:
+                # already written whole
+                self.skipped += 1
+                self.bytes_saved += entry.size
+                return
+            if ((prev := self.pruned.get(rel)) is not None) and (prev[0] == digest):
+                drop = drop & prev[1]
+                self._forget_pruned(rel)
+
+        data = load_json_from_path(source)
+        anims = data.get("animations", dict())
+        if not (drop and data and isinstance(anims, dict)):
+            self.move(source=source, target=target, owner=owner, keep_source=keep_source)
+            return
+
+        data["animations"] = {k: v for k, v in anims.items() if k not in drop}
+        self.write(
+            data=dump_json(data, indent=4, settings=self.settings).encode(),
+            target=target,
+            source=source,
+            owner=owner,
+        )
+        if rel is not None:
+            self.pruned[rel] = (digest, set(anims).intersection(drop))
+        self.pruned_files += 1
+        self.pruned_animations += len(anims) - len(data["animations"])
+
+    def _is_pruned_from(self, rel: str, source: Path) -> bool:
+        if (prev := self.pruned.get(rel)) is None:
+            return False
+        try:
+            return prev[0] == self._digest(source)
+        except OSError:
+            return False
+
+    def _forget_pruned(self, rel: str) -> None:
+        """Drop the pruned copy at `rel` from the counts, it is about to be
+        rewritten from the same source, which is no overwrite"""
+        _, dropped = self.pruned.pop(rel)
+        self.written.pop(rel, None)
+        self.pruned_files -= 1
+        self.pruned_animations -= len(dropped)
+
+    def _is_written(self, rel: str | None, digest: str, size: int, target: Path) -> bool:
+        if (rel is None) or ((entry := self.written.get(rel)) is None):
+            return False
+        if (entry.digest == digest) and target.exists():
+            self.skipped += 1
+            self.bytes_saved += size
+            return True
+        self.overwritten += 1
+        return False
+
+    # ------------------------------------------------------------
+
+    def shared_content(self) -> list[list[str]]:
+        """Groups of output paths holding byte-identical content"""
+        by_digest: dict[str, list[str]] = dict()
+        for rel, entry in self.written.items():
+            by_digest.setdefault(entry.digest, list()).append(rel)
+        return [sorted(x) for x in by_digest.values() if len(x) > 1]
+
+    def print_summary(self, verbose: bool = False) -> None:
+        groups = self.shared_content()
+        shared_bytes = sum(self.written[g[0]].size * (len(g) - 1) for g in groups if g)
+
+        print(
+            f"Dedup: {len(self.written)} file(s) written, {self.skipped} identical "
+            f"move(s) skipped ({self.bytes_saved} bytes saved)"
+        )
+        if self.overwritten:
+            print(
+                c_text(
+                    f"Dedup: {self.overwritten} file(s) overwritten with different content",
+                    color=bcolors.WARNING,
+                )
+            )
+        if groups:
+            print(
+                f"Dedup: {sum(len(g) - 1 for g in groups)} identical duplicate(s) "
+                f"under other paths ({shared_bytes} bytes)"
+            )
+            if verbose:
+                for g in groups:
+                    print(f"  {' = '.join(g)}")
+        if self.linked:
+            print(
+                f"Linked: {self.linked['reflink']} reflink(s), "
+                f"{self.linked['hardlink']} hardlink(s), {self.linked['copy']} "
+                "copies from folder packs"
+            )
+        if self.collisions:
+            actions = Counter(c.action for c in self.collisions)
+            print(
+                f"Collisions: {len(self.collisions)} output path(s) claimed more than "
+                f"once - {actions['renamed']} renamed, {actions['overwritten']} "
+                f"overwritten, {actions['identical']} identical, "
+                f"{actions['merged']} merged"
+            )
+            if verbose:
+                for c in self.collisions:
+                    renamed = f" -> {c.renamed_to}" if c.renamed_to else ""
+                    print(
+                        f"  {c.path}: {c.claimant} over {c.owner}, {c.action}{renamed}"
+                    )
+        if self.pruned_files:
+            print(
+                f"Pruned: {self.pruned_animations} unused animation(s) dropped "
+                f"from {self.pruned_files} file(s)"
+            )
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import json
+import re
+import tomllib
+import zipfile
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+
+# content root of a Cobblemon source checkout, see `Pack._determine_base`
+BASE_SOURCE_ROOT = "common/src/main/resources/"
+
+_LOOKS_MEMBER = re.compile(
+    r"assets/[^/]+/(bedrock/(pokemon/)?(animations|models|posers|resolvers|species)"
+    r"|textures/pokemon|sounds/pokemon)/"
+)
+# translation addons, `_export_langs` merges them
+_LANG_MEMBER = re.compile(r"assets/[^/]+/lang/[^/]+")
+_DATA_MEMBER = re.compile(
+    r"data/(cobblemon/)?[^/]+/(spawn_pool_world|species|species_additions"
+    r"|species_features|species_feature_assignments)/"
+)
+
+_MOD_METADATA = {
+    "fabric": "fabric.mod.json",
+    "neoforge": "META-INF/neoforge.mods.toml",
+    "forge": "META-INF/mods.toml",
+}
+
+
+@dataclass
+class ArchiveProbe:
+    """What a zip or jar holds, read from its central directory.
+
+    Only the mod metadata file is ever decompressed, so an archive can be
+    classified, or skipped, before anything is extracted."""
+
+    is_base: bool = False
+    is_mod: bool = False
+
+    loader: str | None = None  # fabric / neoforge / forge
+    mod_ids: list[str] = field(default_factory=list)
+
+    content_root: str = ""  # prefix of the pack content inside the archive
+    looks_members: int = 0
+    lang_members: int = 0
+    data_members: int = 0
+
+    @property
+    def relevant(self) -> bool:
+        """Same content as `PackLocations.__bool__` counts, anything else
+        would be dropped as an empty pack after extraction anyway"""
+        return self.is_base or bool(
+            self.looks_members or self.lang_members or self.data_members
+        )
+
+    @classmethod
+    def from_zip(cls, zip_path: Path) -> ArchiveProbe:
+        with zipfile.ZipFile(zip_path, "r") as zf:
+            names = zf.namelist()
+            probe = cls()
+            top = {n.split("/", 1)[0] for n in names}
+
+            # same rules as `Pack._determine_base`, on member names
+            if ("assets" not in top) and ("data" not in top) and ("common" in top):
+                probe.is_base = True
+                probe.content_root = BASE_SOURCE_ROOT
+            elif any(fnmatch(n, "*mixins*.json") for n in names if "/" not in n):
+                probe.is_mod = True
+                probe._read_metadata(zf, names)
+                if any("cobblemon-common" in n for n in names) or (
+                    "cobblemon" in probe.mod_ids
+                ):
+                    probe.is_base = True
+
+            for n in names:
+                if not n.startswith(probe.content_root):
+                    continue
+                n = n[len(probe.content_root) :]
+                if _LOOKS_MEMBER.match(n):
+                    probe.looks_members += 1
+                elif _LANG_MEMBER.match(n):
+                    probe.lang_members += 1
+                elif _DATA_MEMBER.match(n):
+                    probe.data_members += 1
+        return probe
+
+    def _read_metadata(self, zf: zipfile.ZipFile, names: list[str]) -> None:
+        for loader, member in _MOD_METADATA.items():
+            if member not in names:
+                continue
+            try:
+                raw = zf.read(member).decode("utf-8")
+                if member.endswith(".json"):
+                    ids = [json.loads(raw).get("id", "")]
+                else:
+                    ids = [
+                        m.get("modId", "") for m in tomllib.loads(raw).get("mods", [])
+                    ]
+            except Exception:
+                continue
+            self.loader = loader
+            self.mod_ids = [i for i in ids if i]
+            return
+
+    def __repr__(self) -> str:
+        kind = "BASE" if self.is_base else ("Mod" if self.is_mod else "Addon")
+        loader = f" ({self.loader}: {', '.join(self.mod_ids)})" if self.loader else ""
+        return (
+            f"{kind}{loader} - {self.looks_members} looks, "
+            f"{self.lang_members} lang, {self.data_members} data members"
+        )
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable
+
+from classes.pack.file_table import FileKind, FileTable
+
+
+@dataclass
+class AssetIndex:
+    """Resolver-facing lookups over a pack's posers, models and textures.
+
+    Built once from the pack's file table, so resolving a variation or a
+    layer never touches the disk."""
+
+    files: FileTable
+
+    # one {path relative to the root: file id} dict per location root
+    by_root: dict[FileKind, list[dict[str, int]]] = field(default_factory=dict)
+    # files not yet claimed by any resolver, by stem
+    by_stem: dict[FileKind, dict[str, int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        files: FileTable,
+        roots: dict[FileKind, Iterable[Path]],
+        stem_patterns: dict[FileKind, str],
+    ) -> AssetIndex:
+        index = cls(files=files)
+        for kind, kind_roots in roots.items():
+            prefixes = [
+                f"{rel}/" if rel else ""
+                for rel in [files.relative(r) for r in kind_roots]
+                if rel is not None
+            ]
+            root_dicts: list[dict[str, int]] = [dict() for _ in prefixes]
+            stems: dict[str, int] = dict()
+
+            for file_id in files.of_kind(kind):
+                entry = files[file_id]
+                for prefix, r_dict in zip(prefixes, root_dicts):
+                    if entry.rel_path.startswith(prefix):
+                        r_dict[entry.rel_path[len(prefix) :]] = file_id
+                        break
+                if fnmatch(entry.name, stem_patterns.get(kind, "*")):
+                    stems[entry.stem] = file_id
+
+            index.by_root[kind] = root_dicts
+            index.by_stem[kind] = stems
+        return index
+
+    def claim(self, kind: FileKind, rel_path: str, stem: str) -> list[int]:
+        """Per root, take the file at `rel_path`, or else the unclaimed file
+        named `stem`. Whatever is taken is no longer available by stem."""
+        res: list[int] = list()
+        stems = self.by_stem.get(kind, dict())
+        for r_dict in self.by_root.get(kind, list()):
+            if (file_id := r_dict.get(rel_path)) is not None:
+                res.append(file_id)
+                stems.pop(self.files[file_id].stem, None)
+            elif stem in stems:
+                res.append(stems.pop(stem))
+        return res
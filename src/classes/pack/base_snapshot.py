@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+
+from classes.pack.pack import Pack
+from constants.runtime_const import CRSettings, gcr_settings
+from utils.event_log import EventLog
+from utils.get_resource import load_json_from_path
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SUFFIX = ".snapshot"
+
+
+def source_hash(path: Path) -> str:
+    """Content hash of a jar/zip, or of the file list of a source checkout"""
+    h = hashlib.sha1()
+    if not path.is_dir():
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha1").hexdigest()
+    for dir_path, dir_names, file_names in os.walk(path):
+        dir_names.sort()
+        for f_name in sorted(file_names):
+            f_path = Path(dir_path) / f_name
+            st = f_path.stat()
+            h.update(
+                f"{f_path.relative_to(path).as_posix()}:{st.st_size}:{st.st_mtime_ns}\n".encode()
+            )
+    return h.hexdigest()
+
+
+def snapshot_path(source: Path) -> Path:
+    """Where the snapshot of `source` lives, next to it"""
+    return source.with_name(f"{source.name}{SNAPSHOT_SUFFIX}")
+
+
+@dataclass
+class BaseSnapshot:
+    """The processed BASE pack, stored so later runs can skip extracting and
+    parsing the Cobblemon jar.
+
+    Only what resolution and merging read is kept. Files are referenced by
+    id, and spawn files, which the merge reads from disk, are stored parsed."""
+
+    source_hash: str
+    pack: Pack
+    version: int = SNAPSHOT_VERSION
+
+    @classmethod
+    def compile(cls, source: Path, settings: CRSettings | None = None) -> BaseSnapshot:
+        settings = settings if settings is not None else gcr_settings
+        extraction_path = Path(tempfile.mkdtemp(prefix="CobbleResolver_base_"))
+        try:
+            pack = Pack(
+                folder_location=source if source.is_dir() else None,
+                zip_location=None if source.is_dir() else source,
+                _extraction_path=extraction_path,
+                settings=settings,
+            )
+            pack._prepare()
+            if not pack.is_base:
+                raise ValueError(f"{source.name} is not a Cobblemon base mod")
+            pack._process()
+
+            for pok in pack.pokemon.values():
+                for form in pok.forms.values():
+                    for sp_id in form.spawn_pool:
+                        pack.cached_data[sp_id] = load_json_from_path(
+                            pack.files.path(sp_id)
+                        )
+        finally:
+            shutil.rmtree(extraction_path, ignore_errors=True)
+
+        # base packs are never exported, their lang and asset lookups
+        # are only used while processing
+        pack.lang_entries = list()
+        pack.assets = None
+        return cls(source_hash=source_hash(source), pack=pack)
+
+    def write(self, path: Path) -> None:
+        # both are per run
+        settings, self.pack.settings = self.pack.settings, None
+        events, self.pack.events = self.pack.events, None
+        try:
+            path.write_bytes(zlib.compress(pickle.dumps(self), 6))
+        finally:
+            self.pack.settings = settings
+            self.pack.events = events
+
+    @staticmethod
+    def read(path: Path) -> BaseSnapshot | None:
+        try:
+            snapshot = pickle.loads(zlib.decompress(path.read_bytes()))
+        except Exception:
+            return None
+        if (not isinstance(snapshot, BaseSnapshot)) or (
+            snapshot.version != SNAPSHOT_VERSION
+        ):
+            return None
+        return snapshot
+
+    @staticmethod
+    def load_pack(
+        source: Path, settings: CRSettings, events: EventLog | None = None
+    ) -> Pack | None:
+        """The ready BASE pack for `source`, if a snapshot of this exact
+        jar or checkout exists"""
+        if not (path := snapshot_path(source)).exists():
+            return None
+        if (snapshot := BaseSnapshot.read(path)) is None:
+            return None
+        if snapshot.source_hash != source_hash(source):
+            print(f"{path.name} is outdated, processing {source.name}")
+            return None
+        snapshot.pack.settings = settings
+        snapshot.pack.events = (
+            events if events is not None else EventLog(settings=settings)
+        )
+        return snapshot.pack
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(prog="CobbleResolver snapshot")
+    parser.add_argument("source", type=Path, help="Cobblemon jar or source checkout")
+    args = parser.parse_args(argv)
+
+    snapshot = BaseSnapshot.compile(source=args.source)
+    out = snapshot_path(args.source)
+    snapshot.write(out)
+    print(
+        f"Snapshot of {args.source.name}: {len(snapshot.pack.pokemon)} pokemon, "
+        f"{out.stat().st_size} bytes -> {out}"
+    )
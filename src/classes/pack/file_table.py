@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass, field
+from enum import Enum
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterator
+
+
+class FileKind(Enum):
+    # values match the `PackLocations` attribute the file was found under
+    RESOLVERS = "resolvers"
+    MODELS = "models"
+    TEXTURES = "textures"
+    ANIMATIONS = "animations"
+    POSERS = "posers"
+    SOUNDS = "sounds"
+    SOUND_JSONS = "sound_jsons"
+    LANG = "lang"
+    SPECIES = "species"
+    SPECIES_ADDITIONS = "species_additions"
+    SPAWN_POOL_WORLD = "spawn_pool_world"
+    SPECIES_FEATURES = "species_features"
+    SPECIES_FEATURES_ASSIGNMENTS = "species_features_assignments"
+    OTHER = "other"
+
+
+@dataclass(slots=True)
+class FileEntry:
+    rel_path: str
+    size: int
+    kind: FileKind
+    is_dir: bool = False
+
+    @property
+    def name(self) -> str:
+        return self.rel_path.rpartition("/")[2]
+
+    @property
+    def stem(self) -> str:
+        name = self.name
+        return name.rpartition(".")[0] if "." in name[1:] else name
+
+
+@dataclass
+class FileTable:
+    """Every file of a pack, addressed by a small integer id.
+
+    The model (resolvers, forms, sounds..) only keeps ids, paths are
+    rebuilt from the table when a file actually has to be touched."""
+
+    root: Path
+    entries: list[FileEntry] = field(default_factory=list)
+
+    _ids: dict[str, int] = field(default_factory=dict)
+    _by_kind: dict[FileKind, list[int]] = field(default_factory=dict)
+
+    @classmethod
+    def scan(cls, root: Path, kind_roots: dict[Path, FileKind]) -> FileTable:
+        table = cls(root=root)
+        roots: dict[str, FileKind] = dict()
+        for r_path, kind in kind_roots.items():
+            if (rel := table.relative(r_path)) is not None:
+                roots[rel] = kind
+        table._scan_dir(rel_dir="", kind=roots.get("", FileKind.OTHER), roots=roots)
+        return table
+
+    def _scan_dir(self, rel_dir: str, kind: FileKind, roots: dict[str, FileKind]):
+        try:
+            with os.scandir(self.root / rel_dir) as it:
+                dir_entries = list(it)
+        except OSError:
+            return
+
+        for d_entry in dir_entries:
+            rel = f"{rel_dir}/{d_entry.name}" if rel_dir else d_entry.name
+            e_kind = roots.get(rel, kind)
+            if d_entry.is_dir(follow_symlinks=False):
+                self.add(rel_path=rel, size=0, kind=e_kind, is_dir=True)
+                self._scan_dir(rel_dir=rel, kind=e_kind, roots=roots)
+            else:
+                try:
+                    size = d_entry.stat().st_size
+                except OSError:
+                    size = 0
+                self.add(rel_path=rel, size=size, kind=e_kind)
+
+    # ------------------------------------------------------------
+
+    def add(self, rel_path: str, size: int, kind: FileKind, is_dir: bool = False) -> int:
+        if (file_id := self._ids.get(rel_path)) is not None:
+            self.entries[file_id].size = size
+            return file_id
+        file_id = len(self.entries)
+        self.entries.append(
+            FileEntry(rel_path=rel_path, size=size, kind=kind, is_dir=is_dir)
+        )
+        self._ids[rel_path] = file_id
+        self._by_kind.setdefault(kind, list()).append(file_id)
+        return file_id
+
+    def register(self, path: Path, kind: FileKind = FileKind.OTHER) -> int:
+        """Add a file created after the initial scan"""
+        rel = self.relative(path)
+        if rel is None:
+            raise ValueError(f"{path} is not inside {self.root}")
+        is_dir = path.is_dir()
+        return self.add(
+            rel_path=rel,
+            size=0 if is_dir else path.stat().st_size,
+            kind=kind,
+            is_dir=is_dir,
+        )
+
+    # ------------------------------------------------------------
+
+    def relative(self, path: Path) -> str | None:
+        try:
+            rel = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+        return "" if rel == "." else rel
+
+    def lookup(self, path: Path) -> int | None:
+        if (rel := self.relative(path)) is None:
+            return None
+        return self._ids.get(rel)
+
+    def find(self, rel_path: str) -> int | None:
+        return self._ids.get(rel_path)
+
+    def path(self, file_id: int) -> Path:
+        return self.root / self.entries[file_id].rel_path
+
+    def of_kind(self, kind: FileKind, pattern: str | None = None) -> Iterator[int]:
+        for file_id in self._by_kind.get(kind, list()):
+            entry = self.entries[file_id]
+            if entry.is_dir:
+                continue
+            if (pattern is None) or fnmatch(entry.name, pattern):
+                yield file_id
+
+    def of_component(self, component_attr: str, pattern: str | None = None):
+        return self.of_kind(kind=FileKind(component_attr), pattern=pattern)
+
+    def __getitem__(self, file_id: int) -> FileEntry:
+        return self.entries[file_id]
+
+    def __len__(self) -> int:
+        return len(self.entries)
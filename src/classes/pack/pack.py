@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 import shutil
 import zipfile
 from dataclasses import dataclass, field
@@ -17,21 +18,38 @@ from classes.base_classes import (
     bcfo,
 )
 from classes.evolutions import EvolutionCollection, EvolutionEntry
+from classes.output_writer import OutputWriter
+from classes.pack.archive_probe import ArchiveProbe
+from classes.pack.asset_index import AssetIndex
+from classes.pack.file_table import FileKind, FileTable
 from classes.pack.poser_parser import PoserResolver
 from classes.pokemon import Pokemon
 from classes.pokemon_form import PokemonForm, ResolverEntry
 from classes.sounds import SoundPack
 from constants.generic import default_animation_types
-from constants.runtime_const import DEBUG, CrOpType, gcr_settings
+from constants.runtime_const import DEBUG, CRSettings, CrOpType, gcr_settings
 from constants.text_constants import DefaultNames, TextSymbols
 from utils.cli_utils.generic import bool_square
 from utils.cli_utils.keypress import clear_line
-from utils.directory_utils import clear_empty_dir
+from utils.cli_utils.progress import StageProgress
+from utils.directory_utils import clear_empty_dir, replace_text
+from utils.event_log import EventLog
+from utils.get_resource import dump_json
 from utils.safe_parse_deco import safe_parse_per_file
-from utils.text_utils import bcolors, c_text, next_candidate_name
+from utils.text_utils import bcolors, c_text
 
 if TYPE_CHECKING:
     from classes.combiner import Combiner
+    from utils.memory_profile import MemoryProfile
+
+# removed from pack folders before the leftovers are repackaged
+LEFTOVER_JUNK = [
+    "__MACOSX",
+    ".DS_Store",
+    "desktop.ini",
+    "READ ME.txt",
+    "README.txt",
+]
 
 
 @dataclass
@@ -55,10 +73,6 @@ class PackLocations:
     species_features: set[Path] = field(default_factory=set)
     species_features_assignments: set[Path] = field(default_factory=set)
 
-    posers_dict: dict[str, Path] = field(default_factory=dict)
-    models_dict: dict[str, Path] = field(default_factory=dict)
-    textures_dict: dict[str, Path] = field(default_factory=dict)
-
     def __repr__(self) -> str:
         res: str = ""
         res += f"Sp:{bool_square(self.spawn_pool_world)} "
@@ -90,12 +104,9 @@ class PackLocations:
             or bool(self.species_features_assignments)
         )
 
-    def _delete_registered_paths(self) -> None:
-        for x in [
-            self.lang,
-        ]:
-            if x and x.exists() and x.is_dir():
-                shutil.rmtree(x)
+    def registered_dirs(self) -> list[Path]:
+        """Folders whose content is fully handled by the export"""
+        res: list[Path] = [self.lang] if self.lang else list()
         for y in [
             self.textures,
             self.animations,  #
@@ -108,9 +119,13 @@ class PackLocations:
             self.species_features,
             self.species_features_assignments,
         ]:
-            for x in y:
-                if x and x.exists() and x.is_dir():
-                    shutil.rmtree(x)
+            res.extend(x for x in y if x)
+        return res
+
+    def _delete_registered_paths(self) -> None:
+        for x in self.registered_dirs():
+            if x.exists() and x.is_dir():
+                shutil.rmtree(x)
 
 
 class Pack:
@@ -119,12 +134,24 @@ class Pack:
         zip_location: Path | None = None,
         folder_location: Path | None = None,
         _extraction_path: Path | None = None,
+        settings: CRSettings | None = None,
+        events: EventLog | None = None,
     ) -> None:
+        self.settings: CRSettings = settings if settings is not None else gcr_settings
+        self.events: EventLog = (
+            events if events is not None else EventLog(settings=self.settings)
+        )
+
         self.zip_location: Path | None = zip_location
         self.folder_location: Path | None = folder_location
         self._extraction_path: Path | None = _extraction_path
+        # folder packs are read where they are and never modified
+        self.in_place: bool = False
 
-        self.component_location: PackLocations | None
+        self.component_location: PackLocations | None = None
+        self.probe: ArchiveProbe | None = None  # zips and jars only
+        self.files: FileTable | None = None
+        self.assets: AssetIndex | None = None
 
         self.name: str = ""
 
@@ -133,10 +160,16 @@ class Pack:
         self.feature_assignments: list[FeatureAssignment] = list()
 
         self.defined_animation_types: set[str] = set()
-        self.present_animations: dict[str, dict[str, set[Path]]] = dict()
+        self.present_animations: dict[str, dict[str, set[int]]] = dict()
         self.accessed_animations: set[str] = set()
+        # {file id: {animation key: (group, move)}}, prunable keys only
+        self.animation_keys: dict[int, dict[str, tuple[str, str]]] = dict()
 
         self.sounds: SoundPack | None = None
+        # parsed files no longer on disk, by file id (BASE snapshots)
+        self.cached_data: dict[int, dict] = dict()
+        # edited content exported instead of the file on disk, by file id
+        self.edits: dict[int, bytes] = dict()
 
         self.lang_entries: list[LangEntry] = list()
         self.registered_evolutions: EvolutionCollection = EvolutionCollection()
@@ -146,6 +179,8 @@ class Pack:
 
         self.parent_combiner: "Combiner" | None = None
         self.verbose: bool = False
+        self.ready: bool = False  # prepared and processed
+        self.skipped: bool = False  # archive without any pack content
 
     def get_name(self) -> str:
         return self.name or (
@@ -160,19 +195,19 @@ class Pack:
 
     # ============================================================
 
-    def get_all_pack_paths(self) -> None:
-        path_set: set[Path] = set()
+    def get_all_pack_paths(self) -> set[int]:
+        path_set: set[int] = set()
         for p in self.pokemon.values():
             path_set.update(p.get_all_paths())
         for f in self.features.values():
-            path_set.add(f.file_path)
+            path_set.add(f.file_id)
         for f in self.feature_assignments:
-            path_set.add(f.file_path)
+            path_set.add(f.file_id)
         for x in self.present_animations:
             for y in self.present_animations[x]:
                 path_set.update(self.present_animations[x][y])
         for le in self.lang_entries:
-            path_set.add(le.file_path)
+            path_set.add(le.file_id)
         path_set.update(self.sounds.get_all_files())
         return path_set
 
@@ -182,6 +217,7 @@ class Pack:
         selected: bool = True,
         export_mods: bool = False,
         move_leftovers: Path | None = None,
+        writer: OutputWriter | None = None,
     ):
         outut_name: str = f"{self.name}_CORE"
         if not export_path:
@@ -190,12 +226,14 @@ class Pack:
             output_path = export_path
 
         output_path.mkdir(parents=True, exist_ok=True)
+        if writer is None:
+            writer = OutputWriter(root=output_path, settings=self.settings)
 
         _overall_set = self.get_all_pack_paths()
 
         # -----------------------------------------
-        path_set: set[Path] = set()
-        delete_set: set[Path] = set()
+        path_set: set[int] = set()
+        delete_set: set[int] = set()
         mflag = self.is_base or self.is_mod
         if (not mflag) or (mflag and export_mods):
             for pok in self.pokemon.values():
@@ -211,41 +249,71 @@ class Pack:
 
         delete_set = _overall_set.difference(path_set)
 
+        prune: dict[int, set[str]] = dict()
+        if self.settings.PRUNE_ANIMATIONS:
+            prune = self._get_animation_prune_keys(
+                pokemon=[
+                    pok
+                    for pok in self.pokemon.values()
+                    if pok.selected or (not selected)
+                ]
+            )
+
         c = 0
-        for p in path_set:
-            if p:
-                if p.is_dir():
-                    print(f"[e] - {p}")  # TODO sometimes a "cobblemon\sounds\pokemon"
+        with StageProgress(
+            stage="export",
+            label=self.name,
+            total_items=len(path_set),
+            total_bytes=sum(self.files[f_id].size for f_id in path_set),
+        ) as progress:
+            for file_id in path_set:
+                entry = self.files[file_id]
+                progress.advance(nbytes=entry.size)
+                p = self.files.path(file_id)
+                if entry.is_dir:
+                    # TODO sometimes a "cobblemon\sounds\pokemon"
+                    self.events.warning("missed_file", f"[e] - {p}", pack=self.name)
                     continue  # appears here and fucks things up
-                np = output_path / p.relative_to(self.folder_location)
-                np.parent.mkdir(parents=True, exist_ok=True)
-
-                if np.exists() and (
-                    (
-                        (
-                            (np.parent == "species_additions")
-                            or (np.parent.parent == "species_additions")
-                        )
-                        and gcr_settings.KEEP_DUPLICATE_SAS_ON_MOVE
+                np = writer.claim(
+                    source=p,
+                    target=output_path / entry.rel_path,
+                    owner=self.name,
+                    keep_both=(
+                        (entry.kind == FileKind.SPECIES_ADDITIONS)
+                        and self.settings.KEEP_DUPLICATE_SAS_ON_MOVE
                     )
                     or (
-                        (
-                            (np.parent == "spawn_pool_world")
-                            or (np.parent.parent == "spawn_pool_world")
-                        )
-                        and gcr_settings.KEEP_DUPLICATE_SPAWNS_ON_MOVE
-                    )
-                ):
-                    while True:
-                        candidate_name = np.stem
-                        candidate_name = next_candidate_name(candidate_name)
-                        if not (
-                            np := (np.parent / f"{candidate_name}.{np.suffix}")
-                        ).exists():
-                            break
+                        (entry.kind == FileKind.SPAWN_POOL_WORLD)
+                        and self.settings.KEEP_DUPLICATE_SPAWNS_ON_MOVE
+                    ),
+                )
+                np.parent.mkdir(parents=True, exist_ok=True)
 
                 try:
-                    shutil.move(p, np)
+                    if file_id in self.edits:
+                        writer.write(
+                            data=self.edits[file_id],
+                            target=np,
+                            source=p,
+                            owner=self.name,
+                        )
+                        if not self.in_place:
+                            p.unlink(missing_ok=True)
+                    elif file_id in prune:
+                        writer.write_pruned_animations(
+                            source=p,
+                            target=np,
+                            drop=prune[file_id],
+                            owner=self.name,
+                            keep_source=self.in_place,
+                        )
+                    else:
+                        writer.move(
+                            source=p,
+                            target=np,
+                            owner=self.name,
+                            keep_source=self.in_place,
+                        )
                 except Exception as e:
                     if np.exists():
                         pass
@@ -258,28 +326,29 @@ class Pack:
 
         # -----------------------------------------
         del_flag = False
-        try:
-            for p in delete_set:
-                if p and p.exists():
-                    p.unlink()
-
-            self.component_location._delete_registered_paths()
-            clear_empty_dir(
-                s_path=self.folder_location,
-                items_to_delete=[
-                    "__MACOSX",
-                    ".DS_Store",
-                    "desktop.ini",
-                    "READ ME.txt",
-                    "README.txt",
-                ],
-            )
-            del_flag = True
-        except PermissionError:
-            print(f"Could not exclude unused files for {self.name}")
-            if move_leftovers:
-                print("-Partial pack will not be produced")
-            del_flag = False
+        if self.in_place:
+            del_flag = True  # nothing to delete, see `_leftover_files`
+        else:
+            try:
+                for file_id in delete_set:
+                    if self.files[file_id].is_dir:
+                        continue
+                    self.files.path(file_id).unlink(missing_ok=True)
+
+                self.component_location._delete_registered_paths()
+                clear_empty_dir(
+                    s_path=self.folder_location,
+                    items_to_delete=LEFTOVER_JUNK,
+                )
+                del_flag = True
+            except PermissionError:
+                self.events.warning(
+                    "exclude_failed",
+                    f"Could not exclude unused files for {self.name}"
+                    + ("\n-Partial pack will not be produced" if move_leftovers else ""),
+                    pack=self.name,
+                )
+                del_flag = False
         # -----------------------------------------
         # for p_i in ["pack.png", "pack.mcmeta"]:
         #     if (p := (self.folder_location / p_i)).exists():
@@ -287,10 +356,12 @@ class Pack:
 
         mv_count = 0
         if isinstance(move_leftovers, Path) and del_flag:
-            mv_count = self._move_leftovers(export_path=move_leftovers)
+            mv_count = self._move_leftovers(
+                export_path=move_leftovers, exclude=_overall_set
+            )
 
         outp = ""
-        if gcr_settings.OP_MODE == CrOpType.CHOOSE:
+        if self.settings.OP_MODE == CrOpType.CHOOSE:
             outp += f"{c} Moved "
         if d := (len(path_set) - c):
             outp += f"- {d} Missed "
@@ -299,31 +370,104 @@ class Pack:
         if d := (len(delete_set)):
             outp += f"| {d} Excluded "
         outp += f"|| {self.name}"
-        print(outp)
+        self.events.info(
+            "pack_exported",
+            outp,
+            pack=self.name,
+            moved=c,
+            missed=len(path_set) - c,
+            repackaged=mv_count or 0,
+            excluded=len(delete_set),
+        )
 
-    def _move_leftovers(self, export_path: Path) -> int | None:
-        if x := (len([i for i in self.folder_location.rglob("*") if i.is_dir()])):
+    def _move_leftovers(
+        self, export_path: Path, exclude: set[int] | None = None
+    ) -> int | None:
+        files: list[Path] | None = None
+        if self.in_place:
+            files = self._leftover_files(exclude=exclude or set())
+            dirs = {d for f in files for d in f.parents if d != Path(".")}
+        else:
+            self._drop_exported_leftovers(exclude=exclude or set())
+            dirs = {
+                i.relative_to(self.folder_location)
+                for i in self.folder_location.rglob("*")
+                if i.is_dir()
+            }
+        if x := len(dirs):
             _tag = ""
-            if (self.folder_location / "assets").exists():
+            if Path("assets") in dirs:
                 _tag += "R"
-            if (self.folder_location / "data").exists():
+            if Path("data") in dirs:
                 _tag += "D"
             if _tag:
                 _tag = "[" + _tag + "]"
             _tag = DefaultNames.REMAINDER_PACK_PREFIX + _tag
-            shutil.make_archive(
-                f"{str((export_path / f"{_tag}_{self.name}"))}",
-                format="zip",
-                root_dir=str(self.folder_location),
-            )
+            archive = export_path / f"{_tag}_{self.name}"
+            if files is None:
+                shutil.make_archive(
+                    str(archive), format="zip", root_dir=str(self.folder_location)
+                )
+            else:
+                with zipfile.ZipFile(
+                    f"{archive}.zip", "w", compression=zipfile.ZIP_DEFLATED
+                ) as zf:
+                    for f in files:
+                        zf.write(self.folder_location / f, arcname=f.as_posix())
             return x
 
+    def _drop_exported_leftovers(self, exclude: set[int]) -> None:
+        """Every file in `exclude` was exported or deleted by now, one still in
+        the pack folder would be repackaged next to its exported copy"""
+        stray = [
+            p
+            for f_id in exclude
+            if (not self.files[f_id].is_dir) and (p := self.files.path(f_id)).is_file()
+        ]
+        if not stray:
+            return
+        self.events.warning(
+            "exported_leftover",
+            f"{len(stray)} exported file(s) left in {self.name}, not repackaged",
+            pack=self.name,
+            files=[p.relative_to(self.folder_location).as_posix() for p in stray],
+        )
+        for p in stray:
+            p.unlink(missing_ok=True)
+
+    def _leftover_files(self, exclude: set[int]) -> list[Path]:
+        """Files, relative to the pack folder, that would be left after the
+        export deleted what it handled. For packs that are not modified"""
+        skip = {self.files[f_id].rel_path for f_id in exclude}
+        registered = {
+            d.relative_to(self.folder_location).as_posix()
+            for d in self.component_location.registered_dirs()
+        }
+        res: list[Path] = list()
+        for dir_path, dir_names, file_names in os.walk(self.folder_location):
+            rel_dir = Path(dir_path).relative_to(self.folder_location)
+            dir_names[:] = [
+                d
+                for d in dir_names
+                if (d not in LEFTOVER_JUNK)
+                and ((rel_dir / d).as_posix() not in registered)
+            ]
+            for f_name in file_names:
+                rel = rel_dir / f_name
+                if (f_name in LEFTOVER_JUNK) or (rel.as_posix() in skip):
+                    continue
+                res.append(rel)
+        return res
+
     def _export_langs(self, export_path: Path) -> None:
         langs = self._get_lang_export()
         l_path = export_path / "assets" / "cobblemon" / "lang"
         l_path.mkdir(parents=True, exist_ok=True)
         for l_entry in langs:
-            (l_path / f"{l_entry.name}").write_text(json.dumps(l_entry.data))
+            replace_text(
+                l_path / f"{l_entry.name}",
+                dump_json(l_entry.data, settings=self.settings),
+            )
 
     def _get_lang_export(self) -> list[LangResultEntry]:
         selected = [
@@ -376,16 +520,33 @@ class Pack:
     # ============================================================
 
     def _prepare(self) -> None:
+        if self.zip_location is not None:
+            self.probe = ArchiveProbe.from_zip(self.zip_location)
+            if not self.probe.relevant:
+                self.skipped = True
+                self.events.info(
+                    "pack_skipped",
+                    f"{self.zip_location.name}  -  no pack content, skipped",
+                    pack=self.zip_location.name,
+                )
+                return
         self._folder_setup()
         self._determine_base()
         self._get_paths()
+        self._index_files()
 
         self.name = "BASE" if (self.is_base) else self.folder_location.name
 
         outp = f"{self.name}  -  Mod:{bool_square(self.is_mod)} "
         outp += f"BASE:{bool_square(self.is_base)}\n "
         outp += f"{repr(self.component_location)}"
-        print(outp)
+        self.events.info(
+            "pack_prepared",
+            outp,
+            pack=self.name,
+            is_mod=self.is_mod,
+            is_base=self.is_base,
+        )
 
     # ------------------------------------------------------------
 
@@ -399,16 +560,8 @@ class Pack:
             return
 
         if self.folder_location is not None:
-            if self._extraction_path is None:
-                self._extraction_path = self.folder_location.parent / ".temp"
-            new_folder_location = self._extraction_path / self.folder_location.name
-            new_folder_location.mkdir(parents=True, exist_ok=True)
-            print(f"Copying {self.folder_location.name}")
-            shutil.copytree(
-                src=self.folder_location, dst=new_folder_location, dirs_exist_ok=True
-            )
-            print(clear_line, end="")
-            self.folder_location = new_folder_location
+            # read where it is, export links or copies the files it needs
+            self.in_place = True
 
         if self.zip_location is not None:
             if self._extraction_path is None:
@@ -422,10 +575,26 @@ class Pack:
             return
         print(f"Unpacking {self.zip_location.name}")
         with zipfile.ZipFile(str(self.zip_location), "r") as zip_ref:
-            zip_ref.extractall(self.folder_location)
+            members = zip_ref.infolist()
+            with StageProgress(
+                stage="unpack",
+                label=self.zip_location.name,
+                total_items=len(members),
+                total_bytes=sum(m.file_size for m in members),
+            ) as progress:
+                for member in members:
+                    zip_ref.extract(member, self.folder_location)
+                    progress.advance(nbytes=member.file_size)
         print(clear_line, end="")
 
     def _determine_base(self) -> None:
+        if self.probe is not None:
+            self.is_base = self.probe.is_base
+            self.is_mod = self.probe.is_mod
+            if self.probe.content_root:
+                self.folder_location = self.folder_location / self.probe.content_root
+            return
+
         if (
             (not (self.folder_location / "assets").exists())
             and (not (self.folder_location / "data").exists())
@@ -502,46 +671,74 @@ class Pack:
 
         self.component_location = val
 
-    # ============================================================
+    def _index_files(self) -> None:
+        kind_roots: dict[Path, FileKind] = dict()
+        for kind in FileKind:
+            locations = getattr(self.component_location, kind.value, None)
+            if isinstance(locations, Path):
+                locations = [locations]
+            for location in locations or list():
+                kind_roots[location] = kind
 
-    def _process(self) -> None:
-        print(f"Processing.. {self.name}")
-        self._get_features()
-        self._get_pokemon()
-        self._get_lang()
+        self.files = FileTable.scan(root=self.folder_location, kind_roots=kind_roots)
 
-        self._detect_pseudoforms()
+    # ============================================================
 
-        self._get_sounds()
+    def _process(self, memory: MemoryProfile | None = None) -> None:
+        """`memory` is sampled between the steps, see `MemoryProfile`"""
+        print(f"Processing.. {self.name}")
+        steps = (
+            ("features", self._get_features),
+            ("pokemon", self._get_pokemon),
+            ("lang", self._get_lang),
+            ("pseudoforms", self._detect_pseudoforms),
+            ("sounds", self._get_sounds),
+            ("forms", self._stamp_forms),
+            ("requests", self._mark_requests),
+        )
+        for step, func in steps:
+            if memory is not None:
+                memory.mark(f"{self.name} / {step}")
+            func()
+        self.ready = True
 
-        self._stamp_forms()
+        if not self.verbose:
+            print(clear_line, end="")
+        self.events.info(
+            "pack_processed",
+            f"[{TextSymbols.check_mark}] {self.name}",
+            console=(not self.verbose),
+            pack=self.name,
+            pokemon=len(self.pokemon),
+        )
 
+    def _mark_requests(self) -> None:
         for p in self.pokemon.values():
             p._mark_requests()
 
-        if not self.verbose:
-            print(clear_line, end="")
-            print(f"[{TextSymbols.check_mark}] {self.name}")
-
     # ------------------------------------------------------------
     @safe_parse_per_file(component_attr="species_features", DEBUG=DEBUG)
-    def _get_features(self, input_file_path: Path, data: dict) -> None:  # STEP 0
+    def _get_features(
+        self, input_file_path: Path, data: dict, file_id: int
+    ) -> None:  # STEP 0
         self.features[input_file_path.stem] = Feature(
             name=input_file_path.stem,
             keys=data.get("keys", list()),
             feat_type=FeatureType(data.get("type", "flag")),
             aspect=data.get("isAspect", False),
             file_path=input_file_path,
+            file_id=file_id,
             source=data,
         )
 
     @safe_parse_per_file(component_attr="species_features_assignments", DEBUG=DEBUG)
     def _get_feature_assignments(
-        self, input_file_path: Path, data: dict
+        self, input_file_path: Path, data: dict, file_id: int
     ) -> None:  # STEP 0b #TODO?
         self.feature_assignments.append(
             FeatureAssignment(
                 file_path=input_file_path,
+                file_id=file_id,
                 source=data,
                 name=input_file_path.stem,
                 incl_pokemon=data.get("pokemon", list()),
@@ -577,7 +774,12 @@ class Pack:
                 orig = [mon for mon in mons if mon.internal_name == p_name.lower()]
                 if orig:
                     if len(orig) > 1:
-                        print("!! PSEUDOFORM CHECK: Multiple with same internal name..")
+                        self.events.warning(
+                            "pseudoform_check",
+                            "!! PSEUDOFORM CHECK: Multiple with same internal name..",
+                            pack=self.name,
+                            name=p_name,
+                        )
                     orig = orig[0]
                     for ps_mon in mons:
                         if ps_mon is not orig:
@@ -615,7 +817,8 @@ class Pack:
             return
         print("-- Parsing Language data")
 
-        for t in self.component_location.lang.rglob("*.json"):
+        for t_id in self.files.of_kind(FileKind.LANG, "*.json"):
+            t = self.files.path(t_id)
             try:
                 try:
                     with t.open() as f:
@@ -629,7 +832,7 @@ class Pack:
                 # ---------------
 
                 start_k = "cobblemon.species."
-                len_en = LangEntry(file_path=t, source=data, name=t.name)
+                len_en = LangEntry(file_path=t, file_id=t_id, source=data, name=t.name)
                 len_en.incl_pokemon.update(
                     [k.split(".")[2] for k in data.keys() if k.startswith(start_k)]
                 )
@@ -661,7 +864,7 @@ class Pack:
         return flag
 
     @safe_parse_per_file(component_attr="species", DEBUG=DEBUG)
-    def _get_data_species(self, t: Path, data: dict) -> None:  # STEP 1
+    def _get_data_species(self, t: Path, data: dict, file_id: int) -> None:  # STEP 1
         """parse through species files"""
         if not self._check_empty_species_dict(data=data):
             return
@@ -674,7 +877,7 @@ class Pack:
                 DefaultNames.BASE_FORM: PokemonForm(
                     name=DefaultNames.BASE_FORM,
                     aspects=(data.get("aspects", list())),
-                    species=bcfo(file_path=t, source=data),
+                    species=bcfo(file_path=t, source=data, file_id=file_id),
                 )
             },
         )
@@ -689,20 +892,20 @@ class Pack:
             pok.forms[_f_name.lower()] = PokemonForm(
                 name=_f_name,
                 aspects=(i_form.get("aspects", list())),
-                species=bcfo(file_path=t, source=i_form),
+                species=bcfo(file_path=t, source=i_form, file_id=file_id),
             )
         self.pokemon[pok.internal_name] = pok
-        self._register_evolutions(data=data, name=pok.internal_name, file_path=t)
+        self._register_evolutions(data=data, name=pok.internal_name, file_id=file_id)
 
     def _register_evolutions(
-        self, data: dict, name: str, file_path: Path, is_addition: bool = False
+        self, data: dict, name: str, file_id: int, is_addition: bool = False
     ) -> None:
         for ev in data.get("evolutions", list()):
             self.registered_evolutions.add(
                 EvolutionEntry(
                     from_pokemon=name,
                     to_pokemon=ev["result"],
-                    file_path=file_path,
+                    file_id=file_id,
                     is_addition=is_addition,
                 )
             )
@@ -711,7 +914,7 @@ class Pack:
                 EvolutionEntry(
                     from_pokemon=data["preEvolution"],
                     to_pokemon=name,
-                    file_path=file_path,
+                    file_id=file_id,
                     is_addition=is_addition,
                 )
             )
@@ -723,13 +926,13 @@ class Pack:
             self._register_evolutions(
                 data=form,
                 name=f"{name}_{_f_name}",
-                file_path=file_path,
+                file_id=file_id,
                 is_addition=is_addition,
             )
 
     @safe_parse_per_file(component_attr="species_additions", DEBUG=DEBUG)
     def _get_data_species_additions(
-        self, input_file_path: Path, data: dict
+        self, input_file_path: Path, data: dict, file_id: int
     ) -> None:  # STEP 1b
         target_parts: str = (str(data["target"])).split(":")
         if len(target_parts) > 1:
@@ -746,14 +949,16 @@ class Pack:
                     DefaultNames.BASE_FORM: PokemonForm(
                         name=DefaultNames.BASE_FORM,
                         aspects=data.get("aspects", list()),
-                        species_additions=bcfo(file_path=input_file_path, source=data),
+                        species_additions=bcfo(
+                            file_path=input_file_path, source=data, file_id=file_id
+                        ),
                     )
                 },
             )
         else:
             self.pokemon[target].features.extend(data.get("features", list()))
             self.pokemon[target].forms[DefaultNames.BASE_FORM].species_additions = bcfo(
-                file_path=input_file_path, source=data
+                file_path=input_file_path, source=data, file_id=file_id
             )
             self.pokemon[target].forms[DefaultNames.BASE_FORM].aspects.extend(
                 data.get("aspects", list())
@@ -766,22 +971,26 @@ class Pack:
                 self.pokemon[target].forms[form_name] = PokemonForm(
                     name=form_name,
                     aspects=i_form.get("aspects", list()),
-                    species_additions=bcfo(file_path=input_file_path, source=i_form),
+                    species_additions=bcfo(
+                        file_path=input_file_path, source=i_form, file_id=file_id
+                    ),
                 )
             else:
                 self.pokemon[target].forms[form_name].species_additions = bcfo(
-                    file_path=input_file_path, source=i_form
+                    file_path=input_file_path, source=i_form, file_id=file_id
                 )
                 self.pokemon[target].forms[form_name].aspects.extend(
                     i_form.get("aspects", list())
                 )
 
         self._register_evolutions(
-            data=data, name=target, file_path=input_file_path, is_addition=True
+            data=data, name=target, file_id=file_id, is_addition=True
         )
 
     @safe_parse_per_file(component_attr="spawn_pool_world", DEBUG=DEBUG)
-    def _get_data_spawn(self, input_file_path: Path, data: dict) -> None:  # STEP 1c
+    def _get_data_spawn(
+        self, input_file_path: Path, data: dict, file_id: int
+    ) -> None:  # STEP 1c
         spawns = data.get("spawns", list())
 
         for spawn_entry in spawns:
@@ -792,8 +1001,13 @@ class Pack:
             )
 
             if pok_name not in self.pokemon:
+                self.events.debug(
+                    "spawn_without_species",
+                    f"WARN!! - {pok_name}, not found",
+                    pack=self.name,
+                    pokemon=pok_name,
+                )
                 if DEBUG:
-                    print(f"WARN!! - {pok_name}, not found")
                     _ = input()
                 self.pokemon[pok_name] = Pokemon(
                     internal_name=pok_name,
@@ -808,25 +1022,24 @@ class Pack:
                     aspect=aspect, pokemon=self.pokemon[pok_name]
                 ):
                     for form in relevant_forms:
-                        form.spawn_pool.append(input_file_path)
+                        form.spawn_pool.append(file_id)
                         form.spawn_pool = list(set(form.spawn_pool))
                 else:
                     # new_form = PokemonForm(name=f"--{aspect}")
                     new_form = PokemonForm(name=f"--{aspect}", aspects=[aspect])
-                    new_form.spawn_pool.append(input_file_path)
+                    new_form.spawn_pool.append(file_id)
                     self.pokemon[pok_name].forms[new_form.name] = new_form
 
             else:  # else add to primary
                 self.pokemon[pok_name].forms[DefaultNames.BASE_FORM].spawn_pool.append(
-                    input_file_path
+                    file_id
                 )
                 self.pokemon[pok_name].forms[DefaultNames.BASE_FORM].spawn_pool = list(
                     set(self.pokemon[pok_name].forms[DefaultNames.BASE_FORM].spawn_pool)
                 )
 
-    @staticmethod
     def _extract_name_and_aspect(
-        full_pokemon_string: str, available_features: dict[str, Feature] = dict()
+        self, full_pokemon_string: str, available_features: dict[str, Feature] = dict()
     ) -> tuple[str, str]:
         pok_parts: list[str] = full_pokemon_string.split(" ")
         pok_name: str = pok_parts[0]
@@ -851,7 +1064,7 @@ class Pack:
                     # selected = ""
                     if feat_name in available_features:
                         # selected = available_features[feat_name].source["aspectFormat"]
-                        aspect = Pack._aspect_choice_retrieve(
+                        aspect = self._aspect_choice_retrieve(
                             feature_dict=available_features[feat_name].source,
                             feat_choice=feat_choice,
                         )
@@ -859,7 +1072,7 @@ class Pack:
                         for val in available_features.values():
                             if feat_name in val.keys:
                                 # selected = val.source["aspectFormat"]
-                                aspect = Pack._aspect_choice_retrieve(
+                                aspect = self._aspect_choice_retrieve(
                                     feature_dict=val.source,
                                     feat_choice=feat_choice,
                                 )
@@ -877,24 +1090,24 @@ class Pack:
                 pok_name = feat_parts[0]
         return pok_name, aspect
 
-    @staticmethod
-    def _aspect_choice_retrieve(feature_dict: dict[str:Any], feat_choice: str):
+    def _aspect_choice_retrieve(self, feature_dict: dict[str:Any], feat_choice: str):
         if "aspectFormat" in feature_dict:
             aspect = feature_dict["aspectFormat"].replace("{{choice}}", feat_choice)
         elif "choices" in feature_dict:
             if feat_choice in feature_dict["choices"]:
                 aspect = feat_choice
         else:
-            if gcr_settings.SHOW_WARNINGS:
-                print(
-                    c_text(
-                        (
-                            "--! Unmatched feature/aspect: "
-                            f"{feature_dict.get("keys", list('-'))[0]}:{feat_choice}"
-                        ),
-                        bcolors.WARNING,
-                    )
-                )
+            msg = (
+                "--! Unmatched feature/aspect: "
+                f"{feature_dict.get("keys", list('-'))[0]}:{feat_choice}"
+            )
+            self.events.warning(
+                "unmatched_aspect",
+                msg,
+                text=c_text(msg, bcolors.WARNING),
+                console=self.settings.SHOW_WARNINGS,
+                pack=self.name,
+            )
             aspect = ""
         return aspect
 
@@ -911,22 +1124,26 @@ class Pack:
 
     def _get_looks_files(self) -> None:  # STEP 2
         """STEP 2 - parse through resolvers"""
-        for t_set in self.component_location.posers:
-            for t in t_set.rglob("*.json"):
-                self.component_location.posers_dict[t.stem] = t
-
-        for t_set in self.component_location.models:
-            for t in t_set.rglob("*.json"):
-                self.component_location.models_dict[t.stem] = t
-
-        for t_set in self.component_location.textures:
-            for t in t_set.rglob("*.png"):
-                self.component_location.textures_dict[t.stem] = t
+        self.assets = AssetIndex.build(
+            files=self.files,
+            roots={
+                FileKind.POSERS: self.component_location.posers,
+                FileKind.MODELS: self.component_location.models,
+                FileKind.TEXTURES: self.component_location.textures,
+            },
+            stem_patterns={
+                FileKind.POSERS: "*.json",
+                FileKind.MODELS: "*.json",
+                FileKind.TEXTURES: "*.png",
+            },
+        )
 
         self._get_looks_resolvers()
 
     @safe_parse_per_file(component_attr="resolvers", DEBUG=DEBUG)
-    def _get_looks_resolvers(self, input_file_path: Path, data: dict) -> None:
+    def _get_looks_resolvers(
+        self, input_file_path: Path, data: dict, file_id: int
+    ) -> None:
         pok_name: str = str(data["species"]).split(":")[-1]
 
         if pok_name not in self.pokemon:
@@ -941,7 +1158,7 @@ class Pack:
             # if for some reason theres a duplicate key, give it a new negative one
             order = min(min(list(self.pokemon[pok_name].resolvers.keys())), 0) - 1
 
-        new_resolver_entry = ResolverEntry(order=order, own_path=input_file_path)
+        new_resolver_entry = ResolverEntry(order=order, own_file=file_id)
         aspects: list[str] = list()
         # ----- parsing through variations
         for v in data.get("variations", list()):
@@ -974,61 +1191,33 @@ class Pack:
     def _resolve_variation_or_layer(
         self, entry: dict, existing_resolver: ResolverEntry
     ) -> ResolverEntry:
-        for _temp_ in self.component_location.posers:
-            if x := entry.get("poser", ""):
-                poser_name: str = str(x).split(":")[-1]
-
-                if (epath := _temp_ / f"{poser_name}.json").exists():
-                    existing_resolver.posers.add(epath)
-                    if poser_name in self.component_location.posers_dict:
-                        del self.component_location.posers_dict[poser_name]
-                else:
-                    if poser_name in self.component_location.posers_dict:
-                        existing_resolver.posers.add(
-                            self.component_location.posers_dict[poser_name]
-                        )
-                        del self.component_location.posers_dict[poser_name]
-
-        for _temp_ in self.component_location.models:
-            # if self.component_location.models:
-            if x := entry.get("model", ""):
-                model_name: str = str(x).split(":")[-1]
-                if (epath := _temp_ / f"{model_name}.json").exists():
-                    existing_resolver.models.add(epath)
-                    if model_name in self.component_location.models_dict:
-                        del self.component_location.models_dict[model_name]
-                else:
-                    if model_name in self.component_location.models_dict:
-                        existing_resolver.models.add(
-                            self.component_location.models_dict[model_name]
-                        )
-                        del self.component_location.models_dict[model_name]
-
-        for _temp_ in self.component_location.textures:
-            # if self.component_location.textures:
-            if x := entry.get("texture", ""):
-                t_entries = list()
-                if isinstance(x, dict):
-                    t_entries.extend(x.get("frames", list()))
-                else:
-                    t_entries.append(x)
-
-                for tex_entry in t_entries:
-                    parts: list[str] = str(tex_entry).split("/")
-                    if "pokemon" in parts:
-                        index = parts.index("pokemon")
-                        partial_path = "/".join(parts[index + 1 :])
-
-                        if (epath := _temp_ / partial_path).exists():
-                            existing_resolver.textures.add(epath)
-                            if epath.stem in self.component_location.textures_dict:
-                                del self.component_location.textures_dict[epath.stem]
-                        else:
-                            if parts[-1] in self.component_location.textures_dict:
-                                existing_resolver.textures.add(
-                                    self.component_location.textures_dict[parts[-1]]
-                                )
-                                del self.component_location.textures_dict[parts[-1]]
+        if x := entry.get("poser", ""):
+            poser_name: str = str(x).split(":")[-1]
+            existing_resolver.posers.update(
+                self.assets.claim(FileKind.POSERS, f"{poser_name}.json", poser_name)
+            )
+
+        if x := entry.get("model", ""):
+            model_name: str = str(x).split(":")[-1]
+            existing_resolver.models.update(
+                self.assets.claim(FileKind.MODELS, f"{model_name}.json", model_name)
+            )
+
+        if x := entry.get("texture", ""):
+            t_entries = list()
+            if isinstance(x, dict):
+                t_entries.extend(x.get("frames", list()))
+            else:
+                t_entries.append(x)
+
+            for tex_entry in t_entries:
+                parts: list[str] = str(tex_entry).split("/")
+                if "pokemon" in parts:
+                    index = parts.index("pokemon")
+                    partial_path = "/".join(parts[index + 1 :])
+                    existing_resolver.textures.update(
+                        self.assets.claim(FileKind.TEXTURES, partial_path, parts[-1])
+                    )
 
         for layer in entry.get("layers", list()):
             existing_resolver = self._resolve_variation_or_layer(
@@ -1040,7 +1229,9 @@ class Pack:
     # ------------------------------------------------------------
 
     @safe_parse_per_file(component_attr="animations", DEBUG=DEBUG)
-    def _get_looks_animations(self, input_file_path: Path, data: dict) -> None:  # STEP 3
+    def _get_looks_animations(
+        self, input_file_path: Path, data: dict, file_id: int
+    ) -> None:  # STEP 3
         anims = data.get("animations", dict())
         if not isinstance(anims, dict):
             return
@@ -1054,12 +1245,14 @@ class Pack:
             else:
                 name = key_parts[1]
                 move = key_parts[2]
+                if len(key_parts) == 3:
+                    self.animation_keys.setdefault(file_id, dict())[key] = (name, move)
 
             if name not in self.present_animations:
                 self.present_animations[name] = dict()
             if move not in self.present_animations[name]:
                 self.present_animations[name][move] = set()
-            self.present_animations[name][move].add(input_file_path)
+            self.present_animations[name][move].add(file_id)
 
     def _update_defined_animation_types(self) -> None:  # STEP 3b
         self.defined_animation_types.update(default_animation_types)
@@ -1068,44 +1261,40 @@ class Pack:
             self.defined_animation_types.update(list(p_entry.keys()))
 
     def _assign_requested_animations(self) -> None:  # STEP 3c
-        for pok in self.pokemon.values():
-            for res in pok.resolvers.values():
-                requested: set[tuple[str, str]] = set()
-                for pose in list(res.posers):
-                    try:
-                        with pose.open() as f:
-                            data = json.load(f)
-                    except (UnicodeDecodeError, JSONDecodeError):
-                        if DEBUG:
-                            print(f"WARN!! - {pose}")
-                            _ = input()
-                        continue
-
-                    for def_anim in self.defined_animation_types:
-                        if def_anim in data:
-                            requested.add(
-                                PoserResolver._parse_poser_animation_line(
-                                    poser_line=data[def_anim]
-                                )
-                            )
-                    if "animations" in data:
-                        requested.update(
-                            PoserResolver._parse_poser_animation_entry(
-                                data["animations"]
+        with StageProgress(
+            stage="parse",
+            label=f"{self.name} posers",
+            total_items=sum(
+                len(res.posers)
+                for pok in self.pokemon.values()
+                for res in pok.resolvers.values()
+            ),
+        ) as progress:
+            for pok in self.pokemon.values():
+                for res in pok.resolvers.values():
+                    requested: set[tuple[str, str]] = set()
+                    for pose_id in list(res.posers):
+                        progress.advance(nbytes=self.files[pose_id].size)
+                        pose = self.files.path(pose_id)
+                        try:
+                            with pose.open() as f:
+                                data = json.load(f)
+                        except (UnicodeDecodeError, JSONDecodeError):
+                            if DEBUG:
+                                print(f"WARN!! - {pose}")
+                                _ = input()
+                            continue
+                        if isinstance(data, dict):
+                            requested.update(
+                                PoserResolver.extract(data, self.defined_animation_types)
                             )
-                        )
-
-                    for _, pose_data in (data.get("poses", dict())).items():
-                        requested.update(
-                            PoserResolver._navigate_poser_entry(poser_entry=pose_data)
-                        )
 
-                for req_entry in list(requested):
-                    p_name, anim_name = req_entry
-                    if p_name not in res.requested_animations:
-                        res.requested_animations[p_name] = dict()
-                    if anim_name not in res.requested_animations[p_name]:
-                        res.requested_animations[p_name][anim_name] = False
+                    for req_entry in list(requested):
+                        p_name, anim_name = req_entry
+                        if p_name not in res.requested_animations:
+                            res.requested_animations[p_name] = dict()
+                        if anim_name not in res.requested_animations[p_name]:
+                            res.requested_animations[p_name][anim_name] = False
 
     # ------------------------------
 
@@ -1160,6 +1349,40 @@ class Pack:
             pokemon.resolvers[resolver_entry].animations.update(a_entry)
         self.accessed_animations.add(pa_name)
 
+    def _get_animation_prune_keys(
+        self, pokemon: Iterable[Pokemon]
+    ) -> dict[int, set[str]]:
+        """{file id: animation keys no resolver of `pokemon` asked for}
+
+        Groups that were never requested by name were attached whole
+        (see STEP 3e) and are left untouched."""
+        requested_groups: set[str] = {
+            pn
+            for pok in self.pokemon.values()
+            for resolver in pok.resolvers.values()
+            for pn, moves in resolver.requested_animations.items()
+            if any(moves.values())
+        }
+
+        keep: dict[int, set[str]] = dict()
+        for pok in pokemon:
+            for resolver in pok.resolvers.values():
+                for file_id in resolver.animations:
+                    if file_id not in self.animation_keys:
+                        continue
+                    f_keep = keep.setdefault(file_id, set())
+                    for key, (name, move) in self.animation_keys[file_id].items():
+                        if (name not in requested_groups) or (
+                            resolver.requested_animations.get(name, dict()).get(move)
+                        ):
+                            f_keep.add(key)
+
+        res: dict[int, set[str]] = dict()
+        for file_id, f_keep in keep.items():
+            if drop := set(self.animation_keys[file_id]).difference(f_keep):
+                res[file_id] = drop
+        return res
+
     # ------------------------------------------------------------
 
     def _get_sounds(self) -> None:
@@ -1168,10 +1391,13 @@ class Pack:
         )
         if self.component_location.sound_jsons:
             try:
-                sj = list(self.component_location.sound_jsons)[0]
+                sj_id = next(self.files.of_kind(FileKind.SOUND_JSONS))
+                sj = self.files.path(sj_id)
                 with sj.open() as f:  # TODO
                     data = json.load(f)
-                    self.sounds.assignment = bcfo(file_path=sj, source=data)
+                    self.sounds.assignment = bcfo(
+                        file_path=sj, source=data, file_id=sj_id
+                    )
             except (UnicodeDecodeError, JSONDecodeError):
                 if DEBUG:
                     print(f"WARN!! - {sj}")
@@ -1183,8 +1409,7 @@ class Pack:
 
     def _get_sound_files(self) -> None:
         if self.component_location.sounds:
-            for sound_file in self.component_location.sounds.rglob("*.ogg"):
-                self.sounds._loose_files.add(sound_file)
+            self.sounds.add_loose_files(self.files.of_kind(FileKind.SOUNDS, "*.ogg"))
 
     def _assign_sound_files(self) -> None:
         for pokemon_sound in self.sounds:
@@ -1246,7 +1471,8 @@ class Pack:
     # ============================================================
 
     def _dirty_pokedex_fix(self) -> None:
-        _edited_files: set[Path] = set()
+        """Marks the selected pokemon as implemented, in `edits`"""
+        _edited_files: set[int] = set()
         for pok in self.pokemon.values():
             if not pok.selected:
                 continue
@@ -1256,19 +1482,21 @@ class Pack:
                     if x is not None:
                         flag = True
                         e_path = x.file_path
-                        if (e_path not in _edited_files) and e_path.exists():
+                        if (x.file_id not in _edited_files) and e_path.exists():
                             data = json.loads(e_path.read_text())
                             data["implemented"] = True
-                            if pok.is_pseudoform and gcr_settings.EXCLUDE_PSEUDOFORMS:
+                            if pok.is_pseudoform and self.settings.EXCLUDE_PSEUDOFORMS:
                                 data["implemented"] = False
-                            e_path.write_text(json.dumps(data, indent=8))
-                            _edited_files.add(e_path)
+                            self.edits[x.file_id] = dump_json(
+                                data, indent=8, settings=self.settings
+                            ).encode()
+                            _edited_files.add(x.file_id)
             if not flag:
                 if [
                     item
                     for form in pok.forms.values()
                     for item in form.spawn_pool
-                    if item
+                    if item is not None
                 ]:
                     sa = {
                         "target": f"cobblemon:{pok.internal_name}",
@@ -1285,12 +1513,18 @@ class Pack:
                             / "data"
                             / "cobblemon"
                             / "species_additions"
+                            / f"{pok.internal_name}.json"
                         )
-                        target_path.mkdir(parents=True, exist_ok=True)
-                        target_path = target_path / f"{pok.internal_name}.json"
 
-                    target_path.write_text(json.dumps(sa, indent=2))
-                    pok.forms[list(pok.forms.keys())[0]].spawn_pool.append(target_path)
+                    # only exists in the export
+                    data = dump_json(sa, indent=2, settings=self.settings).encode()
+                    file_id = self.files.add(
+                        rel_path=self.files.relative(target_path),
+                        size=len(data),
+                        kind=FileKind.SPECIES_ADDITIONS,
+                    )
+                    self.edits[file_id] = data
+                    pok.forms[list(pok.forms.keys())[0]].spawn_pool.append(file_id)
 
     # ============================================================
 
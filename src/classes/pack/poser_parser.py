@@ -1,106 +1,76 @@
-from typing import Any
+from __future__ import annotations
 
+import re
+from typing import Any, Iterable, Iterator
 
-class PoserResolver:
-    @staticmethod
-    def _navigate_poser_entry(
-        poser_entry: dict, existing_set: set[tuple[str, str]] | None = None
-    ) -> set[tuple[str, str]]:
-        if existing_set is None:
-            existing_set: set[tuple[str, str]] = set()
-
-        for t in ["quirks", "animations"]:
-            existing_set.update(
-                PoserResolver._parse_poser_animation_entry(poser_entry.get(t, None))
-            )
-
-        return existing_set
-
-    @staticmethod
-    def _parse_poser_animation_entry(
-        poser_entry: Any, existing_set: set[tuple[str, str]] | None = None
-    ) -> set[tuple[str, str]]:
-        if existing_set is None:
-            existing_set: set[tuple[str, str]] = set()
+from constants.generic import default_animation_types
 
-        if isinstance(poser_entry, str):
-            existing_set.add(
-                PoserResolver._parse_poser_animation_line(poser_line=poser_entry)
-            )
-        elif isinstance(poser_entry, list):
-            existing_set.update(
-                PoserResolver._parse_poser_animation_list(poser_entry=poser_entry)
-            )
-        elif isinstance(poser_entry, dict):
-            existing_set.update(
-                PoserResolver._parse_poser_animation_dict(poser_entry=poser_entry)
-            )
+# q.bedrock('group', 'animation'), q.bedrock_quirk(...), q.bedrock_primary(...),
+# query.bedrock(...), bedrock(...) - the animation may also be a nested call
+# such as q.array('blink', 'blink_2')
+_QUOTED = r"""['"]([^'"]*)['"]"""
+_ANIMATION_CALL = re.compile(
+    rf"(?<![\w.])(?:(?:q|query)\.)?bedrock\w*\(\s*{_QUOTED}\s*,\s*"
+    rf"(?:{_QUOTED}|(?:q|query)\.\w+\(([^()]*)\))"
+)
+_QUOTED_ARG = re.compile(_QUOTED)
 
-        return existing_set
 
-    @staticmethod
-    def _parse_poser_animation_list(
-        poser_entry: list, existing_set: set[tuple[str, str]] | None = None
-    ) -> set[tuple[str, str]]:
-        if existing_set is None:
-            existing_set: set[tuple[str, str]] = set()
-
-        for pl in poser_entry:
-            existing_set.update(PoserResolver._parse_poser_animation_entry(pl))
+class PoserResolver:
+    """Animation references of a poser.
 
-        return existing_set
+    Only the places the game reads animations from are looked at: the
+    top level animation types (the defaults, or every animation name a
+    pack defines when given), the top level `animations` and the
+    `animations` and `quirks` of every pose. Each Molang string found there
+    is matched with one compiled pattern."""
 
     @staticmethod
-    def _parse_poser_animation_dict(
-        poser_entry: dict, existing_set: set[tuple[str, str]] | None = None
+    def extract(
+        poser: dict, animation_types: Iterable[str] = default_animation_types
     ) -> set[tuple[str, str]]:
-        if existing_set is None:
-            existing_set: set[tuple[str, str]] = set()
-
-        if "animations" in poser_entry:
-            existing_set.update(
-                PoserResolver._parse_poser_animation_entry(
-                    poser_entry=poser_entry["animations"]
-                )
-            )
-            del poser_entry["animations"]
-
-        for move, pl in poser_entry.items():
-            existing_set.update(PoserResolver._parse_poser_animation_entry(pl))
-
-        return existing_set
+        """`(group, animation)` pairs referenced by `poser`, not modified"""
+        res: set[tuple[str, str]] = set()
+        for line in PoserResolver._animation_lines(poser, animation_types):
+            res.update(PoserResolver.find(line))
+        return res
 
     @staticmethod
-    def _parse_poser_animation_line(poser_line: str | None) -> tuple[str, str]:
-        if not poser_line:
-            return ("", "")
-
-        try:
-            for stw in ["q.bedrock", "q.bedrock_quirk", "bedrock"]:
-                if poser_line.startswith(stw):
-                    return PoserResolver._extract_poser_animation_line(
-                        poser_line=poser_line
-                    )
-        except:  # handle this better
-            pass
-        return ("", "")
+    def find(line: str) -> set[tuple[str, str]]:
+        """`(group, animation)` pairs of the bedrock calls in a Molang string"""
+        res: set[tuple[str, str]] = set()
+        for m in _ANIMATION_CALL.finditer(line):
+            group, animation, nested = m.groups()
+            if animation is not None:
+                res.add((group, animation))
+            else:
+                res.update((group, a) for a in _QUOTED_ARG.findall(nested))
+        return res
+
+    # ------------------------------------------------------------
 
     @staticmethod
-    def _extract_poser_animation_line(poser_line: str) -> tuple[str, str]:
-        poser_line = PoserResolver._extract_parentheses(poser_line=poser_line)
-        parts = poser_line.split(",")
-        name = parts[0].strip(" ''").strip('"')
-        move = parts[1]
-        if move.startswith("q."):
-            move = PoserResolver._extract_parentheses(move)
-        move = move.strip(" ''").strip('"')
-        return (name, move)
-        "" "faint" ""
+    def _animation_lines(poser: dict, animation_types: Iterable[str]) -> Iterator[str]:
+        for key in animation_types:
+            if isinstance(line := poser.get(key), str):
+                yield line
+        yield from PoserResolver._strings(poser.get("animations"))
+
+        poses = poser.get("poses")
+        if not isinstance(poses, dict):
+            return
+        for pose in poses.values():
+            if isinstance(pose, dict):
+                for key in ("animations", "quirks"):
+                    yield from PoserResolver._strings(pose.get(key))
 
     @staticmethod
-    def _extract_parentheses(poser_line: str) -> str:
-        parts = poser_line.split("(")
-        poser_line = "(".join(parts[1:]) if len(parts) > 2 else parts[1]
-        parts = poser_line.split(")")
-        poser_line = ")".join(parts[:-1]) if len(parts) > 2 else parts[0]
-        return poser_line
+    def _strings(entry: Any) -> Iterator[str]:
+        if isinstance(entry, str):
+            yield entry
+        elif isinstance(entry, list):
+            for x in entry:
+                yield from PoserResolver._strings(x)
+        elif isinstance(entry, dict):
+            for x in entry.values():
+                yield from PoserResolver._strings(x)
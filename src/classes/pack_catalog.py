@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from classes.pack import Pack
+
+_SCHEMA = """
+CREATE TABLE packs (
+    pack_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    source TEXT,
+    position INTEGER NOT NULL,
+    is_base INTEGER NOT NULL,
+    is_mod INTEGER NOT NULL
+);
+CREATE TABLE files (
+    pack_id INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    rel_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    is_dir INTEGER NOT NULL,
+    PRIMARY KEY (pack_id, file_id)
+);
+CREATE TABLE pokemon (
+    pack_id INTEGER NOT NULL,
+    internal_name TEXT NOT NULL,
+    name TEXT,
+    dex_id INTEGER,
+    is_pseudoform INTEGER NOT NULL,
+    selected INTEGER NOT NULL,  -- picked by the choose mode resolution
+    pre_evos INTEGER NOT NULL,
+    evos INTEGER NOT NULL,
+    PRIMARY KEY (pack_id, internal_name)
+);
+CREATE TABLE forms (
+    pack_id INTEGER NOT NULL,
+    internal_name TEXT NOT NULL,
+    form TEXT NOT NULL,
+    aspects TEXT NOT NULL,
+    has_spawn INTEGER NOT NULL,
+    has_species INTEGER NOT NULL,
+    has_additions INTEGER NOT NULL,
+    has_graphics INTEGER NOT NULL,
+    is_complete INTEGER NOT NULL,
+    PRIMARY KEY (pack_id, internal_name, form)
+);
+CREATE TABLE resolvers (
+    pack_id INTEGER NOT NULL,
+    internal_name TEXT NOT NULL,
+    resolver INTEGER NOT NULL,
+    own_file INTEGER,
+    has_shiny INTEGER NOT NULL,
+    aspects TEXT NOT NULL,
+    PRIMARY KEY (pack_id, internal_name, resolver)
+);
+CREATE TABLE resolver_files (
+    pack_id INTEGER NOT NULL,
+    internal_name TEXT NOT NULL,
+    resolver INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    file_id INTEGER NOT NULL
+);
+CREATE TABLE evolutions (
+    pack_id INTEGER NOT NULL,
+    from_pokemon TEXT NOT NULL,
+    to_pokemon TEXT NOT NULL,
+    file_id INTEGER NOT NULL,
+    is_addition INTEGER NOT NULL
+);
+CREATE TABLE features (
+    pack_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    feat_type TEXT NOT NULL,
+    aspect INTEGER NOT NULL,
+    keys TEXT NOT NULL,
+    file_id INTEGER NOT NULL
+);
+CREATE TABLE lang_keys (
+    pack_id INTEGER NOT NULL,
+    lang TEXT NOT NULL,
+    key TEXT NOT NULL
+);
+CREATE TABLE sounds (
+    pack_id INTEGER NOT NULL,
+    internal_name TEXT NOT NULL,
+    move TEXT,
+    file_id INTEGER NOT NULL
+);
+CREATE INDEX pokemon_by_name ON pokemon (internal_name, pack_id);
+CREATE INDEX forms_by_graphics ON forms (has_graphics, internal_name);
+CREATE INDEX files_by_kind ON files (kind, pack_id);
+CREATE INDEX evolutions_by_target ON evolutions (to_pokemon);
+CREATE INDEX lang_by_key ON lang_keys (key);
+"""
+
+
+@dataclass
+class PackCatalog:
+    """Resolved packs written to a local SQLite database, kept next to the
+    output to be queried after the run ("which packs define X", "forms
+    with graphics", ...).
+
+    Packs are keyed by `pack_id`, their position in the load order, names
+    are not unique."""
+
+    db_path: Path
+
+    _conn: sqlite3.Connection | None = field(default=None, repr=False)
+
+    def open(self) -> PackCatalog:
+        """Start from an empty database, a catalog describes a single run"""
+        self.close()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db_path.unlink(missing_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.executescript(_SCHEMA)
+        return self
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------
+
+    def add_pack(self, pack: Pack, pack_id: int) -> None:
+        source = pack.zip_location or pack.folder_location
+        with self._conn as c:
+            c.execute(
+                "INSERT INTO packs VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    pack_id,
+                    pack.name,
+                    str(source) if source is not None else None,
+                    pack_id,
+                    pack.is_base,
+                    pack.is_mod,
+                ),
+            )
+            if pack.files is not None:
+                c.executemany(
+                    "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        (pack_id, f_id, f.rel_path, f.size, f.kind.value, f.is_dir)
+                        for f_id, f in enumerate(pack.files.entries)
+                    ),
+                )
+            c.executemany(
+                "INSERT INTO pokemon VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        pack_id,
+                        pok_name,
+                        pok.name,
+                        pok.dex_id,
+                        pok.is_pseudoform,
+                        pok.selected,
+                        pok.pre_evos,
+                        pok.evos,
+                    )
+                    for pok_name, pok in pack.pokemon.items()
+                ),
+            )
+            c.executemany(
+                "INSERT INTO forms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        pack_id,
+                        pok_name,
+                        form_name,
+                        json.dumps(sorted(form.aspects)),
+                        form.has_spawn(),
+                        form.has_species_data(),
+                        form.has_addition_data(),
+                        form.has_graphics(),
+                        form.is_complete(),
+                    )
+                    for pok_name, pok in pack.pokemon.items()
+                    for form_name, form in pok.forms.items()
+                ),
+            )
+            c.executemany(
+                "INSERT INTO resolvers VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        pack_id,
+                        pok_name,
+                        r_key,
+                        res.own_file,
+                        res.has_shiny,
+                        json.dumps(sorted(res.aspects)),
+                    )
+                    for pok_name, pok in pack.pokemon.items()
+                    for r_key, res in pok.resolvers.items()
+                ),
+            )
+            c.executemany(
+                "INSERT INTO resolver_files VALUES (?, ?, ?, ?, ?)",
+                (
+                    (pack_id, pok_name, r_key, role, f_id)
+                    for pok_name, pok in pack.pokemon.items()
+                    for r_key, res in pok.resolvers.items()
+                    for role in ["models", "posers", "animations", "textures"]
+                    for f_id in sorted(getattr(res, role))
+                ),
+            )
+            c.executemany(
+                "INSERT INTO evolutions VALUES (?, ?, ?, ?, ?)",
+                (
+                    (pack_id, ev.from_pokemon, ev.to_pokemon, ev.file_id, ev.is_addition)
+                    for ev in pack.registered_evolutions.evolutions
+                ),
+            )
+            c.executemany(
+                "INSERT INTO features VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        pack_id,
+                        feat.name,
+                        feat.feat_type.value,
+                        feat.aspect,
+                        json.dumps(feat.keys),
+                        feat.file_id,
+                    )
+                    for feat in pack.features.values()
+                ),
+            )
+            c.executemany(
+                "INSERT INTO lang_keys VALUES (?, ?, ?)",
+                (
+                    (pack_id, lang.name, key)
+                    for lang in pack.lang_entries
+                    for key in lang.source
+                ),
+            )
+            if pack.sounds is not None:
+                c.executemany(
+                    "INSERT INTO sounds VALUES (?, ?, ?, ?)",
+                    PackCatalog._sound_rows(pack_id, pack.sounds.entries.values()),
+                )
+
+    @staticmethod
+    def _sound_rows(pack_id: int, entries: Iterable) -> Iterable[tuple]:
+        for entry in entries:
+            for move, file_ids in entry.moves.items():
+                for f_id in sorted(file_ids):
+                    yield (pack_id, entry.internal_name, move, f_id)
+            for f_id in sorted(entry._unassigned_files):
+                yield (pack_id, entry.internal_name, None, f_id)
+
+    # ------------------------------------------------------------
+
+    def print_summary(self) -> None:
+        counts = {
+            table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ["packs", "pokemon", "forms", "files"]
+        }
+        print(
+            f"Catalog: {counts['packs']} packs, {counts['pokemon']} pokemon, "
+            f"{counts['forms']} forms, {counts['files']} files -> {self.db_path.name}"
+        )
@@ -1,11 +1,10 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from pathlib import Path
 from typing import TYPE_CHECKING, Optional
 
 from classes.base_classes import PackHolder
-from constants.runtime_const import CrOpType, gcr_settings
+from constants.runtime_const import CrOpType
 from utils.text_utils import bcolors, c_text
 
 # from classes.sounds import SoundEntry
@@ -52,7 +51,7 @@ class Pokemon:
     requested: int = 0
     request_transfered: int = 0
 
-    sa_transfers_received: set[Path] = field(default_factory=set)
+    sa_transfers_received: set[int] = field(default_factory=set)
 
     _extracted_sa: dict = field(default_factory=dict)
 
@@ -76,7 +75,7 @@ class Pokemon:
 
         for entry in evo_requests:
             if entry.is_addition:
-                self.sa_transfers_received.add(entry.file_path)
+                self.sa_transfers_received.add(entry.file_id)
 
             pre_evolution = entry.from_pokemon
             pre_evolution = pre_evolution.split("_")[0]
@@ -106,12 +105,12 @@ class Pokemon:
                 )
         return False
 
-    def get_all_export_paths(self) -> list[Path]:
-        res: set[Path] = set()
+    def get_all_export_paths(self) -> list[int]:
+        res: set[int] = set()
         for form in self.forms.values():
             res.update(form.get_all_paths())
 
-        if gcr_settings.OP_MODE == CrOpType.CHOOSE:
+        if self.parent_pack.settings.OP_MODE == CrOpType.CHOOSE:
             res.update(self.sa_transfers_received)
         res.update(self._get_relevant_feature_files())
         return list(res)
@@ -123,27 +122,27 @@ class Pokemon:
                 res.update(form.sound_entry.data)
         return res
 
-    def get_all_paths(self) -> set[Path]:
-        res: set[Path] = set()
+    def get_all_paths(self) -> set[int]:
+        res: set[int] = set()
         res.update(self.get_all_export_paths())
         for r in self.resolvers.values():
             res.update(r.get_all_paths())
         return res
 
-    def _get_relevant_feature_files(self) -> set[Path]:
-        res: set[Path] = set()
+    def _get_relevant_feature_files(self) -> set[int]:
+        res: set[int] = set()
         feats: set[str] = set(self.features)
         for fa in self.parent_pack.feature_assignments:
             if self.internal_name in fa.incl_pokemon:
-                res.add(fa.file_path)
+                res.add(fa.file_id)
                 feats.update(fa.source.get("features", list()))
         for feat in feats:
             if feat in self.parent_pack.features:
-                res.add(self.parent_pack.features[feat].file_path)
+                res.add(self.parent_pack.features[feat].file_id)
             else:
                 for pf in self.parent_pack.features.values():
                     if feat in pf.keys:
-                        res.add(pf.file_path)
+                        res.add(pf.file_id)
         return res
 
     def is_fully_data_merged(self):
@@ -27,7 +27,7 @@ class PokemonForm:
     species: bcfo | None = None
     species_additions: bcfo | None = None
 
-    spawn_pool: list[Path] = field(default_factory=list)
+    spawn_pool: list[int] = field(default_factory=list)
 
     sound_entry: SoundEntry | None = None
 
@@ -165,11 +165,11 @@ class PokemonForm:
 
         return res
 
-    def get_all_paths(self) -> list[Path]:
-        res: set[Path] = set()
+    def get_all_paths(self) -> list[int]:
+        res: set[int] = set()
         for x in [self.species, self.species_additions]:
             if x:
-                res.add(x.file_path)
+                res.add(x.file_id)
         for s in self.spawn_pool:
             res.add(s)
         if self.parent_pokemon:
@@ -257,13 +257,13 @@ class PokemonForm:
 @dataclass
 class ResolverEntry:
     order: int
-    own_path: Path | None = None
-    models: set[Path] = field(default_factory=set)
+    own_file: int | None = None
+    models: set[int] = field(default_factory=set)
 
-    posers: set[Path] = field(default_factory=set)
-    animations: set[Path] = field(default_factory=set)
+    posers: set[int] = field(default_factory=set)
+    animations: set[int] = field(default_factory=set)
 
-    textures: set[Path] = field(default_factory=set)
+    textures: set[int] = field(default_factory=set)
     has_shiny: bool = False
 
     aspects: set[str] = field(default_factory=set)
@@ -295,9 +295,10 @@ class ResolverEntry:
         res.append(self.has_shiny)
         return res
 
-    def get_all_paths(self) -> set[Path]:
-        res: set[Path] = set()
-        res.add(self.own_path)
+    def get_all_paths(self) -> set[int]:
+        res: set[int] = set()
+        if self.own_file is not None:
+            res.add(self.own_file)
         for x in [self.models, self.posers, self.animations, self.textures]:
             res.update(x)
         return res
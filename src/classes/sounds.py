@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-import json
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Generator, Optional
+from typing import TYPE_CHECKING, Any, Generator, Iterable, Optional
 
 from classes.base_classes import bcfo
 
@@ -14,22 +13,33 @@ if TYPE_CHECKING:
 @dataclass
 class SoundEntry:
     internal_name: str
-    moves: dict[str, set[Path]] = field(default_factory=dict)
-    _unassigned_files: set[Path] = field(default_factory=set)
+    moves: dict[str, set[int]] = field(default_factory=dict)
+    _unassigned_files: set[int] = field(default_factory=set)
     data: dict[str, dict] = field(default_factory=dict)
 
-    def get_all_files(self) -> set[Path]:
-        res: set[Path] = set()
-        res.update(self._unassigned_files)
-        for m in self.moves.values():
-            res.update(m)
-        return res
+    # every file of `moves` and `_unassigned_files`
+    _files: set[int] = field(default_factory=set)
+
+    def add_move(self, move_name: str) -> None:
+        if move_name not in self.moves:
+            self.moves[move_name] = set()
+
+    def add_file(self, file_id: int, move_name: str | None = None) -> None:
+        if move_name:
+            self.add_move(move_name)
+            self.moves[move_name].add(file_id)
+        else:
+            self._unassigned_files.add(file_id)
+        self._files.add(file_id)
+
+    def get_all_files(self) -> set[int]:
+        return set(self._files)
 
     def has_files(self) -> bool:
         return bool(self._unassigned_files) or bool(self.moves)
 
     def __contains__(self, item) -> bool:
-        return (item in self.get_all_files()) or (item in self.moves.keys())
+        return (item in self._files) or (item in self.moves)
 
 
 @dataclass
@@ -37,11 +47,24 @@ class SoundPack:
     assignment: bcfo | None = None
     entries: dict[str, SoundEntry] = field(default_factory=dict)
 
-    _loose_files: set[Path] = field(default_factory=set)
+    _loose_files: set[int] = field(default_factory=set)
+    # {path relative to `_base_folder`: file id} of the pack's .ogg files
+    _ogg_index: dict[str, int] = field(default_factory=dict)
 
     _base_folder: Path | None = None
     _parent_pack: Optional["Pack"] = None
 
+    def add_loose_files(self, file_ids: Iterable[int]) -> None:
+        files = self._parent_pack.files
+        base_rel = (
+            files.relative(self._base_folder) if self._base_folder is not None else None
+        )
+        prefix = f"{base_rel}/" if base_rel else ""
+        for file_id in file_ids:
+            self._loose_files.add(file_id)
+            if (base_rel is not None) and files[file_id].rel_path.startswith(prefix):
+                self._ogg_index[files[file_id].rel_path[len(prefix) :]] = file_id
+
     def process(self) -> None:
         self._process_assignment()
         self._process_remaining_loose_files()
@@ -49,10 +72,8 @@ class SoundPack:
     def _process_assignment(self) -> None:
         if not self.assignment:
             return
-        try:
-            with self.assignment.file_path.open() as f:
-                data: dict[str, dict] = json.load(f)
-        except Exception:
+        data: dict[str, dict] = self.assignment.source
+        if not isinstance(data, dict):
             return
 
         for key in data.keys():
@@ -75,8 +96,7 @@ class SoundPack:
 
             se: SoundEntry = self.entries[pok_name]
             if move_name:
-                if move_name not in se:
-                    se.moves[move_name] = set()
+                se.add_move(move_name)
 
             sounds_data_entry = data[key]
             se.data[key] = sounds_data_entry
@@ -88,20 +108,19 @@ class SoundPack:
                 if not parts[-1].endswith(".ogg"):
                     parts[-1] = f"{parts[-1]}.ogg"
 
-                if (x := (self._base_folder / ("/".join(parts[1:])))).exists():
-                    if move_name:
-                        se.moves[move_name].add(x)
-                    else:
-                        se._unassigned_files.add(x)
-                    if x in self._loose_files:
-                        self._loose_files.remove(x)
+                x = self._ogg_index.get("/".join([p for p in parts[1:] if p]))
+                if x is not None:
+                    se.add_file(x, move_name=move_name)
+                    self._loose_files.discard(x)
 
     def _process_remaining_loose_files(self) -> None:
-        lpcp = self._loose_files.copy()
-        for item in lpcp:
-            pok_name = (item.parent).name
+        files = self._parent_pack.files
+        for item in self._loose_files:
+            entry = files[item]
+            path_parts = entry.rel_path.split("/")
+            pok_name = path_parts[-2] if len(path_parts) > 1 else ""
 
-            parts = (item.stem).split("_")
+            parts = (entry.stem).split("_")
             if pok_name == "pokemon":
                 pok_name = parts[0]
 
@@ -112,16 +131,8 @@ class SoundPack:
             if pok_name not in self:
                 self.entries[pok_name] = SoundEntry(internal_name=pok_name)
 
-            se: SoundEntry = self.entries[pok_name]
-            if move_name:
-                if move_name not in se:
-                    se.moves[move_name] = set()
-
-            if move_name:
-                se.moves[move_name].add(item)
-            else:
-                se._unassigned_files.add(item)
-            self._loose_files.remove(item)
+            self.entries[pok_name].add_file(item, move_name=move_name)
+        self._loose_files.clear()
 
     def __contains__(self, pokemon: str) -> bool:
         return pokemon in self.entries.keys()
@@ -130,10 +141,10 @@ class SoundPack:
         for mon in self.entries.values():
             yield mon
 
-    def get_all_files(self) -> set[Path]:
-        res: set[Path] = set()
+    def get_all_files(self) -> set[int]:
+        res: set[int] = set()
         if self.assignment:
-            res.add(self.assignment.file_path)
+            res.add(self.assignment.file_id)
         res.update(self._loose_files)
         for en in self.entries.values():
             res.update(en.get_all_files())
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+try:
+    import fcntl
+except ImportError:  # windows
+    import msvcrt
+
+    fcntl = None
+
+RUN_PREFIX = "CobbleResolver_run_"
+LOCK_NAME = ".lock"
+SCRATCH_ENV = "COBBLERESOLVER_SCRATCH"
+# a directory that was just created may not be locked yet, unlocked ones are
+# only taken for stale after this many seconds, or this long without a lock file
+STALE_MIN_AGE = 60.0
+STALE_NO_LOCK_AGE = 3600.0
+
+# background deletes, by directory
+_pending: dict[Path, threading.Thread] = dict()
+_pending_lock = threading.Lock()
+
+
+def _try_lock(f: IO) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)  # the locked byte range starts at the file position
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _delete(paths: list[Path]) -> None:
+    for p in paths:
+        shutil.rmtree(p, ignore_errors=True)
+        with contextlib.suppress(OSError):
+            p.parent.rmdir()  # the scratch root, once no run is left in it
+    with _pending_lock:
+        for p in paths:
+            if _pending.get(p) is threading.current_thread():
+                del _pending[p]
+
+
+def _remove(paths: list[Path], background: bool = True) -> None:
+    if not paths:
+        return
+    if not background:
+        return _delete(paths)
+    # not a daemon, the interpreter waits for it before exiting
+    thread = threading.Thread(target=_delete, args=(paths,), name="workspace-cleanup")
+    with _pending_lock:
+        for p in paths:
+            _pending[p] = thread
+    thread.start()
+
+
+def wait_for_cleanup(path: Path | None = None) -> None:
+    """Block until the background delete of `path`, or of everything, is done"""
+    with _pending_lock:
+        if path is None:
+            threads = set(_pending.values())
+        else:
+            threads = {t} if (t := _pending.get(path)) is not None else set()
+    for t in threads:
+        t.join()
+
+
+@dataclass
+class Workspace:
+    """Scratch space of one run, extracted archives and the staged output.
+
+    Each run gets its own directory under `root`, held by a lock on its
+    `.lock` file, so runs on the same working folder never share one.
+    Directories whose lock is free were left by a run that died, they are
+    reclaimed when the next run starts. Deletes happen on a background
+    thread."""
+
+    root: Path
+    name: str | None = None  # fixed run directory name, unique when None
+
+    path: Path | None = None
+    reclaimed: int = 0
+
+    _lock_file: IO | None = field(default=None, repr=False)
+
+    @classmethod
+    def for_run(
+        cls, working_dir: Path, scratch_root: str = "", name: str | None = None
+    ) -> Workspace:
+        """`scratch_root` is the SCRATCH_ROOT setting, a tmpfs or fast disk.
+        When empty, $COBBLERESOLVER_SCRATCH or `.temp` in the working folder"""
+        scratch_root = scratch_root or os.environ.get(SCRATCH_ENV, "")
+        return cls(
+            root=Path(scratch_root) if scratch_root else working_dir / ".temp",
+            name=name,
+        )
+
+    @property
+    def extraction_path(self) -> Path:
+        return self.path / "extract"
+
+    @property
+    def staging_path(self) -> Path:
+        return self.path / "stage"
+
+    def open(self) -> Workspace:
+        if self.path is not None:
+            return self
+        name = self.name or f"{RUN_PREFIX}{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        path = self.root / name
+        wait_for_cleanup(path)  # a fixed name may still be being deleted
+
+        path.mkdir(parents=True, exist_ok=True)
+        self._lock_file = open(path / LOCK_NAME, "a+")
+        if not _try_lock(self._lock_file):
+            self._lock_file.close()
+            self._lock_file = None
+            raise RuntimeError(f"Scratch directory {path} is used by another run")
+        self.path = path
+        self.extraction_path.mkdir(exist_ok=True)
+        self.staging_path.mkdir(exist_ok=True)
+
+        self._reclaim_stale()
+        return self
+
+    def release(self, background: bool = True) -> None:
+        """Unlock and delete the run directory"""
+        if self.path is None:
+            return
+        path, self.path = self.path, None
+        self._lock_file.close()  # releases the lock
+        self._lock_file = None
+        _remove([path], background=background)
+
+    # ------------------------------------------------------------
+
+    def _reclaim_stale(self) -> None:
+        stale: list[Path] = list()
+        for d in self.root.iterdir():
+            if (d == self.path) or (not d.name.startswith(RUN_PREFIX)):
+                continue
+            if not d.is_dir():
+                continue
+            with _pending_lock:
+                if d in _pending:
+                    continue
+            if Workspace._is_stale(d):
+                stale.append(d)
+        self.reclaimed = len(stale)
+        _remove(stale)
+
+    @staticmethod
+    def _is_stale(path: Path) -> bool:
+        lock_path = path / LOCK_NAME
+        try:
+            age = time.time() - path.stat().st_mtime
+            if not lock_path.exists():
+                return age > STALE_NO_LOCK_AGE
+            if age < STALE_MIN_AGE:
+                return False
+            with open(lock_path, "a+") as f:
+                return _try_lock(f)
+        except OSError:
+            return False
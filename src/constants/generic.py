@@ -1,7 +1,8 @@
 default_animation_types: list[str] = [
     "ground_idle",
     "ground_walk",
-    "ground_run" "air_idle",
+    "ground_run",
+    "air_idle",
     "air_fly",
     "water_idle",
     "water_swim",
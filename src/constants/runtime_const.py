@@ -18,6 +18,24 @@ class CrOpType(Enum):
     MERGE = 1
 
 
+class JsonOutputType(Enum):
+    COMPACT = 0
+    PRETTY = 1
+
+
+class MemoryProfileType(Enum):
+    OFF = 0
+    RSS = 1
+    TRACEMALLOC = 2
+
+
+class EventLevel(Enum):
+    DEBUG = 10
+    INFO = 20
+    WARNING = 30
+    ERROR = 40
+
+
 @dataclass
 class SettingMeta:
     """Metadata for each setting"""
@@ -47,6 +65,17 @@ class CRSettings:
     AUTO_LOAD_ORDER_MODE: bool = False
     ALTERNATE_ICON: bool = False
 
+    JSON_OUTPUT: "JsonOutputType" = JsonOutputType.COMPACT
+    PRUNE_ANIMATIONS: bool = False
+    PLAN_ONLY: bool = False
+    CATALOG: bool = False
+    EVENT_LOG: bool = False
+    CONSOLE_LEVEL: "EventLevel" = EventLevel.INFO
+    PARSE_WORKERS: int = 0  # 0 = automatic
+    MERGE_WORKERS: int = 0  # 0 = automatic
+    MEMORY_PROFILE: "MemoryProfileType" = MemoryProfileType.OFF
+    SCRATCH_ROOT: str = ""  # "" = $COBBLERESOLVER_SCRATCH, else .temp in the folder
+
     SHOW_ADVANCED_SETTINGS: SettingsMetaType = SettingsMetaType.OFF
 
 
@@ -62,12 +91,22 @@ SETTINGS_META = {
     "KEEP_DUPLICATE_SPAWNS_ON_MOVE": SettingMeta(hidden=True),
     "SPECIES_STRICT_KEY_MATCH": SettingMeta(hidden=True),
     "AUTO_START": SettingMeta(hidden=True),
+    "PARSE_WORKERS": SettingMeta(hidden=True),
+    "MERGE_WORKERS": SettingMeta(hidden=True),
+    "SCRATCH_ROOT": SettingMeta(hidden=True),
+    "MEMORY_PROFILE": SettingMeta(hidden=True),
     # Spacers
     "AUTO_LOAD_ORDER_MODE": SettingMeta(after_spacer=True),
     "POKEDEX_FIX": SettingMeta(after_spacer=True),
     "PROCESS_MODS": SettingMeta(after_spacer=True, hidden=True),
     "COMBINE_POKEMON_MOVES": SettingMeta(after_spacer=True),
     "SHOW_WARNINGS": SettingMeta(after_spacer=True),
+    "JSON_OUTPUT": SettingMeta(hidden=True),
+    "PRUNE_ANIMATIONS": SettingMeta(hidden=True),
+    "PLAN_ONLY": SettingMeta(hidden=True),
+    "CATALOG": SettingMeta(hidden=True),
+    "EVENT_LOG": SettingMeta(hidden=True),
+    "CONSOLE_LEVEL": SettingMeta(hidden=True),
     "SHOW_ADVANCED_SETTINGS": SettingMeta(after_spacer=True),
 }
 
@@ -75,12 +114,16 @@ SETTINGS_META_ADV = {
     # Hidden settings
     "SPECIES_STRICT_KEY_MATCH": SettingMeta(hidden=True),
     "AUTO_START": SettingMeta(hidden=True),
+    "PARSE_WORKERS": SettingMeta(hidden=True),
+    "MERGE_WORKERS": SettingMeta(hidden=True),
+    "SCRATCH_ROOT": SettingMeta(hidden=True),
     # Spacers
     "AUTO_LOAD_ORDER_MODE": SettingMeta(after_spacer=True),
     "POKEDEX_FIX": SettingMeta(after_spacer=True),
     "PROCESS_MODS": SettingMeta(after_spacer=True),
     "COMBINE_POKEMON_MOVES": SettingMeta(after_spacer=True),
     "SHOW_WARNINGS": SettingMeta(after_spacer=True),
+    "JSON_OUTPUT": SettingMeta(after_spacer=True),
     "SHOW_ADVANCED_SETTINGS": SettingMeta(after_spacer=True),
 }
 
@@ -17,6 +17,9 @@ class DefaultNames:
     BASE_FORM = "base_form"
     BASE_COBBLE_MOD = "BASE"
     FINAL_PACK_NAME = "CobbleResolver_Pack"
+    PLAN_FILE_NAME = "CobbleResolver_Plan.json"
+    CATALOG_FILE_NAME = "CobbleResolver_Catalog.sqlite"
+    EVENT_LOG_FILE_NAME = "CobbleResolver_Events.jsonl"
     REMAINDER_PACK_PREFIX = "[CE]"
     ICON_NAME = "pack_icon"
     ALT_ICON = "alt_pack_icon"
@@ -10,14 +10,24 @@ def bool_square(inp: bool = False) -> str:
 
 
 def line_header(text: str = "") -> None:
-    print(f"\n#{'='*25}\n#  {text}\n#{'='*25}\n")
+    print(line_header_text(text))
+
+
+def line_header_text(text: str = "") -> str:
+    return f"\n#{'='*25}\n#  {text}\n#{'='*25}\n"
 
 
 def pack_name_choice(text: str = ""):
-    print(c_text(f"={'-'*15}", color=bcolors.WARNING))
-    print(f"Selected: [{text}]")
-    print(c_text(f"={'-'*15}", color=bcolors.WARNING))
-    print("=" * 25)
+    print(pack_name_choice_text(text))
+
+
+def pack_name_choice_text(text: str = "") -> str:
+    return (
+        f"{c_text(f"={'-'*15}", color=bcolors.WARNING)}\n"
+        f"Selected: [{text}]\n"
+        f"{c_text(f"={'-'*15}", color=bcolors.WARNING)}\n"
+        f"{'=' * 25}"
+    )
 
 
 _help_menu_index = {
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import shutil
+import sys
+import time
+from dataclasses import dataclass
+from typing import TextIO
+
+LIVE_INTERVAL: float = 0.1  # seconds between redraws on a terminal
+PLAIN_INTERVAL: float = 5.0  # seconds between lines otherwise
+
+
+def _fmt_time(seconds: float) -> str:
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{(seconds % 3600) // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+@dataclass
+class StageProgress:
+    """Counter for one stage of a run (unpack, parse, merge, export, compress).
+
+    On a terminal a single line is redrawn in place and removed when the
+    stage ends. Otherwise a plain line is printed every few seconds, so
+    logs only grow for stages slow enough to need it."""
+
+    stage: str
+    label: str = ""
+    total_items: int = 0
+    total_bytes: int = 0
+    unit: str = "files"
+
+    done_items: int = 0
+    done_bytes: int = 0
+
+    stream: TextIO | None = None
+    live: bool | None = None  # None = whether `stream` is a terminal
+
+    _started: float = 0.0
+    _last_draw: float = 0.0
+    _drawn: bool = False
+
+    def __enter__(self) -> StageProgress:
+        if self.stream is None:
+            self.stream = sys.stdout
+        if self.live is None:
+            try:
+                self.live = self.stream.isatty()
+            except Exception:
+                self.live = False
+        self._started = self._last_draw = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self._drawn:
+            return
+        if self.live:
+            self.stream.write("\r\033[K")
+        else:
+            self.stream.write(f"{self.describe(done=True)}\n")
+        self.stream.flush()
+
+    def advance(self, items: int = 1, nbytes: int = 0) -> None:
+        self.done_items += items
+        self.done_bytes += nbytes
+        now = time.perf_counter()
+        if (now - self._last_draw) < (LIVE_INTERVAL if self.live else PLAIN_INTERVAL):
+            return
+        self._last_draw = now
+        self._drawn = True
+        if self.live:
+            width = shutil.get_terminal_size().columns - 1
+            self.stream.write(f"\r{self.describe()[:width]}\033[K")
+        else:
+            self.stream.write(f"{self.describe()}\n")
+        self.stream.flush()
+
+    def describe(self, done: bool = False) -> str:
+        elapsed = max(time.perf_counter() - self._started, 1e-6)
+        rate = self.done_items / elapsed
+
+        res = f"[{self.stage}]{f' {self.label}' if self.label else ''} "
+        if self.total_items:
+            res += f"{self.done_items}/{self.total_items} {self.unit}"
+        else:
+            res += f"{self.done_items} {self.unit}"
+        res += f", {rate:.1f} {self.unit}/s"
+        if self.done_bytes:
+            res += f", {self.done_bytes / elapsed / 1e6:.1f} MB/s"
+
+        if done:
+            res += f", took {_fmt_time(elapsed)}"
+        elif self.total_bytes and self.done_bytes:
+            eta = (self.total_bytes - self.done_bytes) * elapsed / self.done_bytes
+            res += f", ETA {_fmt_time(eta)}"
+        elif self.total_items and rate:
+            res += f", ETA {_fmt_time((self.total_items - self.done_items) / rate)}"
+        return res
@@ -1,5 +1,7 @@
-from copy import deepcopy
-from typing import Any, Dict, List
+from typing import Any, Dict, Hashable, List
+
+# Inputs are treated as read-only: results share every value they don't change
+# with the inputs, only the containers that get combined are new.
 
 
 def combine(*values: Any) -> Any:
@@ -53,8 +55,8 @@ def dict_combine(*dicts: Dict) -> Dict:
     if not all(isinstance(d, dict) for d in dicts):
         return dicts[0]
 
-    # Start with a deep copy of the first dict
-    result = deepcopy(dicts[0])
+    # Start with a (shallow) copy of the first dict
+    result = dict(dicts[0])
 
     # Combine with each subsequent dict
     for next_dict in dicts[1:]:
@@ -63,13 +65,13 @@ def dict_combine(*dicts: Dict) -> Dict:
 
         for key, value in next_dict.items():
             if key not in result:
-                result[key] = deepcopy(value)
+                result[key] = value
                 continue
 
             # Both dicts have this key - need to resolve
             if _is_empty(result[key]) and not _is_empty(value):
                 # Take non-empty value
-                result[key] = deepcopy(value)
+                result[key] = value
             elif _is_empty(value) and not _is_empty(result[key]):
                 # Keep existing non-empty value
                 continue
@@ -80,7 +82,7 @@ def dict_combine(*dicts: Dict) -> Dict:
                 result[key] = combine(result[key], value)
             elif value is not None:
                 # Take the new value if it's not None
-                result[key] = deepcopy(value)
+                result[key] = value
 
     return result
 
@@ -101,6 +103,7 @@ def list_combine(*lists: List) -> List:
 
     result = []
     seen = []  # Track "equivalent" items for smarter deduplication
+    seen_keys: dict[Hashable, int] = dict()  # canonical key -> first index in seen
 
     for lst in lists:
         if not lst:  # Skip empty lists
@@ -108,19 +111,26 @@ def list_combine(*lists: List) -> List:
 
         for item in lst:
             # Check if we've seen an equivalent item
-            found_match = False
-            for idx, seen_item in enumerate(seen):
-                if _are_equivalent(item, seen_item):
-                    # Combine with existing equivalent item
-                    if isinstance(item, (dict, list)):
-                        result[idx] = combine(result[idx], item)
-                    found_match = True
-                    break
-
-            if not found_match:
+            match: int | None = None
+            if (key := _canonical_key(item)) is not None:
+                # only items with the same key can be equivalent
+                match = seen_keys.get(key)
+            else:
+                for idx, seen_item in enumerate(seen):
+                    if _are_equivalent(item, seen_item):
+                        match = idx
+                        break
+
+            if match is not None:
+                # Combine with existing equivalent item
+                if isinstance(item, (dict, list)):
+                    result[match] = combine(result[match], item)
+            else:
                 # New unique item
-                result.append(deepcopy(item))
-                seen.append(deepcopy(item))
+                result.append(item)
+                seen.append(item)
+                if key is not None:
+                    seen_keys[key] = len(seen) - 1
 
     return result
 
@@ -134,6 +144,37 @@ def _is_empty(value: Any) -> bool:
     return False
 
 
+def _canonical_key(value: Any) -> Hashable | None:
+    """Hashable key such that two values with a key are `_are_equivalent`
+    exactly when their keys are equal.
+
+    `_are_equivalent` on lists is a subset check, which only matches set
+    equality when the items are distinct. Values holding a list with
+    equivalent items get no key (None); such values are never equivalent to
+    one that has a key, they have to be compared one by one."""
+    if isinstance(value, dict):
+        items = list()
+        for k, v in value.items():
+            if (v_key := _canonical_key(v)) is None:
+                return None
+            items.append((k, v_key))
+        return (dict, frozenset(items))
+    if isinstance(value, list):
+        keys = set()
+        for v in value:
+            if (v_key := _canonical_key(v)) is None:
+                return None
+            keys.add(v_key)
+        if len(keys) != len(value):
+            return None
+        return (list, frozenset(keys))
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    return (type(value), value)
+
+
 def _are_equivalent(a: Any, b: Any) -> bool:
     """
     Helper function to check if two values should
@@ -1,4 +1,4 @@
-from copy import deepcopy
+from collections import Counter
 from typing import Any
 
 
@@ -122,7 +122,16 @@ def _list_equality_pair(a_list: list, b_list: list, loose: bool = False) -> bool
     if len(a_list) != len(b_list):
         return False
 
-    unmatched_b = deepcopy(b_list)
+    if (c_type := _common_scalar_type(a_list, b_list)) is not None:
+        # same-type scalars compare by (case-folded) equality, which is an
+        # equivalence: matching them up one by one is a multiset comparison
+        if loose and c_type is str:
+            return Counter(x.lower() for x in a_list) == Counter(
+                x.lower() for x in b_list
+            )
+        return Counter(a_list) == Counter(b_list)
+
+    unmatched_b = list(b_list)  # only the list is consumed, items are just compared
 
     for item_a in a_list:
         found_match = False
@@ -138,3 +147,17 @@ def _list_equality_pair(a_list: list, b_list: list, loose: bool = False) -> bool
             return False
 
     return True
+
+
+def _common_scalar_type(*lists: list) -> type | None:
+    """The type shared by every item, if it is one of str, int or bool"""
+    c_type = None
+    for lst in lists:
+        for item in lst:
+            if c_type is None:
+                c_type = type(item)
+                if c_type not in (str, int, bool):
+                    return None
+            elif type(item) is not c_type:
+                return None
+    return c_type
@@ -1,6 +1,13 @@
 from pathlib import Path
+import errno
+import os
 import shutil
 
+try:
+    import fcntl
+except ImportError:  # windows
+    fcntl = None
+
 
 def clear_empty_dir(
     s_path: Path, verbose: bool = False, items_to_delete: list[str] = list()
@@ -19,3 +26,55 @@ def clear_empty_dir(
             )
             if not len([x for x in item.rglob("*")]):
                 item.rmdir()
+
+
+def replace_text(path: Path, text: str) -> None:
+    """`path.write_text` into a new file, a hardlink already at `path` is
+    dropped instead of having its content overwritten"""
+    path.unlink(missing_ok=True)
+    path.write_text(text)
+
+
+# ------------------------------------------------------------
+
+FICLONE = 0x40049409  # linux ioctl, copy-on-write clone of a whole file
+# errors of a filesystem that can't clone at all, others may be about one file
+_NO_REFLINK = (errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL)
+# (source device, target device) pairs that can't be reflinked
+_reflink_unsupported: set[tuple[int, int]] = set()
+
+
+def _reflink(source: Path, target: Path) -> bool:
+    if fcntl is None:
+        return False
+    try:
+        devices = (source.stat().st_dev, target.parent.stat().st_dev)
+    except OSError:
+        return False
+    if devices in _reflink_unsupported:
+        return False
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except OSError as e:
+        if e.errno in _NO_REFLINK:
+            # don't try again for every file between these filesystems
+            _reflink_unsupported.add(devices)
+        target.unlink(missing_ok=True)
+        return False
+
+
+def link_or_copy(source: Path, target: Path) -> str:
+    """Place `source` at `target` without duplicating its data where the
+    filesystem allows it: a reflink, else a hardlink, else a plain copy.
+    `source` is never modified. Returns the method used"""
+    target.unlink(missing_ok=True)
+    if _reflink(source=source, target=target):
+        return "reflink"
+    try:
+        os.link(source, target)
+        return "hardlink"
+    except OSError:
+        shutil.copy2(source, target)
+        return "copy"
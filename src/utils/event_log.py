@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, TextIO
+
+from constants.runtime_const import CRSettings, EventLevel, gcr_settings
+
+
+@dataclass
+class EventLog:
+    """Structured record of a run: resolution decisions, warnings, missed
+    files and stage boundaries.
+
+    Once `open`ed, every event becomes one JSON line in a buffered sink.
+    The console is a filtered view: only events at or above the
+    `CONSOLE_LEVEL` setting are printed, in their human-readable form."""
+
+    settings: CRSettings = field(default_factory=lambda: gcr_settings)
+    buffer_size: int = 512
+
+    path: Path | None = None
+    counts: Counter = field(default_factory=Counter)
+
+    _sink: TextIO | None = field(default=None, repr=False)
+    _buffer: list[str] = field(default_factory=list, repr=False)
+
+    def open(self, path: Path) -> EventLog:
+        if self._sink is not None:
+            return self
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._sink = open(path, "w", encoding="utf-8")
+        return self
+
+    def close(self) -> None:
+        if self._sink is None:
+            return
+        self.flush()
+        self._sink.close()
+        self._sink = None
+
+    def flush(self) -> None:
+        if self._sink is None or (not self._buffer):
+            return
+        self._sink.write("\n".join(self._buffer) + "\n")
+        self._sink.flush()
+        self._buffer = list()
+
+    # ------------------------------------------------------------
+
+    def emit(
+        self,
+        kind: str,
+        message: str,
+        level: EventLevel = EventLevel.INFO,
+        text: str | None = None,
+        console: bool = True,
+        **data: Any,
+    ) -> None:
+        """`text` is the console form of the event when it differs from
+        `message`, `console=False` keeps the event off the console whatever
+        its level. Extra keyword arguments are stored with the event"""
+        self.counts[level.name] += 1
+        if self._sink is not None:
+            self._buffer.append(
+                json.dumps(
+                    {
+                        "t": round(time.time(), 3),
+                        "level": level.name,
+                        "kind": kind,
+                        "msg": message,
+                        **data,
+                    },
+                    default=str,
+                )
+            )
+            if len(self._buffer) >= self.buffer_size:
+                self.flush()
+        if console and (level.value >= self.settings.CONSOLE_LEVEL.value):
+            print(message if text is None else text)
+
+    def debug(self, kind: str, message: str, **data: Any) -> None:
+        self.emit(kind, message, level=EventLevel.DEBUG, **data)
+
+    def info(self, kind: str, message: str, **data: Any) -> None:
+        self.emit(kind, message, level=EventLevel.INFO, **data)
+
+    def warning(self, kind: str, message: str, **data: Any) -> None:
+        self.emit(kind, message, level=EventLevel.WARNING, **data)
+
+    def error(self, kind: str, message: str, **data: Any) -> None:
+        self.emit(kind, message, level=EventLevel.ERROR, **data)
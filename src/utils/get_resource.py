@@ -2,8 +2,9 @@ import json
 import os
 import sys
 from pathlib import Path
+from typing import Any
 
-from constants.runtime_const import DEBUG
+from constants.runtime_const import DEBUG, CRSettings, JsonOutputType, gcr_settings
 
 
 def get_resource_path(relative_path):
@@ -28,3 +29,12 @@ def load_json_from_path(json_path: Path) -> dict:
             _ = input()
         return dict()
     return data
+
+
+def dump_json(data: Any, indent: int = 4, settings: CRSettings | None = None) -> str:
+    """Serialize generated pack data, following the `JSON_OUTPUT` setting.
+    Compact output is minified with sorted keys, pretty output is for debugging."""
+    settings = settings if settings is not None else gcr_settings
+    if settings.JSON_OUTPUT == JsonOutputType.PRETTY:
+        return json.dumps(data, indent=indent)
+    return json.dumps(data, separators=(",", ":"), sort_keys=True)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import contextlib
+import sys
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from constants.runtime_const import CRSettings, MemoryProfileType
+from utils.text_utils import bcolors, c_text
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    class _ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+else:
+    ctypes = None
+
+# frames kept per allocation, enough to reach our code from inside json or zipfile
+TRACE_FRAMES = 25
+_SOURCE_ROOT = Path(__file__).resolve().parents[1]
+
+_IGNORED_FRAMES = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__, all_frames=True),  # the profile itself
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def _fmt_size(size: int) -> str:
+    return f"{size / 1e6:.1f} MB"
+
+
+def _read_rss_windows() -> tuple[int, int]:
+    counters = _ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.WinDLL("kernel32")
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    ok = ctypes.WinDLL("psapi").GetProcessMemoryInfo(
+        kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+    )
+    if not ok:
+        return 0, 0
+    return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+
+def _read_rss() -> tuple[int, int]:
+    """(current, peak) resident size in bytes, 0 when not known"""
+    if ctypes is not None:
+        try:
+            return _read_rss_windows()
+        except OSError:
+            return 0, 0
+    try:
+        values: dict[str, int] = dict()
+        with open("/proc/self/status") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "VmHWM"):
+                    values[key] = int(value.split()[0]) * 1024
+        return values.get("VmRSS", 0), values.get("VmHWM", 0)
+    except (OSError, ValueError):
+        pass
+    if resource is None:
+        return 0, 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return 0, (peak if sys.platform == "darwin" else peak * 1024)
+
+
+def _top_sites(snapshot: tracemalloc.Snapshot, limit: int) -> list[tuple[str, int]]:
+    """Retained bytes by the innermost frame in our own code, so memory held by
+    a parsed json file counts against the line that loaded it"""
+    sizes: Counter = Counter()
+    for trace in snapshot.traces:
+        frame = trace.traceback[-1]  # most recent
+        for f in reversed(trace.traceback):
+            if f.filename.startswith(str(_SOURCE_ROOT)):
+                frame = f
+                break
+        try:
+            name = Path(frame.filename).relative_to(_SOURCE_ROOT).as_posix()
+        except ValueError:
+            name = frame.filename
+        sizes[f"{name}:{frame.lineno}"] += trace.size
+    return sizes.most_common(limit)
+
+
+def _reset_rss_peak() -> None:
+    # linux only, elsewhere the peak stays the highest of the run so far
+    # (the working set peak on windows)
+    with contextlib.suppress(OSError):
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+
+
+@dataclass
+class StageMemory:
+    stage: str
+    peak: int  # bytes, highest point while the stage ran
+    retained: int  # bytes still held when it ended
+    # allocation site -> bytes it still holds, tracemalloc only
+    top: list[tuple[str, int]] = field(default_factory=list)
+
+
+@dataclass
+class MemoryProfile:
+    """Memory use sampled at every stage boundary of a run.
+
+    `mark` closes the running stage and starts the next, stages are a flat
+    timeline. With TRACEMALLOC the numbers are Python allocations and the
+    largest allocation sites are kept, with RSS they are the resident size
+    of the process. Only the main process is measured, not merge workers.
+
+    Callers hold None instead of a profile when the MEMORY_PROFILE setting is
+    OFF, so a disabled profile costs nothing. RSS falls back to TRACEMALLOC
+    where the resident size can't be read."""
+
+    mode: MemoryProfileType = MemoryProfileType.TRACEMALLOC
+    top_sites: int = 5
+
+    stages: list[StageMemory] = field(default_factory=list)
+
+    _stage: str | None = None
+    _tracing: bool = False  # tracemalloc was started by us
+
+    @classmethod
+    def from_settings(cls, settings: CRSettings) -> MemoryProfile | None:
+        if settings.MEMORY_PROFILE == MemoryProfileType.OFF:
+            return None
+        mode = settings.MEMORY_PROFILE
+        if (mode == MemoryProfileType.RSS) and (not any(_read_rss())):
+            print(
+                c_text(
+                    "Memory: resident size is not available here, "
+                    "profiling with tracemalloc instead",
+                    color=bcolors.WARNING,
+                )
+            )
+            mode = MemoryProfileType.TRACEMALLOC
+        return cls(mode=mode).start()
+
+    def start(self) -> MemoryProfile:
+        if (self.mode == MemoryProfileType.TRACEMALLOC) and (
+            not tracemalloc.is_tracing()
+        ):
+            tracemalloc.start(TRACE_FRAMES)
+            self._tracing = True
+        return self
+
+    def stop(self) -> None:
+        self.mark(None)
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def mark(self, stage: str | None) -> StageMemory | None:
+        """End the running stage, returns its sample, and start `stage`"""
+        res = None
+        if self._stage is not None:
+            res = self._sample(self._stage)
+            self.stages.append(res)
+        self._stage = stage
+        if stage is not None:
+            self._reset_peak()
+        return res
+
+    # ------------------------------------------------------------
+
+    def _reset_peak(self) -> None:
+        if self.mode == MemoryProfileType.TRACEMALLOC:
+            tracemalloc.reset_peak()
+        else:
+            _reset_rss_peak()
+
+    def _sample(self, stage: str) -> StageMemory:
+        if self.mode != MemoryProfileType.TRACEMALLOC:
+            current, peak = _read_rss()
+            return StageMemory(stage=stage, peak=peak, retained=current)
+
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces(_IGNORED_FRAMES)
+        return StageMemory(
+            stage=stage,
+            peak=peak,
+            retained=current,
+            top=_top_sites(snapshot, limit=self.top_sites),
+        )
+
+    # ------------------------------------------------------------
+
+    def print_summary(self) -> None:
+        if not self.stages:
+            return
+        print(f"Memory ({self.mode.name.lower()}), peak / retained per stage:")
+        width = max(len(s.stage) for s in self.stages)
+        for s in self.stages:
+            print(
+                f"  {s.stage:<{width}}  {_fmt_size(s.peak):>10}  "
+                f"{_fmt_size(s.retained):>10}"
+            )
+        highest = max(self.stages, key=lambda s: s.peak)
+        if highest.top:
+            print(f"Largest allocation sites after [{highest.stage}]:")
+            for site, size in highest.top:
+                print(f"  {_fmt_size(size):>10}  {site}")
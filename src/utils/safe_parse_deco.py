@@ -1,13 +1,52 @@
 import functools
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import Callable, TypeVar
+from typing import Any, Callable, Iterable, Iterator, TypeVar
+
+from constants.runtime_const import CRSettings, gcr_settings
 from utils.cli_utils.keypress import clear_line
-from collections.abc import Iterable
+from utils.cli_utils.progress import StageProgress
 
 T = TypeVar("T")
 
+_UNREADABLE = object()
+
+
+def parse_worker_count(settings: CRSettings | None = None) -> int:
+    settings = settings if settings is not None else gcr_settings
+    if settings.PARSE_WORKERS > 0:
+        return settings.PARSE_WORKERS
+    return min(8, os.cpu_count() or 1)
+
+
+def _load_json(file_path: Path) -> tuple[Any, Exception | None]:
+    try:
+        with file_path.open() as f:
+            return json.load(f), None
+    except (UnicodeDecodeError, JSONDecodeError):
+        return _UNREADABLE, None
+    except Exception as e:
+        return None, e
+
+
+def _iter_loaded(
+    paths: Iterable[Path], workers: int
+) -> Iterator[tuple[Any, Exception | None]]:
+    """Yields `_load_json` for each path, in the order given.
+    Files are read ahead in bounded chunks by a thread pool."""
+    if workers <= 1:
+        yield from map(_load_json, paths)
+        return
+
+    paths = iter(paths)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        while chunk := list(islice(paths, workers * 16)):
+            yield from pool.map(_load_json, chunk)
+
 
 # Version 1: Call function for each file
 def safe_parse_per_file(
@@ -25,28 +64,35 @@ def safe_parse_per_file(
 
             print(f"-- Parsing {component_attr.replace('_', ' ').title()}")
 
-            locations = getattr(self.component_location, component_attr)
-            if isinstance(locations, Path):
-                locations = [locations]
-
-            if isinstance(locations, Iterable):
-                for location in locations:
-                    for file_path in location.rglob(file_pattern):
-                        try:
-                            try:
-                                with file_path.open() as f:
-                                    data = json.load(f)
-                            except (UnicodeDecodeError, JSONDecodeError):
-                                if DEBUG:
-                                    print(f"WARN!! - {file_path}")
-                                    _ = input()
-                                continue
-
-                            func(self, file_path, data, *args, **kwargs)
-
-                        except Exception as e:
-                            print(f"\n\n{file_path}\n\n")
-                            raise e
+            # files were already sorted by location when the pack table was built
+            file_ids = list(self.files.of_component(component_attr, file_pattern))
+            loaded = _iter_loaded(
+                paths=[self.files.path(file_id) for file_id in file_ids],
+                workers=parse_worker_count(self.settings),
+            )
+            with StageProgress(
+                stage="parse",
+                label=f"{self.name} {component_attr.replace('_', ' ')}",
+                total_items=len(file_ids),
+                total_bytes=sum(self.files[file_id].size for file_id in file_ids),
+            ) as progress:
+                for file_id, (data, error) in zip(file_ids, loaded):
+                    file_path: Path = self.files.path(file_id)
+                    progress.advance(nbytes=self.files[file_id].size)
+                    try:
+                        if error is not None:
+                            raise error
+                        if data is _UNREADABLE:
+                            if DEBUG:
+                                print(f"WARN!! - {file_path}")
+                                _ = input()
+                            continue
+
+                        func(self, file_path, data, *args, file_id=file_id, **kwargs)
+
+                    except Exception as e:
+                        print(f"\n\n{file_path}\n\n")
+                        raise e
 
             if not self.verbose:
                 print(clear_line, end="")